@@ -20,6 +20,7 @@ if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data.database import DatabaseInterface
+from llm_provider import cached_client
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +67,7 @@ class AgenticCookingAgent:
                 "Set environment variable or pass api_key parameter."
             )
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = cached_client(Anthropic(api_key=api_key))
         self.model = "claude-sonnet-4-5-20250929"
 
         # Build the LangGraph workflow
@@ -22,6 +22,7 @@ if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data.database import DatabaseInterface
+from llm_provider import cached_client
 from data.models import MealPlan, PlannedMeal, Recipe
 
 logger = logging.getLogger(__name__)
@@ -75,7 +76,7 @@ class AgenticPlanningAgent:
                 "Set environment variable or pass api_key parameter."
             )
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = cached_client(Anthropic(api_key=api_key))
         self.model = "claude-sonnet-4-5-20250929"
 
         # Build the LangGraph workflow
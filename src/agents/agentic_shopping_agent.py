@@ -1,12 +1,15 @@
 """
-LLM-Powered Shopping Agent using LangGraph.
+Shopping Agent using LangGraph.
 
-This agent uses Claude to reason about ingredient consolidation,
-replacing the regex-based parsing with true agentic reasoning.
+Ingredients are consolidated by the rule-based engine in
+shopping_consolidator (unit conversion, name normalisation, store
+sections, scaling instructions); Claude only sees the raw lines the
+engine can't parse, and formats lists for display.
 """
 
 import logging
 import os
+import time
 from typing import Dict, List, Any, Optional, TypedDict
 from collections import defaultdict
 
@@ -21,7 +24,9 @@ if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data.database import DatabaseInterface
+from llm_provider import cached_client
 from data.models import GroceryList, GroceryItem
+from shopping_consolidator import IngredientConsolidator, parse_scaling
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +40,7 @@ class ShoppingState(TypedDict):
     # Collected ingredients
     raw_ingredients: List[Dict[str, Any]]  # List of {ingredient: str, recipe: str}
 
-    # LLM consolidation results
+    # Consolidation results
     consolidated_items: List[Dict[str, Any]]  # List of consolidated grocery items
 
     # Final grocery list
@@ -43,13 +48,14 @@ class ShoppingState(TypedDict):
 
     # Optional scaling/modification instructions (natural language)
     scaling_instructions: Optional[str]
+    unapplied_scaling: List[str]  # Instruction clauses that couldn't be applied
 
     # Error handling
     error: Optional[str]
 
 
 class AgenticShoppingAgent:
-    """LLM-powered agent for generating organized grocery lists."""
+    """Agent for generating organized grocery lists (LLM only for unparseable lines)."""
 
     def __init__(self, db: DatabaseInterface, api_key: Optional[str] = None):
         """
@@ -69,7 +75,7 @@ class AgenticShoppingAgent:
                 "Set environment variable or pass api_key parameter."
             )
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = cached_client(Anthropic(api_key=api_key))
         self.model = "claude-sonnet-4-5-20250929"
 
         # Build the LangGraph workflow
@@ -84,13 +90,13 @@ class AgenticShoppingAgent:
 
         # Add nodes
         workflow.add_node("collect_ingredients", self._collect_ingredients_node)
-        workflow.add_node("consolidate_with_llm", self._consolidate_with_llm_node)
+        workflow.add_node("consolidate", self._consolidate_node)
         workflow.add_node("save_list", self._save_list_node)
 
         # Define edges
         workflow.set_entry_point("collect_ingredients")
-        workflow.add_edge("collect_ingredients", "consolidate_with_llm")
-        workflow.add_edge("consolidate_with_llm", "save_list")
+        workflow.add_edge("collect_ingredients", "consolidate")
+        workflow.add_edge("consolidate", "save_list")
         workflow.add_edge("save_list", END)
 
         return workflow.compile()
@@ -102,7 +108,7 @@ class AgenticShoppingAgent:
         user_id: int = 1,
     ) -> Dict[str, Any]:
         """
-        Create a grocery list from a meal plan using LLM reasoning.
+        Create a grocery list from a meal plan.
 
         Args:
             meal_plan_id: ID of the meal plan
@@ -131,6 +137,7 @@ class AgenticShoppingAgent:
                 consolidated_items=[],
                 grocery_list_id=None,
                 scaling_instructions=scaling_instructions,
+                unapplied_scaling=[],
                 error=None,
             )
 
@@ -147,12 +154,13 @@ class AgenticShoppingAgent:
             # Get the saved grocery list for full details
             grocery_list = self.db.get_grocery_list(final_state["grocery_list_id"], user_id=user_id)
 
-            logger.info(f"Created grocery list {final_state['grocery_list_id']} with {len(final_state['consolidated_items'])} items using LLM")
+            logger.info(f"Created grocery list {final_state['grocery_list_id']} with {len(final_state['consolidated_items'])} items")
 
             return {
                 "success": True,
                 "grocery_list_id": final_state["grocery_list_id"],
                 "num_items": len(final_state["consolidated_items"]),
+                "unapplied_scaling": final_state.get("unapplied_scaling", []),
                 "items": [item.to_dict() for item in grocery_list.items],
                 "store_sections": {
                     section: [item.to_dict() for item in items]
@@ -201,7 +209,12 @@ class AgenticShoppingAgent:
                         # Structured ingredient already has quantity, unit, name, category
                         raw_ingredients.append({
                             "ingredient": f"{ingredient.quantity} {ingredient.unit} {ingredient.name}".strip(),
+                            "raw": ingredient.raw,
+                            "name": ingredient.name,
+                            "quantity": ingredient.quantity,
+                            "unit": ingredient.unit,
                             "recipe": recipe.name,
+                            "servings": recipe.servings,
                             "category": ingredient.category,  # Already categorized!
                             "allergens": ingredient.allergens,  # Already tracked!
                         })
@@ -211,6 +224,7 @@ class AgenticShoppingAgent:
                         raw_ingredients.append({
                             "ingredient": ingredient_raw,
                             "recipe": recipe.name,
+                            "servings": recipe.servings,
                         })
 
             state["raw_ingredients"] = raw_ingredients
@@ -224,16 +238,17 @@ class AgenticShoppingAgent:
             state["error"] = f"Ingredient collection failed: {str(e)}"
             return state
 
-    def _consolidate_with_llm_node(self, state: ShoppingState) -> ShoppingState:
+    def _consolidate_node(self, state: ShoppingState) -> ShoppingState:
         """
-        LangGraph node: Use LLM to intelligently consolidate ingredients.
-
-        The LLM handles:
-        - Parsing quantities and units
-        - Merging similar ingredients (e.g., "2 cups flour" + "1 cup flour" = "3 cups flour")
-        - Categorizing by store section
-        - Handling different units intelligently
-        - Applying scaling instructions (e.g., "double the Italian sandwiches")
+        LangGraph node: Consolidate ingredients with the rule-based engine.
+
+        The engine handles:
+        - Normalizing names ("2 large onions, chopped" -> onion)
+        - Converting and merging compatible units ("1 cup" + "2 tbsp" flour)
+        - Categorizing by store section (enriched category, else keywords)
+        - Applying numeric scaling instructions (e.g., "double the Italian sandwiches")
+
+        Raw lines it can't parse are consolidated by the LLM and merged in.
         """
         try:
             raw_ingredients = state["raw_ingredients"]
@@ -242,42 +257,49 @@ class AgenticShoppingAgent:
                 state["error"] = "No ingredients to consolidate"
                 return state
 
-            # Format ingredients for LLM
-            # For enriched recipes with categories, include them to guide LLM
-            ingredients_text = ""
-            has_categories = any("category" in item for item in raw_ingredients)
+            start = time.time()
+            servings_by_recipe = {item["recipe"]: item.get("servings") or 4 for item in raw_ingredients}
+            factors, state["unapplied_scaling"] = parse_scaling(state.get("scaling_instructions"),
+                                                                servings_by_recipe)
 
-            for i, item in enumerate(raw_ingredients, 1):
-                if "category" in item and item["category"]:
-                    # Enriched ingredient with pre-assigned category
-                    ingredients_text += f"{i}. {item['ingredient']} [{item['category']}] (from: {item['recipe']})\n"
-                else:
-                    # Non-enriched ingredient - LLM will categorize
-                    ingredients_text += f"{i}. {item['ingredient']} (from: {item['recipe']})\n"
+            consolidator = IngredientConsolidator(factors)
+            leftovers = [item for item in raw_ingredients if not consolidator.add(item)]
+            if leftovers:
+                self._consolidate_leftovers_with_llm(consolidator, leftovers, factors)
 
-            # Check for scaling instructions
-            scaling_instructions = state.get("scaling_instructions", "")
-            scaling_note = ""
-            if scaling_instructions:
-                scaling_note = f"""
+            state["consolidated_items"] = consolidator.items()
+            logger.info(f"[SHOP] Consolidated {len(raw_ingredients)} ingredients into "
+                        f"{len(state['consolidated_items'])} items in {(time.time() - start) * 1000:.0f}ms "
+                        f"({len(leftovers)} lines sent to LLM)")
 
-**IMPORTANT SCALING INSTRUCTIONS:**
-{scaling_instructions}
+            return state
 
-Please apply these scaling instructions to the relevant recipes when consolidating.
-For example, if asked to "double the Italian sandwiches", multiply all ingredient
-quantities from that recipe by 2 before consolidating with other ingredients.
-"""
+        except Exception as e:
+            logger.error(f"Error in consolidate_node: {e}")
+            state["error"] = f"Consolidation failed: {str(e)}"
+            return state
 
-            # Ask LLM to consolidate (optimized: shorter prompt, fewer tokens)
-            category_note = ""
-            if has_categories:
-                category_note = "\n\nNote: Some ingredients already have categories [in brackets] - use those categories."
+    def _consolidate_leftovers_with_llm(
+        self,
+        consolidator: IngredientConsolidator,
+        leftovers: List[Dict[str, Any]],
+        factors: Dict[str, float],
+    ):
+        """
+        Ask the LLM to consolidate lines the rule engine couldn't parse.
 
-            prompt = f"""Consolidate these recipe ingredients into a shopping list:
+        Scaling was already resolved per recipe, so each line carries its
+        factor. If the LLM fails, lines are added as-is.
+        """
+        ingredients_text = ""
+        for i, item in enumerate(leftovers, 1):
+            factor = factors.get(item["recipe"], 1.0)
+            scale_note = f" (multiply by {factor:g})" if factor != 1.0 else ""
+            ingredients_text += f"{i}. {item.get('raw') or item['ingredient']}{scale_note} (from: {item['recipe']})\n"
 
-{ingredients_text}{category_note}{scaling_note}
+        prompt = f"""Consolidate these recipe ingredients into a shopping list:
 
+{ingredients_text}
 Merge duplicates, normalize names, categorize by store section (produce/meat/seafood/dairy/pantry/frozen/bakery/other).
 
 Output format (one per line):
@@ -288,58 +310,37 @@ flour | 3 cups | pantry | Pancakes, Cookies
 chicken breast | 1.5 lbs | meat | Stir Fry
 onions | 2 medium | produce | Stir Fry, Pasta"""
 
+        try:
             response = self.client.messages.create(
                 model=self.model,
-                max_tokens=2048,  # Reduced from 4096 for faster response
+                max_tokens=1024,
                 messages=[{"role": "user", "content": prompt}]
             )
-
             consolidation_text = response.content[0].text
-            logger.info(f"LLM consolidation completed")
-
-            # Parse LLM output
-            consolidated_items = []
-
-            for line in consolidation_text.split("\n"):
-                line = line.strip()
-
-                # Skip empty lines and non-data lines
-                if not line or "|" not in line:
-                    continue
-
-                # Skip header-like lines
-                if "ITEM_NAME" in line or "----" in line:
-                    continue
-
-                parts = [p.strip() for p in line.split("|")]
-
-                if len(parts) < 4:
-                    continue
-
-                item_name = parts[0]
-                quantity = parts[1]
-                category = parts[2].lower()
-                recipes_str = parts[3]
-
-                # Parse recipe sources
-                recipe_sources = [r.strip() for r in recipes_str.split(",")]
-
-                consolidated_items.append({
-                    "name": item_name,
-                    "quantity": quantity,
-                    "category": category,
-                    "recipe_sources": recipe_sources,
-                })
-
-            state["consolidated_items"] = consolidated_items
-            logger.info(f"Consolidated into {len(consolidated_items)} unique items")
-
-            return state
-
         except Exception as e:
-            logger.error(f"Error in consolidate_with_llm_node: {e}")
-            state["error"] = f"Consolidation failed: {str(e)}"
-            return state
+            logger.warning(f"[SHOP] LLM consolidation of {len(leftovers)} leftover lines failed: {e}")
+            for item in leftovers:
+                consolidator.add_external(item.get("raw") or item["ingredient"], "", item.get("category"),
+                                          [item["recipe"]])
+            return
+
+        for line in consolidation_text.split("\n"):
+            line = line.strip()
+
+            # Skip empty lines, non-data lines and headers
+            if not line or "|" not in line or "ITEM_NAME" in line or "----" in line:
+                continue
+
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) < 4:
+                continue
+
+            consolidator.add_external(
+                name=parts[0],
+                quantity=parts[1],
+                category=parts[2].lower(),
+                recipes=[r.strip() for r in parts[3].split(",") if r.strip()],
+            )
 
     def _save_list_node(self, state: ShoppingState) -> ShoppingState:
         """
@@ -367,6 +368,7 @@ onions | 2 medium | produce | Stir Fry, Pasta"""
                     category=item_data["category"],
                     recipe_sources=item_data["recipe_sources"],
                     notes=notes,
+                    contributions=item_data.get("contributions", []),
                 )
 
                 grocery_items.append(item)
@@ -21,10 +21,15 @@ load_dotenv()
 from anthropic import Anthropic
 
 from main import MealPlanningAssistant
+from llm_provider import cached_client
 from chatbot_modules.recipe_selector import validate_plan, ValidationFailure
 from chatbot_modules.swap_matcher import check_backup_match
-from chatbot_modules.tools_config import build_system_prompt, get_tools as get_tool_definitions
-from chatbot_modules.tool_registry import execute_tool as registry_execute_tool
+from chatbot_modules.tools_config import build_system_prompt, build_system_blocks, get_tools as get_tool_definitions
+from chatbot_modules.tool_registry import (
+    execute_tool as registry_execute_tool,
+    execute_tools as registry_execute_tools,
+)
+from chatbot_modules.history_manager import compact_history
 
 
 class MealPlanningChatbot:
@@ -48,7 +53,8 @@ class MealPlanningChatbot:
             print("  ./run.sh workflow")
             sys.exit(1)
 
-        self.client = Anthropic(api_key=api_key)
+        # Shared LLM response cache; only deterministic tool calls opt in (cache=True)
+        self.client = cached_client(Anthropic(api_key=api_key))
         # Use agentic agents (API key is available)
         self.assistant = MealPlanningAssistant(db_dir="data", use_agentic=True)
         self.conversation_history = []
@@ -68,6 +74,8 @@ class MealPlanningChatbot:
         # Verbose mode for debugging
         self.verbose = verbose
         self._verbose_callback = verbose_callback
+        # Optional callback(text: str) receiving LLM text deltas as they stream
+        self.text_delta_callback = None
         # Wire verbose callback to planning agent
         self._sync_verbose_callback()
 
@@ -107,6 +115,15 @@ class MealPlanningChatbot:
                 # Don't let callback errors break the chatbot
                 print(f"Warning: verbose_callback failed: {e}")
 
+    def _emit_text_delta(self, text: str):
+        """Forward a streamed LLM text delta to the delta callback if one is set."""
+        if self.text_delta_callback:
+            try:
+                self.text_delta_callback(text)
+            except Exception as e:
+                # Don't let callback errors break the chatbot
+                print(f"Warning: text_delta_callback failed: {e}")
+
     def _load_most_recent_plan(self):
         """Load the most recent meal plan automatically on startup."""
         try:
@@ -148,9 +165,19 @@ class MealPlanningChatbot:
             selected_dates=selected_dates,
         )
 
+    def get_system_blocks(self) -> List[Dict[str, Any]]:
+        """Get the system prompt as blocks: cached static instructions, then plan context."""
+        selected_dates = getattr(self, 'selected_dates', None)
+        return build_system_blocks(
+            current_meal_plan_id=self.current_meal_plan_id,
+            current_shopping_list_id=self.current_shopping_list_id,
+            last_meal_plan=self.last_meal_plan,
+            selected_dates=selected_dates,
+        )
+
     def get_tools(self) -> List[Dict[str, Any]]:
-        """Define tools available to the LLM."""
-        return get_tool_definitions()
+        """Define tools available to the LLM (the last tool carries the prompt-cache breakpoint)."""
+        return get_tool_definitions(cache_breakpoint=True)
 
     def execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
         """Execute a tool and return results.
@@ -159,6 +186,22 @@ class MealPlanningChatbot:
         """
         return registry_execute_tool(self, tool_name, tool_input)
 
+    def execute_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Execute one response's tool calls, running read-only tools concurrently.
+
+        Results are returned in the same order as calls.
+        """
+        return registry_execute_tools(self, calls)
+
+    def _compact_history(self):
+        """Keep conversation_history within its token budget before an LLM call."""
+        self.conversation_history, stats = compact_history(self.conversation_history)
+        if stats["shortened"] or stats["summarized_turns"]:
+            logger.info(
+                f"[HISTORY] Compacted {stats['tokens_before']} -> {stats['tokens_after']} tokens "
+                f"({stats['shortened']} tool results shortened, {stats['summarized_turns']} turns summarized)"
+            )
+
     def chat(self, user_message: str) -> str:
         """Send a message and get response."""
         # Add user message to history
@@ -167,13 +210,15 @@ class MealPlanningChatbot:
             "content": user_message,
         })
 
-        # Call Claude with tools
-        response = self.client.messages.create(
+        # Call Claude with tools, streaming text as it is generated
+        self._compact_history()
+        response = self.client.stream_message(
             model="claude-sonnet-4-5-20250929",
             max_tokens=2048,  # Increased to prevent truncation causing duplicate tool calls
-            system=self.get_system_prompt(),
+            system=self.get_system_blocks(),
             tools=self.get_tools(),
             messages=self.conversation_history,
+            on_text=self._emit_text_delta,
         )
 
         # Process response
@@ -187,45 +232,46 @@ class MealPlanningChatbot:
             })
 
             # Execute all tools and collect results
+            tool_blocks = [block for block in response.content if block.type == "tool_use"]
+            for content_block in tool_blocks:
+                # Always emit user-friendly progress for tools (keeps UI responsive)
+                tool_friendly_names = {
+                    "plan_meals": "Creating your meal plan...",
+                    "plan_meals_smart": "Finding recipes for your meal plan...",
+                    "create_shopping_list": "Building your shopping list...",
+                    "search_recipes": "Searching recipes...",
+                    "swap_meal": "Finding a replacement meal...",
+                    "swap_meal_fast": "Swapping meal...",
+                    "get_cooking_guide": "Loading recipe details...",
+                    "check_allergens": "Checking allergens...",
+                    "show_current_plan": "Loading your meal plan...",
+                    "modify_recipe": "Modifying recipe...",
+                    "clear_recipe_modifications": "Reverting to original recipe...",
+                }
+                friendly_msg = tool_friendly_names.get(content_block.name, f"Running {content_block.name}...")
+                self._verbose_output(friendly_msg)
+
+                if self.verbose:
+                    self._verbose_output(f"\n🔧 [TOOL] {content_block.name}")
+                    self._verbose_output(f"   Input: {json.dumps(content_block.input, indent=2)}")
+
+            # Independent read-only tools run concurrently; results keep call order
+            tool_outputs = self.execute_tools(
+                [(block.name, block.input) for block in tool_blocks]
+            )
+
             tool_results = []
-            for content_block in response.content:
-                if content_block.type == "tool_use":
-                    # Always emit user-friendly progress for tools (keeps UI responsive)
-                    tool_friendly_names = {
-                        "plan_meals": "Creating your meal plan...",
-                        "plan_meals_smart": "Finding recipes for your meal plan...",
-                        "create_shopping_list": "Building your shopping list...",
-                        "search_recipes": "Searching recipes...",
-                        "swap_meal": "Finding a replacement meal...",
-                        "swap_meal_fast": "Swapping meal...",
-                        "get_cooking_guide": "Loading recipe details...",
-                        "check_allergens": "Checking allergens...",
-                        "show_current_plan": "Loading your meal plan...",
-                        "modify_recipe": "Modifying recipe...",
-                        "clear_recipe_modifications": "Reverting to original recipe...",
-                    }
-                    friendly_msg = tool_friendly_names.get(content_block.name, f"Running {content_block.name}...")
-                    self._verbose_output(friendly_msg)
-
-                    if self.verbose:
-                        self._verbose_output(f"\n🔧 [TOOL] {content_block.name}")
-                        self._verbose_output(f"   Input: {json.dumps(content_block.input, indent=2)}")
-
-                    tool_result = self.execute_tool(
-                        content_block.name,
-                        content_block.input,
-                    )
-
-                    if self.verbose:
-                        # Truncate long results for readability
-                        result_preview = tool_result if len(tool_result) < 200 else tool_result[:200] + "..."
-                        self._verbose_output(f"   Result: {result_preview}\n")
-
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": content_block.id,
-                        "content": tool_result,
-                    })
+            for content_block, tool_result in zip(tool_blocks, tool_outputs):
+                if self.verbose:
+                    # Truncate long results for readability
+                    result_preview = tool_result if len(tool_result) < 200 else tool_result[:200] + "..."
+                    self._verbose_output(f"   Result ({content_block.name}): {result_preview}\n")
+
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": content_block.id,
+                    "content": tool_result,
+                })
 
             # Add all tool results in a single user message
             self.conversation_history.append({
@@ -237,12 +283,14 @@ class MealPlanningChatbot:
             self._verbose_output("Preparing your response...")
 
             # Get next response
-            response = self.client.messages.create(
+            self._compact_history()
+            response = self.client.stream_message(
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=2048,  # Increased to prevent truncation causing duplicate tool calls
-                system=self.get_system_prompt(),
+                system=self.get_system_blocks(),
                 tools=self.get_tools(),
                 messages=self.conversation_history,
+                on_text=self._emit_text_delta,
             )
 
         # Extract final text response
@@ -8,18 +8,31 @@ from chatbot_modules.recipe_selector import (
     validate_plan,
     ValidationFailure,
 )
+from chatbot_modules.local_ranker import LocalRanker
+from chatbot_modules.name_index import RecipeNameIndex, get_name_index
+from chatbot_modules.preplanner import precompute_active_users, start_preplan_timer
 from chatbot_modules.swap_matcher import (
+    BackupVectorizer,
     check_backup_match,
     select_backup_options,
     llm_semantic_match,
 )
 from chatbot_modules.tools_config import (
+    build_plan_context,
+    build_system_blocks,
     build_system_prompt,
     get_tools,
+    STATIC_SYSTEM_PROMPT,
     TOOL_DEFINITIONS,
 )
+from chatbot_modules.history_manager import (
+    compact_history,
+    HISTORY_TOKEN_BUDGET,
+)
 from chatbot_modules.tool_registry import (
     execute_tool,
+    execute_tools,
+    INDEPENDENT_TOOLS,
     TOOL_HANDLERS,
 )
 
@@ -29,12 +42,25 @@ __all__ = [
     "select_recipes_with_llm",
     "validate_plan",
     "ValidationFailure",
+    "LocalRanker",
+    "RecipeNameIndex",
+    "get_name_index",
+    "precompute_active_users",
+    "start_preplan_timer",
+    "BackupVectorizer",
     "check_backup_match",
     "select_backup_options",
     "llm_semantic_match",
+    "build_plan_context",
+    "build_system_blocks",
     "build_system_prompt",
     "get_tools",
+    "STATIC_SYSTEM_PROMPT",
     "TOOL_DEFINITIONS",
+    "compact_history",
+    "HISTORY_TOKEN_BUDGET",
     "execute_tool",
+    "execute_tools",
+    "INDEPENDENT_TOOLS",
     "TOOL_HANDLERS",
 ]
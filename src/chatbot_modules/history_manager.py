@@ -0,0 +1,229 @@
+"""
+Token-budgeted compaction of the chatbot's conversation history.
+
+Keeps the messages sent on each LLM call under a token budget by (in order):
+1. shortening large tool results from earlier turns to short references,
+2. folding the oldest whole turns into a local text summary,
+3. shortening already-answered tool results within the current turn,
+4. trimming the summary itself, oldest lines first.
+
+A turn starts at a user message with plain-text content and includes every
+tool_use/tool_result exchange that follows it, so compaction only ever drops
+whole turns and never separates a tool_use block from its tool_result.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# History configuration
+HISTORY_TOKEN_BUDGET = 12000  # Estimated tokens of history sent per LLM call
+MAX_TOOL_RESULT_CHARS = 1500  # Older tool results longer than this become references
+TOOL_RESULT_PREVIEW_CHARS = 200
+SUMMARY_TEXT_CHARS = 160
+MAX_SUMMARY_LINES = 20  # Only the most recent summarised turns are kept
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "[Summary of earlier conversation]"
+SUMMARY_ACK = "Understood - I'll keep that earlier context in mind."
+
+
+def _block_field(block: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a content block (dict or SDK object)."""
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token estimate for a message list (~4 characters per token)."""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += len(content)
+        else:
+            total += len(json.dumps(content, default=_json_default))
+    return total // CHARS_PER_TOKEN
+
+
+def is_turn_start(message: Dict[str, Any]) -> bool:
+    """A user message with plain-text content starts a new turn."""
+    return message.get("role") == "user" and isinstance(message.get("content"), str)
+
+
+def split_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group messages into turns (leading messages before any turn start form their own group)."""
+    turns: List[List[Dict[str, Any]]] = []
+    for message in messages:
+        if is_turn_start(message) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _tool_names(turn: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Map tool_use_id -> tool name for the tool_use blocks in a turn."""
+    names = {}
+    for message in turn:
+        content = message.get("content")
+        if message.get("role") == "assistant" and isinstance(content, list):
+            for block in content:
+                if _block_field(block, "type") == "tool_use":
+                    names[_block_field(block, "id")] = _block_field(block, "name")
+    return names
+
+
+def _shorten_tool_results(message: Dict[str, Any], names: Dict[str, str], max_chars: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Replace long tool_result content in a user message with a short reference.
+
+    Returns:
+        (message, number of results shortened) - the input is not mutated
+    """
+    content = message.get("content")
+    if message.get("role") != "user" or not isinstance(content, list):
+        return message, 0
+
+    shortened = 0
+    new_content = []
+    for block in content:
+        result = block.get("content") if isinstance(block, dict) else None
+        if (isinstance(block, dict) and block.get("type") == "tool_result"
+                and isinstance(result, str) and len(result) > max_chars):
+            tool_name = names.get(block.get("tool_use_id"), "tool")
+            block = {
+                **block,
+                "content": (
+                    f"[{tool_name} result shortened: {len(result)} chars, "
+                    f"ref {block.get('tool_use_id')}] {result[:TOOL_RESULT_PREVIEW_CHARS]}..."
+                ),
+            }
+            shortened += 1
+        new_content.append(block)
+
+    if not shortened:
+        return message, 0
+    return {**message, "content": new_content}, shortened
+
+
+def _clip(text: str, limit: int = SUMMARY_TEXT_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def _summarize_turn(turn: List[Dict[str, Any]]) -> str:
+    """One-line local summary of a turn: user request, tools used, final reply."""
+    parts = []
+    if is_turn_start(turn[0]):
+        parts.append(f'User: "{_clip(turn[0]["content"])}"')
+    tools = sorted(set(_tool_names(turn).values()))
+    if tools:
+        parts.append(f"tools: {', '.join(tools)}")
+    final = turn[-1]
+    if final.get("role") == "assistant" and isinstance(final.get("content"), str):
+        parts.append(f'Assistant: "{_clip(final["content"])}"')
+    return "- " + "; ".join(parts)
+
+
+def _extract_summary_lines(turn: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """Return the lines of an existing summary turn, or None if this is not one."""
+    content = turn[0].get("content")
+    if is_turn_start(turn[0]) and content.startswith(SUMMARY_PREFIX):
+        return content[len(SUMMARY_PREFIX):].strip().splitlines()
+    return None
+
+
+def compact_history(
+    messages: List[Dict[str, Any]],
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    max_tool_result_chars: int = MAX_TOOL_RESULT_CHARS,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Compact a conversation history to fit a token budget.
+
+    The current (last) turn is always kept whole apart from step 3; earlier
+    turns are shortened and then summarised oldest-first until the estimate
+    fits. Earlier summaries are merged so at most one summary turn exists.
+
+    Args:
+        messages: Conversation history (not mutated)
+        token_budget: Target estimated token count
+        max_tool_result_chars: Tool results longer than this may be shortened
+
+    Returns:
+        (compacted messages, stats dict with shortened/summarized counts and tokens)
+    """
+    stats = {"tokens_before": estimate_tokens(messages), "shortened": 0, "summarized_turns": 0}
+    if stats["tokens_before"] <= token_budget:
+        stats["tokens_after"] = stats["tokens_before"]
+        return messages, stats
+
+    turns = split_turns(messages)
+    summary_lines: List[str] = []
+    if turns:
+        existing = _extract_summary_lines(turns[0])
+        if existing is not None:
+            summary_lines = existing
+            turns = turns[1:]
+
+    # 1. Shorten large tool results in earlier turns
+    for i, turn in enumerate(turns[:-1]):
+        names = _tool_names(turn)
+        new_turn = []
+        for message in turn:
+            message, count = _shorten_tool_results(message, names, max_tool_result_chars)
+            stats["shortened"] += count
+            new_turn.append(message)
+        turns[i] = new_turn
+
+    def assemble() -> List[Dict[str, Any]]:
+        result = []
+        if summary_lines:
+            result.append({"role": "user", "content": f"{SUMMARY_PREFIX}\n" + "\n".join(summary_lines)})
+            result.append({"role": "assistant", "content": SUMMARY_ACK})
+        for turn in turns:
+            result.extend(turn)
+        return result
+
+    # 2. Fold the oldest turns into the summary
+    compacted = assemble()
+    while len(turns) > 1 and estimate_tokens(compacted) > token_budget:
+        summary_lines.append(_summarize_turn(turns.pop(0)))
+        summary_lines = summary_lines[-MAX_SUMMARY_LINES:]
+        stats["summarized_turns"] += 1
+        compacted = assemble()
+
+    # 3. Shorten answered tool results in the current turn (keep the latest round)
+    if estimate_tokens(compacted) > token_budget and turns:
+        current = turns[-1]
+        names = _tool_names(current)
+        last_result_index = max(
+            (i for i, m in enumerate(current) if m.get("role") == "user" and isinstance(m.get("content"), list)),
+            default=None,
+        )
+        new_current = []
+        for i, message in enumerate(current):
+            if i != last_result_index:
+                message, count = _shorten_tool_results(message, names, max_tool_result_chars)
+                stats["shortened"] += count
+            new_current.append(message)
+        turns[-1] = new_current
+        compacted = assemble()
+
+    # 4. Drop the oldest summary lines if the current turn alone is near the budget
+    while summary_lines and estimate_tokens(compacted) > token_budget:
+        summary_lines.pop(0)
+        compacted = assemble()
+
+    stats["tokens_after"] = estimate_tokens(compacted)
+    return compacted, stats
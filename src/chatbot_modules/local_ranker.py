@@ -0,0 +1,208 @@
+"""
+Deterministic local ranking of per-day candidate pools.
+
+Scores every candidate in a pool at once (a NumPy feature matrix times a
+weight vector) on:
+- requirement match (cuisine / dietary tags for the day)
+- freshness vs. recent meals, favourites, profile cuisines and proteins
+- time budget (weeknight vs. weekend limits from the user profile)
+- cuisine and protein diversity against the days already picked
+
+Days are ranked greedily in date order so diversity accounts for earlier
+picks. A day is a clear win when its best score beats the runner-up by at
+least CLEAR_WIN_MARGIN; only close calls (or subjective requests) need the LLM.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date as date_cls
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from tag_canon import CANON_CUISINES, TAG_SYNONYMS
+
+logger = logging.getLogger(__name__)
+
+# Feature weights (columns of the feature matrix, in this order)
+FEATURE_WEIGHTS: Dict[str, float] = {
+    "requirement": 2.0,       # Fraction of the day's cuisine/dietary tags present
+    "fresh": 1.5,             # Not eaten recently
+    "favorite": 1.0,          # Starred or highly rated before
+    "profile_cuisine": 0.5,   # One of the user's favourite cuisines
+    "profile_protein": 0.4,   # One of the user's preferred proteins
+    "cuisine_repeat": -0.8,   # Cuisine already picked this week
+    "protein_repeat": -0.6,   # Protein already picked this week
+    "over_time": -1.0,        # Fraction over the day's time budget (capped at 1)
+    "disliked": -1.5,         # Contains a disliked ingredient
+    "pool_rank": 0.1,         # Earlier in the (freshness-sorted) pool
+}
+CLEAR_WIN_MARGIN = 0.5
+
+# Requests needing judgement the scores cannot capture
+SUBJECTIVE_TERMS = (
+    "fancy", "impress", "special", "romantic", "date night", "comfort", "cozy", "cosy",
+    "adventurous", "creative", "interesting", "unusual", "something different",
+    "fun", "festive", "elegant", "hearty", "light", "seasonal", "indulgent",
+)
+
+PROTEIN_KEYWORDS: Dict[str, Sequence[str]] = {
+    "chicken": ("chicken",),
+    "beef": ("beef", "steak", "brisket", "meatball", "burger"),
+    "pork": ("pork", "bacon", "ham", "sausage", "chorizo"),
+    "seafood": ("shrimp", "salmon", "fish", "tuna", "cod", "tilapia", "scallop", "crab", "seafood", "prawn"),
+    "turkey": ("turkey",),
+    "lamb": ("lamb",),
+    "plant": ("tofu", "tempeh", "lentil", "chickpea", "bean"),
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def is_subjective_request(message: Optional[str]) -> bool:
+    """True if the request asks for something the local scores can't judge."""
+    if not message:
+        return False
+    lower = message.lower()
+    return any(re.search(rf"\b{re.escape(term)}\b", lower) for term in SUBJECTIVE_TERMS)
+
+
+def recipe_protein(recipe: Any) -> Optional[str]:
+    """Main protein guessed from the recipe name, then its ingredients."""
+    for text in (recipe.name or "", " ".join(recipe.ingredients or [])):
+        words = set(_WORD_RE.findall(text.lower()))
+        for protein, keywords in PROTEIN_KEYWORDS.items():
+            if any(k in words or f"{k}s" in words for k in keywords):
+                return protein
+    return None
+
+
+def recipe_cuisine(recipe: Any) -> Optional[str]:
+    """First canonical cuisine tag on the recipe."""
+    for tag in recipe.tags or []:
+        if tag in CANON_CUISINES:
+            return tag
+    return None
+
+
+def _has_tag(tags: Set[str], tag: str) -> bool:
+    return bool(tags & TAG_SYNONYMS.get(tag, {tag})) or tag in tags
+
+
+@dataclass
+class DayRanking:
+    """A day's pool ordered best-first with scores."""
+    date: str
+    ranked: List[Any]
+    scores: np.ndarray
+
+    @property
+    def best(self) -> Optional[Any]:
+        return self.ranked[0] if self.ranked else None
+
+    @property
+    def margin(self) -> float:
+        if len(self.scores) < 2:
+            return float("inf")
+        return float(self.scores[0] - self.scores[1])
+
+    @property
+    def is_clear(self) -> bool:
+        return bool(self.ranked) and self.margin >= CLEAR_WIN_MARGIN
+
+
+class LocalRanker:
+    """Scores candidate pools from recent meals, favourites and the user profile."""
+
+    def __init__(
+        self,
+        recent_meals: Optional[List[str]] = None,
+        favorites: Optional[List[Dict]] = None,
+        user_profile: Any = None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.recent = {name.lower() for name in recent_meals or []}
+        self.favorite_ids = {str(f.get("recipe_id")) for f in favorites or [] if f.get("recipe_id")}
+        self.favorite_names = {f["recipe_name"].lower() for f in favorites or [] if f.get("recipe_name")}
+        self.profile = user_profile
+        self.profile_cuisines = {c.lower() for c in getattr(user_profile, "favorite_cuisines", None) or []}
+        self.profile_proteins = {p.lower() for p in getattr(user_profile, "preferred_proteins", None) or []}
+        self.disliked = [d.lower() for d in getattr(user_profile, "disliked_ingredients", None) or []]
+        weights = {**FEATURE_WEIGHTS, **(weights or {})}
+        self.weights = np.array([weights[name] for name in FEATURE_WEIGHTS])
+
+    def time_budget(self, day: str) -> Optional[int]:
+        """Minutes available on a date (weekend vs. weeknight), if the profile sets it."""
+        if self.profile is None:
+            return None
+        try:
+            weekend = date_cls.fromisoformat(day).weekday() >= 5
+        except ValueError:
+            weekend = False
+        return self.profile.max_weekend_cooking_time if weekend else self.profile.max_weeknight_cooking_time
+
+    def features(self, pool: List[Any], req: Any, used_cuisines: Set[str], used_proteins: Set[str]) -> np.ndarray:
+        """Feature matrix (len(pool) x len(FEATURE_WEIGHTS)) for a day's pool."""
+        wanted = [t for t in [getattr(req, "cuisine", None)] if t]
+        wanted += list(getattr(req, "dietary_hard", []) or []) + list(getattr(req, "dietary_soft", []) or [])
+        budget = self.time_budget(req.date)
+        n = len(pool)
+
+        matrix = np.zeros((n, len(FEATURE_WEIGHTS)))
+        for i, recipe in enumerate(pool):
+            tags = set(recipe.tags or [])
+            cuisine = recipe_cuisine(recipe)
+            protein = recipe_protein(recipe)
+            ingredients = " ".join(recipe.ingredients or []).lower()
+            minutes = getattr(recipe, "estimated_time", None)
+            matrix[i] = (
+                sum(_has_tag(tags, t) for t in wanted) / len(wanted) if wanted else 1.0,
+                recipe.name.lower() not in self.recent,
+                str(recipe.id) in self.favorite_ids or recipe.name.lower() in self.favorite_names,
+                cuisine in self.profile_cuisines,
+                protein in self.profile_proteins,
+                cuisine is not None and cuisine in used_cuisines,
+                protein is not None and protein in used_proteins,
+                min(1.0, max(0, minutes - budget) / budget) if budget and minutes else 0.0,
+                any(d in ingredients for d in self.disliked),
+                1.0 - i / n,
+            )
+        return matrix
+
+    def rank_pool(self, pool: List[Any], req: Any, used_cuisines: Set[str] = frozenset(),
+                  used_proteins: Set[str] = frozenset()) -> DayRanking:
+        """Rank one day's pool best-first (ties keep pool order)."""
+        if not pool:
+            return DayRanking(date=req.date, ranked=[], scores=np.zeros(0))
+        scores = self.features(pool, req, used_cuisines, used_proteins) @ self.weights
+        order = np.argsort(-scores, kind="stable")
+        return DayRanking(date=req.date, ranked=[pool[i] for i in order], scores=scores[order])
+
+    def rank_week(self, candidates_by_date: Dict[str, List], day_requirements: List[Any],
+                  already_picked: Iterable[Any] = ()) -> Dict[str, DayRanking]:
+        """
+        Rank every day in date order, penalising cuisines/proteins already picked.
+
+        already_picked: Recipes fixed for other days; they count as picked
+        before the first day is ranked.
+        """
+        rankings: Dict[str, DayRanking] = {}
+        already_picked = list(already_picked)
+        used_cuisines: Set[str] = {recipe_cuisine(r) for r in already_picked}
+        used_proteins: Set[str] = {recipe_protein(r) for r in already_picked}
+        picked_ids: Set[str] = {str(r.id) for r in already_picked}
+        used_cuisines.discard(None)
+        used_proteins.discard(None)
+        for req in day_requirements:
+            full_pool = candidates_by_date.get(req.date, [])
+            pool = [r for r in full_pool if str(r.id) not in picked_ids] or full_pool
+            ranking = self.rank_pool(pool, req, used_cuisines, used_proteins)
+            rankings[req.date] = ranking
+            if ranking.best is not None:
+                picked_ids.add(str(ranking.best.id))
+                used_cuisines.add(recipe_cuisine(ranking.best))
+                used_proteins.add(recipe_protein(ranking.best))
+            used_cuisines.discard(None)
+            used_proteins.discard(None)
+        return rankings
@@ -0,0 +1,334 @@
+"""
+In-memory inverted index over recipe names.
+
+Each name is split into lowercase word tokens; every token maps to a sorted
+NumPy array of document positions (its posting list). Matching a set of
+keywords scores every recipe in one pass over the keywords' posting lists,
+mirroring the fuzzy matcher's score_match: +10 for a keyword that is a whole
+word of the name, +5 when it is only the prefix of a word ("taco" -> "tacos").
+Candidates come from the rarest keywords' lists and are checked against the
+others by binary search, so the cost follows the rare keywords, not the
+number of recipes.
+
+For free-text names with no keyword hit, similar() ranks names by trigram
+similarity (shared / union of pg_trgm-style word trigrams). Candidates are
+gathered from the query's rarest trigrams up to a posting budget, then
+scored exactly from each name's stored trigram ids, so a lookup touches a
+few thousand names instead of the whole table.
+
+The index is built once per recipes.db version (mtime, size, inode) and
+shared process-wide; warm_name_index() builds it in the background at startup
+so the first plan request doesn't pay for it.
+"""
+
+import bisect
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from data.database import PoolCache
+
+logger = logging.getLogger(__name__)
+
+EXACT_SCORE = 10
+PARTIAL_SCORE = 5
+MAX_PREFIX_EXPANSIONS = 64  # Longer words sharing a keyword's prefix, per keyword
+TRIGRAM_CANDIDATE_BUDGET = 5000  # Postings read to collect similar() candidates
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(name: str) -> List[str]:
+    """Lowercase word tokens of a recipe or meal name."""
+    return _TOKEN_RE.findall(name.lower())
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct trigrams of each word padded as "  word " (as pg_trgm does)."""
+    grams = []
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return list(dict.fromkeys(grams))
+
+
+def _contains(sorted_docs: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Boolean mask of values present in a sorted posting array."""
+    if not len(sorted_docs):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_docs, values), len(sorted_docs) - 1)
+    return sorted_docs[positions] == values
+
+
+def _sorted_union(arrays: List[np.ndarray]) -> np.ndarray:
+    """Union of sorted posting arrays, sorted and without duplicates."""
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return np.zeros(0, dtype=np.int32)
+    if len(arrays) == 1:
+        return arrays[0]
+    merged = np.sort(np.concatenate(arrays))
+    return merged[np.concatenate(([True], merged[1:] != merged[:-1]))]
+
+
+def _group_postings(ids: Dict[str, int], key_col: Sequence[int], doc_col: Sequence[int]) -> Dict[str, np.ndarray]:
+    """Group (key id, doc) pairs into key -> sorted doc array (views into one array)."""
+    keys = np.asarray(key_col, dtype=np.int32)
+    docs = np.asarray(doc_col, dtype=np.int32)
+    # A stable sort by key keeps each list in doc order
+    postings = docs[np.argsort(keys, kind="stable")]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=len(ids)))))
+    return {key: postings[offsets[i]:offsets[i + 1]] for key, i in ids.items()}
+
+
+@dataclass
+class NameMatch:
+    """A recipe whose name matched some of the keywords."""
+    recipe_id: str
+    name: str
+    score: int
+    matched: int  # Number of distinct keywords found in the name
+
+
+@dataclass
+class SimilarName:
+    """A recipe name close to a free-text query."""
+    recipe_id: str
+    name: str
+    similarity: float  # Shared trigrams / all trigrams of both, 0..1
+
+
+class RecipeNameIndex:
+    """Token -> sorted posting array index over recipe names."""
+
+    def __init__(self, ids: Sequence[str], names: Sequence[str]):
+        self.ids = list(ids)
+        self.names = list(names)
+
+        token_ids: Dict[str, int] = {}
+        token_col: List[int] = []
+        doc_col: List[int] = []
+        gram_ids: Dict[str, int] = {}
+        gram_col: List[int] = []
+        token_grams: Dict[str, Tuple[int, ...]] = {}  # Words repeat a lot; split each once
+        gram_counts = np.zeros(len(self.names), dtype=np.int32)
+        lengths = np.zeros(len(self.names), dtype=np.int32)
+        for doc, name in enumerate(self.names):
+            tokens = set(tokenize(name or ""))
+            lengths[doc] = len(tokens)
+            grams = set()
+            for token in tokens:
+                token_col.append(token_ids.setdefault(token, len(token_ids)))
+                doc_col.append(doc)
+                if token not in token_grams:
+                    token_grams[token] = tuple(gram_ids.setdefault(g, len(gram_ids)) for g in trigrams(token))
+                grams.update(token_grams[token])
+            gram_counts[doc] = len(grams)
+            gram_col.extend(grams)
+
+        self._postings = _group_postings(token_ids, token_col, doc_col)
+        self._vocab = sorted(token_ids)
+        self._lengths = lengths
+
+        # Trigram ids per name (CSR layout) plus trigram -> sorted posting arrays
+        gram_dtype = np.uint16 if len(gram_ids) <= np.iinfo(np.uint16).max else np.int32
+        self._gram_ids = gram_ids
+        self._doc_grams = np.array(gram_col, dtype=gram_dtype)
+        self._gram_offsets = np.concatenate(([0], np.cumsum(gram_counts))).astype(np.int64)
+        gram_docs = np.repeat(np.arange(len(self.names), dtype=np.int32), gram_counts)
+        self._gram_postings = _group_postings(gram_ids, self._doc_grams, gram_docs)
+
+    @classmethod
+    def from_db(cls, recipes_db: Path) -> "RecipeNameIndex":
+        """Build the index from every recipe name in recipes.db."""
+        start = time.time()
+        with sqlite3.connect(recipes_db) as conn:
+            rows = conn.execute("SELECT id, name FROM recipes").fetchall()
+        index = cls([str(r[0]) for r in rows], [r[1] or "" for r in rows])
+        logger.info(f"[NAME-INDEX] Built index of {len(index)} names, {len(index._vocab)} tokens "
+                    f"in {(time.time() - start) * 1000:.0f}ms")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def postings(self, token: str) -> np.ndarray:
+        """Sorted doc positions whose name contains token as a whole word."""
+        return self._postings.get(token, np.zeros(0, dtype=np.int32))
+
+    def prefix_postings(self, prefix: str) -> np.ndarray:
+        """Sorted doc positions with a longer word starting with prefix."""
+        start = bisect.bisect_right(self._vocab, prefix)
+        lists = []
+        for token in self._vocab[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            lists.append(self._postings[token])
+        if not lists:
+            return np.zeros(0, dtype=np.int32)
+        return _sorted_union(lists)
+
+    def search(self, keywords: Sequence[str], limit: int = 15, min_matched: int = 1) -> List[NameMatch]:
+        """
+        Rank recipes by how well their names match the keywords.
+
+        Args:
+            keywords: Lowercase keywords (duplicates are ignored)
+            limit: Maximum matches to return
+            min_matched: Only return names containing at least this many keywords
+
+        Returns:
+            Matches best-first: highest score, then fewest extra words in the
+            name, then index order
+        """
+        keywords = list(dict.fromkeys(k.lower() for k in keywords if k))
+        min_matched = min(max(1, min_matched), len(keywords))
+        if not keywords or not self.names:
+            return []
+
+        lists = []
+        for keyword in keywords:
+            exact = self.postings(keyword)
+            lists.append((exact, self.prefix_postings(keyword)))
+
+        # A name matching min_matched of m keywords contains at least one of
+        # any m - min_matched + 1 keywords, so only the rarest ones drive
+        drivers = sorted(lists, key=lambda pair: len(pair[0]) + len(pair[1]))
+        drivers = drivers[:len(keywords) - min_matched + 1]
+        candidates = _sorted_union([arr for pair in drivers for arr in pair])
+        if not len(candidates):
+            return []
+
+        scores = np.zeros(len(candidates), dtype=np.int32)
+        matched = np.zeros(len(candidates), dtype=np.int32)
+        for exact, partial in lists:
+            in_exact = _contains(exact, candidates)
+            in_partial = ~in_exact & _contains(partial, candidates)
+            scores += EXACT_SCORE * in_exact + PARTIAL_SCORE * in_partial
+            matched += in_exact | in_partial
+
+        keep = matched >= min_matched
+        candidates, scores, matched = candidates[keep], scores[keep], matched[keep]
+        if not len(candidates):
+            return []
+
+        # Prefer tighter names among equal scores: key = score, then -length
+        key = scores.astype(np.int64) * 1024 - np.minimum(self._lengths[candidates], 1023)
+        if len(candidates) > limit:
+            threshold = np.partition(key, len(key) - limit)[len(key) - limit]
+            keep = key >= threshold
+            candidates, scores, matched, key = candidates[keep], scores[keep], matched[keep], key[keep]
+        top = np.argsort(-key, kind="stable")[:limit]
+
+        return [
+            NameMatch(recipe_id=self.ids[candidates[i]], name=self.names[candidates[i]],
+                      score=int(scores[i]), matched=int(matched[i]))
+            for i in top
+        ]
+
+    def similar(self, text: str, k: int = 5, min_similarity: float = 0.0) -> List[SimilarName]:
+        """
+        Top-k recipe names by trigram similarity to free text.
+
+        Approximate: only names sharing one of the query's rarest trigrams
+        (up to TRIGRAM_CANDIDATE_BUDGET postings) are scored.
+
+        Args:
+            text: Free-text dish name, e.g. "Peruvian Roasted Chicken"
+            k: Maximum names to return
+            min_similarity: Drop names scoring below this
+
+        Returns:
+            Names best-first by similarity, ties in index order
+        """
+        grams = trigrams(text)
+        known = [g for g in grams if g in self._gram_ids]
+        if not known:
+            return []
+
+        # Rarest trigrams first until the posting budget is spent
+        lists = sorted((self._gram_postings[g] for g in known), key=len)
+        budget, used = TRIGRAM_CANDIDATE_BUDGET, []
+        for postings in lists:
+            if used and budget < len(postings):
+                break
+            used.append(postings)
+            budget -= len(postings)
+        candidates = _sorted_union(used)
+
+        # Count shared trigrams per candidate from its stored trigram ids
+        starts = self._gram_offsets[candidates]
+        counts = self._gram_offsets[candidates + 1] - starts
+        positions = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        positions += np.arange(len(positions))
+        in_query = np.zeros(len(self._gram_ids), dtype=bool)
+        in_query[[self._gram_ids[g] for g in known]] = True
+        hits = in_query[self._doc_grams[positions]]
+        shared = np.add.reduceat(hits, np.concatenate(([0], np.cumsum(counts)[:-1]))).astype(np.float64)
+        similarity = shared / (len(grams) + counts - shared)
+
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        if len(candidates) > k:
+            threshold = np.partition(similarity, len(similarity) - k)[len(similarity) - k]
+            keep = similarity >= threshold
+            candidates, similarity = candidates[keep], similarity[keep]
+        top = np.argsort(-similarity, kind="stable")[:k]
+
+        return [
+            SimilarName(recipe_id=self.ids[candidates[i]], name=self.names[candidates[i]],
+                        similarity=round(float(similarity[i]), 4))
+            for i in top
+        ]
+
+
+_indexes: Dict[str, Tuple[Tuple[int, int, int], RecipeNameIndex]] = {}
+_index_lock = threading.Lock()
+
+
+def get_name_index(recipes_db: Path) -> Optional[RecipeNameIndex]:
+    """
+    Get the shared name index for recipes.db, building it if needed.
+
+    Rebuilt when the file changes; returns None if the database is missing
+    or has no recipes table.
+    """
+    version = PoolCache.db_version(recipes_db)
+    if version is None:
+        return None
+    path = str(recipes_db)
+    cached = _indexes.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _index_lock:
+        cached = _indexes.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        try:
+            index = RecipeNameIndex.from_db(recipes_db)
+        except sqlite3.Error as e:
+            logger.warning(f"[NAME-INDEX] Could not build index for {path}: {e}")
+            return None
+        _indexes[path] = (version, index)
+        return index
+
+
+def warm_name_index(recipes_db: Path) -> threading.Thread:
+    """Build the name index in a background thread (call at startup)."""
+    thread = threading.Thread(target=get_name_index, args=(recipes_db,), daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_name_indexes():
+    """Drop all built indexes."""
+    with _index_lock:
+        _indexes.clear()
@@ -4,9 +4,11 @@ Pool builder for meal planning candidate generation.
 Extracted from chatbot.py - builds per-day candidate pools based on parsed requirements.
 """
 
+import hashlib
 import time
 import logging
-from typing import Dict, List, Tuple, Set, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Collection, Dict, Hashable, List, Optional, Set, Tuple
 
 from tag_canon import CANON_COURSE_EXCLUDE
 from requirements_parser import DayRequirement
@@ -15,6 +17,158 @@ logger = logging.getLogger(__name__)
 
 # Pool configuration
 POOL_SIZE = 80  # Fetch 80 candidates per day
+MAX_SPECULATIVE_CUISINES = 2  # Profile cuisines pre-built while the query-param LLM call runs
+POOL_QUERY_WORKERS = 4  # Distinct filter signatures queried concurrently
+
+DEFAULT_QUERY_PARAMS = {"include_tags": ["main-dish"], "query": None}
+
+# (include_tags, query) as passed to search_recipes_sampled
+QuerySignature = Tuple[Tuple[str, ...], Optional[str]]
+
+
+def stable_seed(*parts: Any) -> int:
+    """
+    31-bit seed derived from parts with blake2b.
+
+    Unlike hash(), which PYTHONHASHSEED salts per interpreter, the result is
+    the same in every process, so workers draw identical pools.
+    """
+    key = "\x1f".join(str(part) for part in parts).encode()
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") & (2**31 - 1)
+
+
+def day_seed(user_id: Optional[str], week_of: Optional[str], day_idx: int) -> int:
+    """Sampling seed for a day's position in a user's week."""
+    return stable_seed(user_id or "default", week_of or "unknown", day_idx)
+
+
+def v2_include_tags(params: Dict) -> List[str]:
+    """include_tags from LLM query params, always starting with main-dish."""
+    include_tags = params.get("include_tags") or ["main-dish"]
+    if "main-dish" not in include_tags:
+        include_tags = ["main-dish"] + list(include_tags)
+    return list(include_tags)
+
+
+def query_signature(params: Dict) -> QuerySignature:
+    """Signature of LLM query params: identical signatures run identical queries."""
+    return tuple(v2_include_tags(params)), params.get("query") or None
+
+
+def _filter_signature(request: Dict[str, Any]) -> Tuple:
+    """Everything except the seed: requests with equal signatures share a candidate set."""
+    return (
+        tuple(request.get("include_tags") or ()),
+        tuple(sorted(request.get("exclude_tags") or ())),
+        tuple(sorted(str(i) for i in request.get("exclude_ids") or ())),
+        request.get("query") or None,
+    )
+
+
+def fetch_pools(
+    db,
+    requests: Dict[Hashable, Dict[str, Any]],
+    limit: int = POOL_SIZE,
+) -> Tuple[Dict[Hashable, List], Dict[Hashable, float]]:
+    """
+    Fetch raw pools, querying each distinct filter signature once.
+
+    Requests with identical filters (include_tags, exclude_tags, exclude_ids,
+    query) are grouped; each group runs one search_recipes_sampled_batch()
+    that draws a seeded sample per request. Distinct groups run concurrently.
+
+    Args:
+        db: DatabaseInterface instance
+        requests: key -> {include_tags, exclude_tags, exclude_ids, query, seed}
+        limit: Pool size per request
+
+    Returns:
+        Tuple of (pool by key, seconds by key - a group's query time split across its members)
+    """
+    groups: Dict[Tuple, List[Hashable]] = {}
+    for key, request in requests.items():
+        groups.setdefault(_filter_signature(request), []).append(key)
+
+    def run(signature: Tuple, keys: List[Hashable]):
+        include_tags, exclude_tags, exclude_ids, query = signature
+        start = time.time()
+        samples = db.search_recipes_sampled_batch(
+            include_tags=list(include_tags),
+            exclude_tags=list(exclude_tags),
+            exclude_ids=list(exclude_ids) or None,
+            query=query,
+            limit=limit,
+            seeds=[requests[key].get("seed") for key in keys],
+        )
+        return samples, time.time() - start
+
+    if len(groups) == 1:
+        results = [run(*next(iter(groups.items())))]
+    else:
+        with ThreadPoolExecutor(max_workers=min(POOL_QUERY_WORKERS, len(groups))) as executor:
+            results = list(executor.map(lambda item: run(*item), groups.items()))
+
+    pools: Dict[Hashable, List] = {}
+    timing: Dict[Hashable, float] = {}
+    for keys, (samples, elapsed) in zip(groups.values(), results):
+        for key, pool in zip(keys, samples):
+            pools[key] = pool
+            timing[key] = elapsed / len(keys)
+
+    logger.info(f"[POOL-BATCH] {len(requests)} pools from {len(groups)} distinct queries")
+    return pools, timing
+
+
+def speculative_query_params(user_profile: Any = None) -> List[Dict]:
+    """
+    Query params worth building before the LLM returns.
+
+    Always the default main-dish pool, plus one pool per favourite cuisine
+    from the user's profile (capped at MAX_SPECULATIVE_CUISINES).
+    """
+    options = [dict(DEFAULT_QUERY_PARAMS)]
+    cuisines = getattr(user_profile, "favorite_cuisines", None) or []
+    for cuisine in cuisines[:MAX_SPECULATIVE_CUISINES]:
+        options.append({"include_tags": ["main-dish", cuisine.lower()], "query": None})
+    return options
+
+
+def build_speculative_pools(
+    db,
+    dates: List[str],
+    params_options: List[Dict],
+    user_id: str = None,
+    week_of: str = None,
+) -> Dict[Tuple[str, QuerySignature], List]:
+    """
+    Pre-build raw (unfiltered) v2 pools for every date and each params option.
+
+    Seeds match build_per_day_pools_v2 when it is given params in `dates`
+    order, so a reused pool is exactly what a fresh query would return.
+
+    Returns:
+        Dict mapping (date, query_signature) -> raw pool
+    """
+    start = time.time()
+    exclude_tags = list(CANON_COURSE_EXCLUDE)
+    requests: Dict[Tuple[str, QuerySignature], Dict[str, Any]] = {}
+
+    for day_idx, date in enumerate(dates):
+        for params in params_options:
+            signature = query_signature(params)
+            requests[(date, signature)] = {
+                "include_tags": list(signature[0]),
+                "exclude_tags": exclude_tags,
+                "query": signature[1],
+                "seed": day_seed(user_id, week_of, day_idx),
+            }
+
+    pools, _ = fetch_pools(db, requests)
+
+    logger.info(f"[POOL-SPECULATE] Built {len(pools)} speculative pools for {len(dates)} days "
+                f"in {(time.time() - start) * 1000:.0f}ms")
+    return pools
 
 
 def build_per_day_pools(
@@ -27,12 +181,14 @@ def build_per_day_pools(
     week_of: str = None,
     verbose: bool = False,
     verbose_callback: Optional[Callable[[str], None]] = None,
+    only_dates: Optional[Collection[str]] = None,
 ) -> Tuple[Dict[str, List], Dict[str, float]]:
     """
     Build per-day candidate pools based on parsed requirements.
 
     Uses seeded random sampling for reproducible results within a week
-    while providing variety across weeks (Phase 1 latency fix).
+    (in any process or worker) while providing variety across weeks
+    (Phase 1 latency fix).
 
     Args:
         db: DatabaseInterface instance for recipe queries
@@ -44,6 +200,9 @@ def build_per_day_pools(
         week_of: Week start date for seed generation
         verbose: Enable verbose output
         verbose_callback: Callback function for verbose output
+        only_dates: If set, only build pools for these dates (for retrying
+            failed days); each day keeps its seed from its position in
+            day_requirements
 
     Returns:
         Tuple of (candidates_by_date dict, timing_by_date dict)
@@ -51,15 +210,17 @@ def build_per_day_pools(
     candidates_by_date: Dict[str, List] = {}
     timing_by_date: Dict[str, float] = {}
     excluded_ids_by_date = excluded_ids_by_date or {}
+    days = [
+        (day_idx, req) for day_idx, req in enumerate(day_requirements)
+        if only_dates is None or req.date in only_dates
+    ]
 
-    # Generate stable seed for this user + week (Phase 1: seeded sampling)
-    seed_base = hash(f"{user_id or 'default'}_{week_of or 'unknown'}") % (2**31)
-
-    logger.info(f"[POOL-BUILD] Starting per-day pool construction (POOL_SIZE={POOL_SIZE}, seed_base={seed_base})")
-
-    for day_idx, req in enumerate(day_requirements):
-        pool_start = time.time()
+    logger.info(f"[POOL-BUILD] Starting per-day pool construction (POOL_SIZE={POOL_SIZE}, "
+                f"seed_key={user_id or 'default'}/{week_of or 'unknown'})")
 
+    # 1. Describe each day's query; days with identical filters share one query
+    requests: Dict[int, Dict[str, Any]] = {}
+    for day_idx, req in days:
         # Build tag requirements
         include_tags = ["main-dish"]  # Always require main dish for dinner
         exclude_tags = list(CANON_COURSE_EXCLUDE)  # Exclude desserts, beverages, etc.
@@ -73,25 +234,30 @@ def build_per_day_pools(
             include_tags.append(diet)
 
         # Get excluded IDs for this date (from previous retry failures)
-        exclude_ids = list(excluded_ids_by_date.get(req.date, set()))
-
-        # Per-day seed variation (same week, different days get different samples)
-        day_seed = seed_base + day_idx
+        exclude_ids = sorted(str(id) for id in excluded_ids_by_date.get(req.date, set()))
 
         # Build search query from unhandled constraints (user-specified recipe keywords)
         search_query = None
         if req.unhandled:
             search_query = " ".join(req.unhandled)
 
-        # Query database using seeded sampling (Phase 1 latency fix)
-        pool = db.search_recipes_sampled(
-            include_tags=include_tags,
-            exclude_tags=exclude_tags,
-            exclude_ids=[str(id) for id in exclude_ids] if exclude_ids else None,
-            query=search_query,
-            limit=POOL_SIZE,
-            seed=day_seed,
-        )
+        requests[day_idx] = {
+            "include_tags": include_tags,
+            "exclude_tags": exclude_tags,
+            "exclude_ids": exclude_ids or None,
+            "query": search_query,
+            # Per-day seed variation (same week, different days get different samples)
+            "seed": day_seed(user_id, week_of, day_idx),
+        }
+
+    # 2. Query database using seeded sampling (one query per distinct filter set)
+    raw_pools, query_timing = fetch_pools(db, requests)
+
+    # 3. Per-day post-processing
+    for day_idx, req in days:
+        pool_start = time.time()
+        pool = raw_pools[day_idx]
+        exclude_ids = requests[day_idx]["exclude_ids"]
 
         # Apply allergen filtering using structured ingredients
         if exclude_allergens:
@@ -112,21 +278,20 @@ def build_per_day_pools(
             pool = fresh + stale  # Fresh first, then stale as backup
 
         candidates_by_date[req.date] = pool
-        pool_time = time.time() - pool_start
-        timing_by_date[req.date] = pool_time
+        timing_by_date[req.date] = query_timing[day_idx] + (time.time() - pool_start)
 
-        # Post-processing logging (query logging handled by search_recipes_sampled)
+        # Post-processing logging (query logging handled by search_recipes_sampled_batch)
         if freshness_applied:
             logger.info(f"[POOL-POST] {req.date}: freshness_penalty_applied=True")
         if exclude_ids:
             logger.info(f"[POOL-POST] {req.date}: excluded_ids={len(exclude_ids)}")
 
         if verbose and verbose_callback:
-            tags_str = ", ".join(include_tags)
+            tags_str = ", ".join(requests[day_idx]["include_tags"])
             verbose_callback(f"      → {req.date}: {len(pool)} candidates ({tags_str})")
 
     total_candidates = sum(len(p) for p in candidates_by_date.values())
-    logger.info(f"[POOL-BUILD] Complete: {total_candidates} total candidates across {len(day_requirements)} days")
+    logger.info(f"[POOL-BUILD] Complete: {total_candidates} total candidates across {len(days)} days")
 
     return candidates_by_date, timing_by_date
 
@@ -140,6 +305,7 @@ def build_per_day_pools_v2(
     week_of: str = None,
     verbose: bool = False,
     verbose_callback: Optional[Callable[[str], None]] = None,
+    speculative_pools: Optional[Dict[Tuple[str, QuerySignature], List]] = None,
 ) -> Tuple[Dict[str, List], Dict[str, float]]:
     """
     Build candidate pools using LLM-generated query parameters.
@@ -156,42 +322,55 @@ def build_per_day_pools_v2(
         week_of: Week start date for seed generation
         verbose: Enable verbose output
         verbose_callback: Callback for verbose output
+        speculative_pools: Raw pools from build_speculative_pools; dates whose
+            params match are reused and only mismatched dates are queried
 
     Returns:
         Tuple of (candidates_by_date dict, timing_by_date dict)
     """
     candidates_by_date: Dict[str, List] = {}
     timing_by_date: Dict[str, float] = {}
+    speculative_pools = speculative_pools or {}
 
-    # Generate stable seed for this user + week
-    seed_base = hash(f"{user_id or 'default'}_{week_of or 'unknown'}") % (2**31)
-
-    logger.info(f"[POOL-BUILD-V2] Starting pool construction (POOL_SIZE={POOL_SIZE}, seed_base={seed_base})")
+    logger.info(f"[POOL-BUILD-V2] Starting pool construction (POOL_SIZE={POOL_SIZE}, "
+                f"seed_key={user_id or 'default'}/{week_of or 'unknown'})")
 
     exclude_tags = list(CANON_COURSE_EXCLUDE)
 
+    # 1. Reuse speculative pools; describe the remaining days' queries
+    raw_pools: Dict[str, List] = {}
+    query_timing: Dict[str, float] = {}
+    requests: Dict[str, Dict[str, Any]] = {}
     for day_idx, (date, params) in enumerate(query_params_by_date.items()):
-        pool_start = time.time()
-
-        include_tags = params.get("include_tags", ["main-dish"])
-        query = params.get("query")
-
         # Ensure main-dish is always included
-        if "main-dish" not in include_tags:
-            include_tags = ["main-dish"] + list(include_tags)
-
-        # Per-day seed variation
-        day_seed = seed_base + day_idx
+        include_tags = v2_include_tags(params)
+        query = params.get("query")
 
         logger.info(f"[POOL-BUILD-V2] {date}: include_tags={include_tags}, query={query}")
 
-        pool = db.search_recipes_sampled(
-            include_tags=include_tags,
-            exclude_tags=exclude_tags,
-            query=query,
-            limit=POOL_SIZE,
-            seed=day_seed,
-        )
+        pool = speculative_pools.get((date, query_signature(params)))
+        if pool is not None:
+            raw_pools[date] = pool
+            query_timing[date] = 0.0
+        else:
+            requests[date] = {
+                "include_tags": include_tags,
+                "exclude_tags": exclude_tags,
+                "query": query,
+                "seed": day_seed(user_id, week_of, day_idx),  # Per-day seed variation
+            }
+    reused = len(raw_pools)
+
+    # 2. One query per distinct filter set, distinct sets in parallel
+    if requests:
+        fetched, fetched_timing = fetch_pools(db, requests)
+        raw_pools.update(fetched)
+        query_timing.update(fetched_timing)
+
+    # 3. Per-day post-processing
+    for date, params in query_params_by_date.items():
+        pool_start = time.time()
+        pool = raw_pools[date]
 
         # Allergen filtering
         if exclude_allergens and pool:
@@ -212,15 +391,16 @@ def build_per_day_pools_v2(
             pool = fresh + stale
 
         candidates_by_date[date] = pool
-        pool_time = time.time() - pool_start
-        timing_by_date[date] = pool_time
+        timing_by_date[date] = query_timing[date] + (time.time() - pool_start)
 
         if verbose and verbose_callback:
-            tags_str = ", ".join(include_tags)
+            tags_str = ", ".join(v2_include_tags(params))
+            query = params.get("query")
             query_str = f", query='{query}'" if query else ""
             verbose_callback(f"      → {date}: {len(pool)} candidates ({tags_str}{query_str})")
 
     total_candidates = sum(len(p) for p in candidates_by_date.values())
-    logger.info(f"[POOL-BUILD-V2] Complete: {total_candidates} total candidates across {len(query_params_by_date)} days")
+    logger.info(f"[POOL-BUILD-V2] Complete: {total_candidates} total candidates across {len(query_params_by_date)} days "
+                f"(speculative_reused={reused}, queried={len(query_params_by_date) - reused})")
 
     return candidates_by_date, timing_by_date
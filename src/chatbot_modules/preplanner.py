@@ -0,0 +1,213 @@
+"""
+Background pre-planning of next week's draft plans.
+
+Planning latency is mostly work that doesn't depend on the request: loading
+history, profile and favourites, building candidate pools and picking a
+default selection. For every active user the preplanner does that ahead of
+time for next week (pools use the same per-day seeds as live planning, the
+draft comes from the local ranker, no LLM) and stores the result in the
+precomputed_plans table with a fingerprint of its inputs.
+
+handle_plan_meals_smart serves a draft when the request is a plain "plan my
+week" for dates the draft covers and the fingerprint still matches; drafts
+are single-use (claiming one deletes it atomically).
+
+Run it from cron (python src/main.py preplan) or in-process with
+start_preplan_timer().
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from data.database import PoolCache
+from data.models import MealPlan, PlannedMeal
+from requirements_parser import DayRequirement, parse_requirements
+from chatbot_modules.local_ranker import LocalRanker, is_subjective_request
+from chatbot_modules.pool_builder import build_per_day_pools
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_USER_WEEKS = 4  # Users with a plan saved this recently get drafts
+PRECOMPUTED_PLAN_MAX_AGE_HOURS = 48  # Older drafts are discarded, not served
+PREPLAN_INTERVAL_HOURS = 6.0  # Default period of the in-process timer
+MAX_BACKUPS = 20
+
+# Words parse_requirements leaves unhandled that don't constrain the plan
+GENERIC_PLAN_WORDS = {
+    "week", "weeks", "next", "this", "upcoming", "coming", "whole", "entire", "full",
+    "please", "thanks", "again", "usual", "normal", "regular", "varied", "variety",
+    "different", "new", "some", "dinner", "dinners", "meal", "meals", "day", "days",
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def next_week_dates(today: Optional[datetime] = None, num_days: int = 7) -> List[str]:
+    """ISO dates from next Monday (a week ahead if today is Monday)."""
+    today = today or datetime.now()
+    days_until_monday = (7 - today.weekday()) % 7 or 7
+    monday = (today + timedelta(days=days_until_monday)).date()
+    return [(monday + timedelta(days=i)).isoformat() for i in range(num_days)]
+
+
+def is_default_request(user_message: Optional[str], dates: List[str]) -> bool:
+    """True if the request asks for nothing beyond a plan for the dates."""
+    if not user_message:
+        return True
+    if is_subjective_request(user_message):
+        return False
+    for req in parse_requirements(user_message, dates):
+        if req.cuisine or req.dietary_hard or req.dietary_soft or req.surprise:
+            return False
+        words = set(_WORD_RE.findall(" ".join(req.unhandled).lower()))
+        if words - GENERIC_PLAN_WORDS:
+            return False
+    return True
+
+
+def load_planning_context(db, user_id: int) -> Tuple[List[str], Any, List[Dict]]:
+    """(recent meal names, user profile, favourites) as plan_meals_smart loads them."""
+    recent_meals = db.get_meal_history(user_id=user_id, weeks_back=2)
+    recent_names = [m.recipe.name for m in recent_meals] if recent_meals else []
+    user_profile = db.get_user_profile(user_id=user_id)
+    favorites = db.get_combined_favorites(user_id=user_id, limit=10)
+    return recent_names, user_profile, favorites
+
+
+def context_fingerprint(db, recent_names: List[str], user_profile: Any, favorites: List[Dict]) -> str:
+    """Digest of everything a draft depends on; any change makes the draft stale."""
+    payload = json.dumps({
+        "recipes_db": PoolCache.db_version(db.recipes_db),
+        "recent": recent_names,
+        "profile": user_profile.to_dict() if user_profile else None,
+        "favorites": [(f.get("recipe_id"), f.get("recipe_name")) for f in favorites or []],
+    }, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def precompute_plan(db, user_id: int, dates: Optional[List[str]] = None) -> bool:
+    """
+    Build and store a draft plan for one user.
+
+    Args:
+        db: DatabaseInterface instance
+        user_id: User to plan for
+        dates: Dates to draft (default: next_week_dates())
+
+    Returns:
+        True if a draft was stored
+    """
+    start = time.time()
+    dates = dates or next_week_dates()
+    recent_names, user_profile, favorites = load_planning_context(db, user_id)
+    allergens = list(getattr(user_profile, "allergens", None) or [])
+
+    day_requirements = [DayRequirement(date=d) for d in dates]
+    pools, _ = build_per_day_pools(
+        db=db,
+        day_requirements=day_requirements,
+        recent_names=recent_names,
+        exclude_allergens=allergens,
+        user_id=user_id,
+        week_of=dates[0],
+    )
+    rankings = LocalRanker(recent_names, favorites, user_profile).rank_week(pools, day_requirements)
+    meals = [
+        PlannedMeal(date=d, meal_type="dinner", recipe=rankings[d].best, servings=4)
+        for d in dates if rankings[d].best is not None
+    ]
+    if not meals:
+        logger.info(f"[PREPLAN] user={user_id}: no candidates, nothing stored")
+        return False
+
+    selected_ids = {m.recipe.id for m in meals}
+    backups = [r for d in dates for r in pools.get(d, []) if r.id not in selected_ids][:MAX_BACKUPS]
+    db.save_precomputed_plan(
+        user_id=user_id,
+        week_of=dates[0],
+        dates=[m.date for m in meals],
+        fingerprint=context_fingerprint(db, recent_names, user_profile, favorites),
+        meals=meals,
+        backups=backups,
+    )
+    logger.info(f"[PREPLAN] user={user_id}: drafted {len(meals)}/{len(dates)} days "
+                f"in {(time.time() - start) * 1000:.0f}ms")
+    return True
+
+
+def precompute_active_users(
+    db,
+    dates: Optional[List[str]] = None,
+    user_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, bool]:
+    """
+    Draft next week's plan for every active user (or the given users).
+
+    Returns:
+        Dict mapping user_id -> whether a draft was stored
+    """
+    dates = dates or next_week_dates()
+    user_ids = list(user_ids) if user_ids is not None else db.get_active_user_ids(ACTIVE_USER_WEEKS)
+    results: Dict[int, bool] = {}
+    for user_id in user_ids:
+        try:
+            results[user_id] = precompute_plan(db, user_id, dates)
+        except Exception as e:
+            logger.warning(f"[PREPLAN] user={user_id} failed: {e}")
+            results[user_id] = False
+    logger.info(f"[PREPLAN] Drafted {sum(results.values())}/{len(results)} users for {dates[0]}..{dates[-1]}")
+    return results
+
+
+def take_precomputed_plan(db, user_id: int, dates: List[str], week_of: str) -> Optional[MealPlan]:
+    """
+    Claim a fresh draft covering dates, or None.
+
+    The draft is claimed (deleted) before it is checked, so overlapping
+    requests can't both serve it. Drafts that are too old or whose inputs
+    changed since they were built are discarded instead of served.
+    """
+    draft = db.claim_precomputed_plan(user_id, dates)
+    if draft is None:
+        return None
+
+    recent_names, user_profile, favorites = load_planning_context(db, user_id)
+    too_old = datetime.now() - draft["created_at"] > timedelta(hours=PRECOMPUTED_PLAN_MAX_AGE_HOURS)
+    if too_old or draft["fingerprint"] != context_fingerprint(db, recent_names, user_profile, favorites):
+        logger.info(f"[PREPLAN] user={user_id}: draft for {draft['week_of']} is stale, discarded")
+        return None
+
+    wanted = set(dates)
+    return MealPlan(
+        week_of=week_of,
+        meals=[m for m in draft["meals"] if m.date in wanted],
+        preferences_applied=list(getattr(user_profile, "allergens", None) or []),
+        backup_recipes={"mixed": draft["backups"]} if draft["backups"] else {},
+    )
+
+
+def start_preplan_timer(db, interval_hours: float = PREPLAN_INTERVAL_HOURS) -> threading.Event:
+    """
+    Run precompute_active_users() now and every interval_hours on a daemon thread.
+
+    Returns:
+        Event that stops the timer when set
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            try:
+                precompute_active_users(db)
+            except Exception as e:
+                logger.warning(f"[PREPLAN] Timer run failed: {e}")
+            stop.wait(interval_hours * 3600)
+
+    threading.Thread(target=run, name="preplan-timer", daemon=True).start()
+    return stop
@@ -1,23 +1,26 @@
 """
 Recipe selection logic for meal planning.
 
-Extracted from chatbot.py - handles LLM-based recipe selection and plan validation.
+Extracted from chatbot.py - handles recipe selection (local ranking with an
+LLM for close calls) and plan validation.
 """
 
 import json
 import time
 import logging
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Callable, Set
+from typing import Any, Dict, List, Tuple, Optional, Callable, Set
 
 from tag_canon import TAG_SYNONYMS, CANON_COURSE_MAIN, CANON_COURSE_EXCLUDE
 from requirements_parser import DayRequirement
+from chatbot_modules.local_ranker import LocalRanker, is_subjective_request
 
 logger = logging.getLogger(__name__)
 
 # Selection configuration
 LLM_CANDIDATES_SHOWN = 20  # Show top 20 to LLM
 STAGE2_MODEL = "claude-sonnet-4-5-20250929"  # Model for recipe selection
+USE_LOCAL_RANKER = True  # Decide clear wins locally; LLM only for close calls
 
 
 @dataclass
@@ -41,9 +44,19 @@ def select_recipes_with_llm(
     validation_feedback: str = None,
     verbose: bool = False,
     verbose_callback: Optional[Callable[[str], None]] = None,
+    user_message: Optional[str] = None,
+    user_profile: Any = None,
+    favorites: Optional[List[Dict]] = None,
+    use_local_ranker: bool = USE_LOCAL_RANKER,
+    fixed_selections: Optional[Dict[str, Any]] = None,
 ) -> List:
     """
-    Use LLM to select ONE recipe per day from per-day candidate pools.
+    Select ONE recipe per day from per-day candidate pools.
+
+    Every pool is ranked locally first (see local_ranker). Days whose top
+    candidate clearly wins are decided without the LLM; only close calls,
+    or every day when the request is subjective, go to the LLM, which sees
+    the best-ranked candidates. If the LLM fails, the local picks are used.
 
     Args:
         client: Anthropic client instance
@@ -53,6 +66,13 @@ def select_recipes_with_llm(
         validation_feedback: Optional feedback from previous validation failure (for retry)
         verbose: Enable verbose output
         verbose_callback: Callback function for verbose output
+        user_message: Original request (subjective requests always use the LLM)
+        user_profile: Optional UserProfile for cuisine/protein/time preferences
+        favorites: Optional favourites from get_combined_favorites()
+        use_local_ranker: If False, every day goes to the LLM
+        fixed_selections: Recipes already chosen for days not being selected
+            (e.g. validated days on a retry); they count toward variety and
+            are listed in the prompt as not to be repeated
 
     Returns:
         List of selected Recipe objects (in date order)
@@ -61,20 +81,98 @@ def select_recipes_with_llm(
         if verbose and verbose_callback:
             verbose_callback(msg)
 
+    if not any(candidates_by_date.get(req.date) for req in day_requirements):
+        # Fallback: return empty list if no candidates
+        _verbose_output("      → ⚠️  All candidate pools empty, cannot select")
+        return []
+
+    rank_start = time.time()
+    fixed_selections = fixed_selections or {}
+    rankings = LocalRanker(recent_meals, favorites, user_profile).rank_week(
+        candidates_by_date, day_requirements, already_picked=fixed_selections.values()
+    )
+    local_picks = {d: r.best for d, r in rankings.items() if r.best is not None}
+
+    if use_local_ranker and not is_subjective_request(user_message):
+        llm_days = [req for req in day_requirements if rankings[req.date].ranked and not rankings[req.date].is_clear]
+    else:
+        llm_days = list(day_requirements)
+    logger.info(f"[STAGE2] Local ranker: {len(day_requirements) - len(llm_days)}/{len(day_requirements)} days "
+                f"decided locally in {(time.time() - rank_start) * 1000:.1f}ms")
+
+    selection_map: Dict[str, str] = {}
+    if llm_days:
+        fixed = {**fixed_selections,
+                 **{d: r for d, r in local_picks.items() if d not in {req.date for req in llm_days}}}
+        ranked_pools = {req.date: rankings[req.date].ranked for req in llm_days}
+        try:
+            selection_map = _select_with_llm(
+                client, ranked_pools, llm_days, recent_meals, validation_feedback, fixed, _verbose_output
+            )
+        except Exception as e:
+            # Fallback: locally ranked picks
+            _verbose_output(f"LLM selection failed: {e}, using local ranking")
+            logger.warning(f"LLM selection failed: {e}")
+
+    # Build result list in date order
+    selected = []
+    for req in day_requirements:
+        if req.date in selection_map:
+            recipe_id = str(selection_map[req.date])
+            pool = candidates_by_date.get(req.date, [])
+
+            # Find recipe in this day's pool
+            match = next((r for r in pool if str(r.id) == recipe_id), None)
+            if match:
+                selected.append(match)
+                _verbose_output(f"      → {req.date}: Selected {match.name}")
+                continue
+            if req.date in local_picks:
+                logger.warning(f"Invalid ID {recipe_id} for {req.date}, using local pick: {local_picks[req.date].name}")
+                _verbose_output(f"      → {req.date}: ⚠️  Invalid ID {recipe_id}, fallback to {local_picks[req.date].name}")
+
+        if req.date in local_picks:
+            selected.append(local_picks[req.date])
+            if req.date not in selection_map:
+                _verbose_output(f"      → {req.date}: Selected {local_picks[req.date].name} (local)")
+        else:
+            logger.warning(f"No candidates for {req.date}, skipping")
+            _verbose_output(f"      → {req.date}: ⚠️  No candidates available")
+
+    return selected
+
+
+def _select_with_llm(
+    client,
+    candidates_by_date: Dict[str, List],
+    day_requirements: List[DayRequirement],
+    recent_meals: Optional[List],
+    validation_feedback: Optional[str],
+    fixed: Dict[str, Any],
+    _verbose_output: Callable[[str], None],
+) -> Dict[str, Any]:
+    """
+    Ask the LLM to pick one recipe ID per day.
+
+    Args:
+        candidates_by_date: Pools in ranked order (the first 20 are shown)
+        day_requirements: Days the LLM should decide
+        fixed: Recipes already chosen for the other days (not to be repeated)
+
+    Returns:
+        Parsed selection map {date: recipe_id}
+    """
     # Build per-day sections for the prompt
     sections = []
-    all_pools_empty = True
     dates = [req.date for req in day_requirements]
 
     for req in day_requirements:
         pool = candidates_by_date.get(req.date, [])
-        if pool:
-            all_pools_empty = False
 
         # Show top 20 candidates per day (from pool of 80)
         pool_text = "\n".join([
             f"  #{i+1} [ID:{r.id}] {r.name} [{', '.join(r.tags[:5])}]"
-            for i, r in enumerate(pool[:20])
+            for i, r in enumerate(pool[:LLM_CANDIDATES_SHOWN])
         ])
 
         # Format requirements for this day
@@ -97,15 +195,15 @@ Candidates ({len(pool)} available, showing top 20):
 {pool_text if pool_text else "  (no candidates available)"}
 """)
 
-    if all_pools_empty:
-        # Fallback: return empty list if no candidates
-        _verbose_output("      → ⚠️  All candidate pools empty, cannot select")
-        return []
-
     recent_text = ""
     if recent_meals:
         recent_text = f"\nRecent meals (avoid if possible):\n" + "\n".join(f"- {m}" for m in recent_meals[:10])
 
+    fixed_text = ""
+    if fixed:
+        fixed_text = "\nAlready chosen for other days (do not repeat):\n" + "\n".join(
+            f"- {d}: {r.name}" for d, r in sorted(fixed.items()))
+
     feedback_text = ""
     if validation_feedback:
         feedback_text = f"\n⚠️ PREVIOUS ATTEMPT FAILED - FIX THESE ISSUES:\n{validation_feedback}\n"
@@ -118,6 +216,7 @@ Candidates ({len(pool)} available, showing top 20):
 CRITICAL: Return a JSON object with DATE KEYS, not an array.
 {feedback_text}
 {recent_text}
+{fixed_text}
 
 {chr(10).join(sections)}
 
@@ -144,78 +243,42 @@ RULES:
     if validation_feedback:
         logger.info(f"[STAGE2] Retry feedback included: {len(validation_feedback)} chars")
 
-    try:
-        llm_start = time.time()
-        response = client.messages.create(
-            model=STAGE2_MODEL,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        llm_time = time.time() - llm_start
-        logger.info(f"[STAGE2] LLM call completed in {llm_time:.3f}s")
-
-        # Extract JSON from response
-        content = response.content[0].text.strip()
-
-        _verbose_output(f"      → LLM response: {content[:150]}...")
-
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
-
-        # Extract JSON object if LLM added explanation text
-        if not content.startswith("{"):
-            start_idx = content.find("{")
-            if start_idx != -1:
-                content = content[start_idx:]
-        if not content.endswith("}"):
-            end_idx = content.rfind("}")
-            if end_idx != -1:
-                content = content[:end_idx + 1]
-
-        selection_map = json.loads(content)  # {"2025-12-29": 489123, ...}
-        logger.info(f"[LLM] Selection map: {selection_map}")
-
-        _verbose_output(f"      → Parsed selection: {selection_map}")
-
-        # Build result list in date order
-        selected = []
-        for req in day_requirements:
-            recipe_id = str(selection_map.get(req.date, ""))
-            pool = candidates_by_date.get(req.date, [])
-
-            # Find recipe in this day's pool
-            match = next((r for r in pool if str(r.id) == recipe_id), None)
-
-            if match:
-                selected.append(match)
-                _verbose_output(f"      → {req.date}: Selected {match.name}")
-            else:
-                # Fallback: first valid recipe from pool
-                if pool:
-                    selected.append(pool[0])
-                    logger.warning(f"Invalid ID {recipe_id} for {req.date}, using fallback: {pool[0].name}")
-                    _verbose_output(f"      → {req.date}: ⚠️  Invalid ID {recipe_id}, fallback to {pool[0].name}")
-                else:
-                    logger.warning(f"No candidates for {req.date}, skipping")
-                    _verbose_output(f"      → {req.date}: ⚠️  No candidates available")
-
-        return selected
-
-    except Exception as e:
-        # Fallback: first recipe from each pool
-        _verbose_output(f"LLM selection failed: {e}, using deterministic fallback")
-        logger.warning(f"LLM selection failed: {e}")
-
-        selected = []
-        for req in day_requirements:
-            pool = candidates_by_date.get(req.date, [])
-            if pool:
-                selected.append(pool[0])
-        return selected
+    llm_start = time.time()
+    response = client.messages.create(
+        model=STAGE2_MODEL,
+        max_tokens=500,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    llm_time = time.time() - llm_start
+    logger.info(f"[STAGE2] LLM call completed in {llm_time:.3f}s")
+
+    # Extract JSON from response
+    content = response.content[0].text.strip()
+
+    _verbose_output(f"      → LLM response: {content[:150]}...")
+
+    # Remove markdown code blocks if present
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    content = content.strip()
+
+    # Extract JSON object if LLM added explanation text
+    if not content.startswith("{"):
+        start_idx = content.find("{")
+        if start_idx != -1:
+            content = content[start_idx:]
+    if not content.endswith("}"):
+        end_idx = content.rfind("}")
+        if end_idx != -1:
+            content = content[:end_idx + 1]
+
+    selection_map = json.loads(content)  # {"2025-12-29": 489123, ...}
+    logger.info(f"[LLM] Selection map: {selection_map}")
+
+    _verbose_output(f"      → Parsed selection: {selection_map}")
+    return {d: selection_map[d] for d in dates if d in selection_map}
 
 
 def validate_plan(
@@ -2,15 +2,172 @@
 Swap matching logic for meal planning.
 
 Extracted from chatbot.py - handles backup recipe matching and selection.
+
+BackupVectorizer scores a swap request against every backup recipe and
+category locally (TF-IDF over names, tags and descriptions, cosine
+similarity from one sparse matrix-vector product), so the LLM is only
+asked about a category when the best local score is ambiguous.
 """
 
 import re
 import json
 import logging
-from typing import List, Optional, Callable
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Callable
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Local similarity bands for swap requests (cosine, 0..1)
+SWAP_MATCH_AUTO_SCORE = 0.35  # At or above: confident match, swap without the LLM
+SWAP_MATCH_MIN_SCORE = 0.1    # Below: no backup category fits, skip the LLM
+
+# Terms that imply a category without naming it
+RELATED_TERMS = {
+    "chicken": ["poultry", "bird"],
+    "beef": ["steak", "meat", "burger"],
+    "pasta": ["noodle", "spaghetti", "penne", "linguine"],
+    "fish": ["seafood", "salmon", "tilapia", "tuna"],
+    "vegetarian": ["veggie", "meatless", "plant-based"],
+}
+
+# "no X", "without X", "not X" are exclusions, not requirements (1-3 words)
+EXCLUSION_PATTERNS = [
+    r'\bno\s+(?:\w+\s+){0,2}\w+',
+    r'\bwithout\s+(?:\w+\s+){0,2}\w+',
+    r'\bnot\s+(?:\w+\s+){0,2}\w+',
+]
+
+_STOP_WORDS = {
+    "a", "an", "and", "the", "for", "with", "of", "in", "on", "to", "or", "my", "me", "i",
+    "something", "anything", "other", "else", "different", "another", "instead", "please",
+    "swap", "replace", "change", "make", "want", "like", "would", "some", "this", "that",
+    "meal", "dish", "recipe", "dinner", "night", "day", "monday", "tuesday", "wednesday",
+    "thursday", "friday", "saturday", "sunday", "tonight", "it", "is", "be", "can", "could",
+}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def strip_exclusions(text: str) -> str:
+    """Remove "no X" / "without X" / "not X" phrases from a request."""
+    for pattern in EXCLUSION_PATTERNS:
+        text = re.sub(pattern, '', text)
+    return text
+
+
+def _terms(text: str) -> List[str]:
+    """Lowercase content words, with a naive plural strip ("tacos" -> "taco")."""
+    terms = []
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOP_WORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+@dataclass
+class SwapMatch:
+    """Best backup category for a swap request, with its recipes best-first."""
+    category: str
+    score: float
+    ranked: List[Any]
+
+
+class BackupVectorizer:
+    """
+    TF-IDF vectors for backup recipes and their categories.
+
+    Rows are every backup recipe (name weighted twice, tags, description)
+    followed by one row per category (its key and RELATED_TERMS). Rows are
+    L2-normalised and stored as COO arrays, so scoring a request against all
+    of them is a single sparse matrix-vector product.
+    """
+
+    def __init__(self, backup_recipes: Dict[str, List[Any]]):
+        self.categories = list(backup_recipes)
+        self.recipes: List[Any] = []
+        self.row_category: List[int] = []
+        docs: List[List[str]] = []
+        for c, (category, recipes) in enumerate(backup_recipes.items()):
+            for recipe in recipes:
+                text = " ".join([recipe.name, recipe.name, " ".join(recipe.tags or []),
+                                 recipe.description or ""])
+                docs.append(_terms(text))
+                self.recipes.append(recipe)
+                self.row_category.append(c)
+        for c, category in enumerate(self.categories):
+            docs.append(_terms(" ".join([category] + RELATED_TERMS.get(category.lower(), []))))
+            self.row_category.append(c)
+        self.num_recipe_rows = len(self.recipes)
+        self.row_category_arr = np.array(self.row_category, dtype=np.int32)
+
+        # Smoothed IDF as in sklearn: log((1 + n) / (1 + df)) + 1
+        self.vocab: Dict[str, int] = {}
+        for doc in docs:
+            for term in doc:
+                self.vocab.setdefault(term, len(self.vocab))
+        df = np.zeros(len(self.vocab))
+        for doc in docs:
+            for term in set(doc):
+                df[self.vocab[term]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)) + 1
+
+        rows, cols, data = [], [], []
+        for r, doc in enumerate(docs):
+            counts: Dict[int, int] = {}
+            for term in doc:
+                counts[self.vocab[term]] = counts.get(self.vocab[term], 0) + 1
+            weights = {t: n * self.idf[t] for t, n in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for t, w in weights.items():
+                rows.append(r)
+                cols.append(t)
+                data.append(w / norm)
+        self.num_rows = len(docs)
+        self._rows = np.array(rows, dtype=np.int32)
+        self._cols = np.array(cols, dtype=np.int32)
+        self._data = np.array(data, dtype=np.float64)
+
+    def score(self, text: str) -> np.ndarray:
+        """
+        Cosine similarity of a request to every row (recipes first, then categories).
+
+        Exclusion phrases ("no chicken") are removed before scoring.
+        """
+        query = np.zeros(len(self.vocab))
+        for term in _terms(strip_exclusions(text.lower())):
+            index = self.vocab.get(term)
+            if index is not None:
+                query[index] += self.idf[index]
+        norm = np.linalg.norm(query)
+        if not norm:
+            return np.zeros(self.num_rows)
+        query /= norm
+        return np.bincount(self._rows, weights=self._data * query[self._cols], minlength=self.num_rows)
+
+    def rank_category(self, category: str, scores: np.ndarray) -> List[Any]:
+        """The category's recipes best-first (ties keep backup order)."""
+        c = self.categories.index(category)
+        rows = np.flatnonzero(self.row_category_arr[:self.num_recipe_rows] == c)
+        order = rows[np.argsort(-scores[rows], kind="stable")]
+        return [self.recipes[r] for r in order]
+
+    def match(self, requirements: str) -> Optional[SwapMatch]:
+        """Best category for a request: max over its own row and its recipes' rows."""
+        if not self.categories:
+            return None
+        scores = self.score(requirements)
+        category_scores = np.zeros(len(self.categories))
+        np.maximum.at(category_scores, self.row_category_arr, scores)
+        best = int(np.argmax(category_scores))
+        category = self.categories[best]
+        return SwapMatch(category=category, score=float(category_scores[best]),
+                         ranked=self.rank_category(category, scores))
+
 
 def llm_semantic_match(
     client,
@@ -55,7 +212,8 @@ Answer ONLY with: YES or NO"""
         response = client.messages.create(
             model="claude-3-5-haiku-20241022",
             max_tokens=5,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            cache=True,
         )
 
         answer = response.content[0].text.strip().upper()
@@ -162,6 +320,7 @@ def check_backup_match(
     category: str,
     verbose: bool = False,
     verbose_callback: Optional[Callable[[str], None]] = None,
+    use_llm: bool = True,
 ) -> str:
     """
     Check if user requirements match a backup category using hybrid matching.
@@ -176,6 +335,7 @@ def check_backup_match(
         category: Backup category key (e.g., "chicken")
         verbose: Enable verbose output
         verbose_callback: Callback function for verbose output
+        use_llm: If False, skip the LLM fallback (tier 1 checks only)
 
     Returns:
         "confirm" - Vague request, show options to user
@@ -192,16 +352,7 @@ def check_backup_match(
     # Tier 1: Fast algorithmic checks
 
     # Remove common exclusion patterns before checking for specific foods
-    # "no X", "without X", "not X" are exclusions, not requirements
-    requirements_without_exclusions = requirements_lower
-    # Match "no/without/not" followed by 1-3 words (handles "no beef", "no corned beef", etc.)
-    exclusion_patterns = [
-        r'\bno\s+(?:\w+\s+){0,2}\w+',  # "no X", "no X Y", "no X Y Z"
-        r'\bwithout\s+(?:\w+\s+){0,2}\w+',
-        r'\bnot\s+(?:\w+\s+){0,2}\w+'
-    ]
-    for pattern in exclusion_patterns:
-        requirements_without_exclusions = re.sub(pattern, '', requirements_without_exclusions)
+    requirements_without_exclusions = strip_exclusions(requirements_lower)
 
     # First, check for specific food terms (takes precedence over vague terms)
     # This ensures "different chicken" auto-swaps instead of asking for confirmation
@@ -214,15 +365,7 @@ def check_backup_match(
         return "auto"
 
     # Check for related terms → auto-swap
-    related_terms = {
-        "chicken": ["poultry", "bird"],
-        "beef": ["steak", "meat", "burger"],
-        "pasta": ["noodle", "spaghetti", "penne", "linguine"],
-        "fish": ["seafood", "salmon", "tilapia", "tuna"],
-        "vegetarian": ["veggie", "meatless", "plant-based"],
-    }
-
-    for term in related_terms.get(category_lower, []):
+    for term in RELATED_TERMS.get(category_lower, []):
         if term in requirements_lower:
             _verbose_output(f"      → Matched '{category}' via related term '{term}' → AUTO mode")
             return "auto"
@@ -248,7 +391,7 @@ def check_backup_match(
         return "auto"
 
     # Tier 2: LLM semantic fallback for edge cases → auto-swap
-    if llm_semantic_match(client, requirements, category, verbose, verbose_callback):
+    if use_llm and llm_semantic_match(client, requirements, category, verbose, verbose_callback):
         _verbose_output(f"      → Matched '{category}' via LLM semantic analysis → AUTO mode")
         return "auto"
 
@@ -14,9 +14,23 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from data.models import PlannedMeal, MealPlan, Recipe
 from requirements_parser import parse_requirements
-from chatbot_modules.pool_builder import build_per_day_pools, build_per_day_pools_v2
+from chatbot_modules.pool_builder import (
+    build_per_day_pools,
+    build_per_day_pools_v2,
+    build_speculative_pools,
+    speculative_query_params,
+)
+from chatbot_modules.name_index import RecipeNameIndex, get_name_index
+from chatbot_modules.preplanner import is_default_request, take_precomputed_plan
 from chatbot_modules.recipe_selector import select_recipes_with_llm, validate_plan
-from chatbot_modules.swap_matcher import check_backup_match, select_backup_options
+from chatbot_modules.swap_matcher import (
+    SWAP_MATCH_AUTO_SCORE,
+    SWAP_MATCH_MIN_SCORE,
+    BackupVectorizer,
+    check_backup_match,
+    llm_semantic_match,
+    select_backup_options,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +38,7 @@ logger = logging.getLogger(__name__)
 MAX_RETRIES = 2
 USE_LLM_QUERY_BUILDER = True  # Feature flag for new approach
 USE_GENERATE_FUZZY_MATCH = True  # Option F: ChatGPT-like speed with real recipes
+NAME_MATCH_TOP_K = 5  # Closest names by trigram similarity considered per meal
 
 
 def llm_build_query_params(
@@ -86,7 +101,8 @@ Example output format:
     response = client.messages.create(
         model="claude-3-5-haiku-20241022",
         max_tokens=500,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[{"role": "user", "content": prompt}],
+        cache=True,
     )
 
     elapsed = time.time() - start_time
@@ -242,7 +258,13 @@ def parallel_fuzzy_match(
     """
     Fuzzy match meal names to real recipes in parallel.
 
-    Uses ThreadPoolExecutor to run all searches simultaneously (~500ms total).
+    Names are matched in memory against the recipe name index: first by
+    keyword overlap, then by trigram similarity for free-text names with no
+    keyword hit (a few ms for a week). Names the index can't place (or every
+    name, if the index is unavailable) fall back to SQL LIKE searches in
+    parallel with ThreadPoolExecutor, retrying with fewer keywords and then
+    taking a generic main dish, so a date is only left unfilled when the
+    recipe DB is empty.
     Returns: {"2026-01-12": Recipe(...), ...}
     """
     # Common modifiers/adjectives that don't help find recipes
@@ -294,83 +316,79 @@ def parallel_fuzzy_match(
         scored.sort(key=lambda x: x[0], reverse=True)
         return scored[0][1]
 
-    def match_one(date: str, name: str) -> Tuple[str, Recipe, str]:
-        """Match a single meal name to a recipe. Returns (date, recipe, matched_name)."""
+    def match_indexed(index: RecipeNameIndex, date: str, name: str) -> Tuple[str, Recipe, str]:
+        """Match a meal name against the in-memory name index (no SQL until the final fetch)."""
         match_start = time.time()
-
-        # Extract food keywords for searching
         keywords = extract_food_keywords(name)
         query = " ".join(keywords)
 
-        # Search with keywords, get more results to pick the best
-        results = db.search_recipes(query=query, limit=15)
-        if results:
-            best = best_match(results, keywords)
-            elapsed = (time.time() - match_start) * 1000
-            logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, keywords='{query}')")
-            return (date, best, best.name)
-
-        # Try with fewer keywords if no match - try multiple reduction strategies
-        # Only accept matches with at least 2 words to avoid weak single-word matches
-        if len(keywords) > 1:
-            # Strategy 1: Try dropping from the end (keep beginning), min 2 words
-            for i in range(len(keywords) - 1, 1, -1):  # Stop at 2, not 1
-                query = " ".join(keywords[:i])
-                results = db.search_recipes(query=query, limit=15)
-                if results:
-                    best = best_match(results, keywords)
-                    elapsed = (time.time() - match_start) * 1000
-                    logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, reduced='{query}')")
-                    return (date, best, best.name)
+        # Names containing at least 2 of the keywords, scored like score_match
+        hits = index.search(keywords, limit=1, min_matched=min(2, len(keywords)))
+        if hits:
+            recipe_id, how = hits[0].recipe_id, f"index, score={hits[0].score}"
+        else:
+            # Otherwise the closest names by trigram similarity, preferring keyword overlap
+            similar = index.similar(query, k=NAME_MATCH_TOP_K)
+            if not similar:
+                return (date, None, None)
+            best = max(similar, key=lambda m: score_match(m.name, keywords))
+            recipe_id, how = best.recipe_id, f"trigram, similarity={best.similarity:.2f}"
+
+        recipe = db.get_recipe(recipe_id)
+        if recipe is None:
+            return (date, None, None)
+        elapsed = (time.time() - match_start) * 1000
+        logger.info(f"[MATCH] {date}: '{name}' → '{recipe.name}' ({elapsed:.1f}ms, {how}, keywords='{query}')")
+        return (date, recipe, recipe.name)
 
-            # Strategy 2: Try dropping from the beginning (keep end - often more specific)
-            for i in range(1, len(keywords) - 1):  # Keep at least 2 words
-                query = " ".join(keywords[i:])
-                results = db.search_recipes(query=query, limit=15)
-                if results:
-                    best = best_match(results, keywords)
-                    elapsed = (time.time() - match_start) * 1000
-                    logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, tail='{query}')")
-                    return (date, best, best.name)
+    def match_one(date: str, name: str) -> Tuple[str, Recipe, str]:
+        """Match a single meal name with SQL searches (used when the name index has no match)."""
+        match_start = time.time()
 
-            # Strategy 3: Try pairs of consecutive keywords
-            for i in range(len(keywords) - 1):
-                query = " ".join(keywords[i:i+2])
-                results = db.search_recipes(query=query, limit=15)
-                if results:
-                    best = best_match(results, keywords)
-                    elapsed = (time.time() - match_start) * 1000
-                    logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, pair='{query}')")
-                    return (date, best, best.name)
+        # Extract food keywords for searching
+        keywords = extract_food_keywords(name)
+        query = " ".join(keywords)
 
-            # Strategy 4: Try each keyword individually as last resort (but not first keyword which is often noise)
-            for i in range(1, len(keywords)):
-                query = keywords[i]
+        # Search with all keywords, then with shorter runs of consecutive keywords
+        for size in range(len(keywords), 0, -1):
+            for i in range(len(keywords) - size + 1):
+                query = " ".join(keywords[i:i + size])
                 results = db.search_recipes(query=query, limit=15)
                 if results:
                     best = best_match(results, keywords)
                     elapsed = (time.time() - match_start) * 1000
-                    logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, single='{query}')")
+                    logger.info(f"[MATCH] {date}: '{name}' → '{best.name}' ({elapsed:.0f}ms, keywords='{query}')")
                     return (date, best, best.name)
 
-        # Fallback to generic dinner
-        results = db.search_recipes(query="dinner main dish", limit=1)
+        # Last resort: any main dish, then any recipe at all, so the date isn't left empty
+        results = (db.search_recipes(include_tags=["main-dish"], limit=1)
+                   or db.search_recipes(limit=1))
         if results:
-            elapsed = (time.time() - match_start) * 1000
-            logger.info(f"[MATCH] {date}: '{name}' → '{results[0].name}' ({elapsed:.0f}ms, fallback)")
+            logger.warning(f"[MATCH] {date}: '{name}' → '{results[0].name}' (generic fallback)")
             return (date, results[0], results[0].name)
 
-        # This shouldn't happen with 492K recipes
         raise ValueError(f"No recipes found for '{name}'")
 
     logger.info(f"[MATCH] Starting parallel fuzzy match for {len(meal_names)} meals")
     match_start = time.time()
 
     recipes = {}
-    with ThreadPoolExecutor(max_workers=min(7, len(meal_names))) as executor:
+    unmatched = dict(meal_names)
+
+    # In-memory pass over the name index; SQL is only used if the index is unavailable
+    recipes_db = getattr(db, "recipes_db", None)
+    index = get_name_index(recipes_db) if recipes_db else None
+    if index is not None:
+        for date, name in meal_names.items():
+            date, recipe, matched_name = match_indexed(index, date, name)
+            if recipe is not None:
+                recipes[date] = recipe
+                del unmatched[date]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(7, len(unmatched)))) as executor:
         futures = {
             executor.submit(match_one, date, name): date
-            for date, name in meal_names.items()
+            for date, name in unmatched.items()
         }
         for future in as_completed(futures):
             try:
@@ -431,6 +449,33 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                 user_message = msg["content"]
                 break
 
+    # =====================================================================
+    # Precomputed draft (background preplanner) for a plain "plan my week"
+    # =====================================================================
+    if not tool_input.get("exclude_allergens") and is_default_request(user_message, dates):
+        plan = take_precomputed_plan(chatbot.assistant.db, chatbot.user_id, dates, week_of)
+        if plan is not None:
+            chatbot._verbose_output("Using your precomputed plan...")
+            plan_id = chatbot.assistant.db.save_meal_plan(plan, user_id=chatbot.user_id)
+            chatbot.current_meal_plan_id = plan_id
+            chatbot.current_snapshot_id = plan_id
+            chatbot.last_meal_plan = plan
+
+            total_time = time.time() - plan_start_time
+            logger.info(f"[PLAN-TIMING] Precomputed total={total_time*1000:.0f}ms for {num_days} days")
+            total_ingredients = len(plan.get_all_ingredients())
+            all_allergens = plan.get_all_allergens()
+            return json.dumps({
+                "status": "complete",
+                "plan_id": plan_id,
+                "num_meals": len(plan.meals),
+                "meals": [{"date": m.date, "name": m.recipe.name} for m in plan.meals],
+                "total_ingredients": total_ingredients,
+                "allergens": list(all_allergens) if all_allergens else [],
+                "timing_ms": int(total_time * 1000),
+                "message": f"Created {num_days}-day meal plan with {total_ingredients} ingredients"
+            })
+
     # =====================================================================
     # OPTION F: Generate + Fuzzy Match (ChatGPT-like speed)
     # =====================================================================
@@ -470,7 +515,7 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
 
         chatbot._verbose_output("Finding matching recipes...")
 
-        # Step 2: Parallel fuzzy match to real recipes (~500ms)
+        # Step 2: Match names to real recipes via the in-memory name index (a few ms)
         try:
             recipes_by_date = parallel_fuzzy_match(
                 db=chatbot.assistant.db,
@@ -549,21 +594,44 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
     # 4. Get allergen exclusions
     exclude_allergens = tool_input.get("exclude_allergens", [])
 
+    # Preferences for local ranking (and speculative pools)
+    user_profile = chatbot.assistant.db.get_user_profile(user_id=chatbot.user_id)
+    favorites = chatbot.assistant.db.get_combined_favorites(user_id=chatbot.user_id, limit=10)
+
     # 5. Build candidate pools - NEW or OLD approach
     if USE_LLM_QUERY_BUILDER:
         # NEW APPROACH: LLM builds query params directly
         logger.info(f"[PLAN] Using LLM query builder (USE_LLM_QUERY_BUILDER=True)")
         chatbot._verbose_output("Analyzing request with LLM...")
 
-        try:
-            query_params = llm_build_query_params(
+        # Speculatively build the likely pools while the LLM call is in flight
+        with ThreadPoolExecutor(max_workers=1) as llm_executor:
+            llm_future = llm_executor.submit(
+                llm_build_query_params,
                 client=chatbot.client,
                 user_message=user_message or "plan meals",
                 dates=dates,
             )
-        except Exception as e:
-            logger.error(f"[LLM-QUERY] Failed to parse: {e}, falling back to algorithmic")
-            query_params = {d: {"include_tags": ["main-dish"], "query": None} for d in dates}
+            try:
+                speculative_pools = build_speculative_pools(
+                    db=chatbot.assistant.db,
+                    dates=dates,
+                    params_options=speculative_query_params(user_profile),
+                    user_id=chatbot.user_id,
+                    week_of=week_of,
+                )
+            except Exception as e:
+                logger.warning(f"[POOL-SPECULATE] Failed: {e}")
+                speculative_pools = {}
+
+            try:
+                query_params = llm_future.result()
+            except Exception as e:
+                logger.error(f"[LLM-QUERY] Failed to parse: {e}, falling back to algorithmic")
+                query_params = {d: {"include_tags": ["main-dish"], "query": None} for d in dates}
+
+        # Keep params in date order so per-day seeds line up with the speculative pools
+        query_params = {d: query_params[d] for d in dates if d in query_params}
 
         chatbot._verbose_output("Building candidate pools...")
 
@@ -576,6 +644,7 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
             week_of=week_of,
             verbose=chatbot.verbose,
             verbose_callback=chatbot._verbose_output,
+            speculative_pools=speculative_pools,
         )
 
         # Create minimal day_requirements for validation (still needed for select_recipes_with_llm)
@@ -609,6 +678,9 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
             validation_feedback=None,
             verbose=chatbot.verbose,
             verbose_callback=chatbot._verbose_output,
+            user_message=user_message,
+            user_profile=user_profile,
+            favorites=favorites,
         )
 
         if not selected:
@@ -639,22 +711,25 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
         if chatbot.verbose:
             chatbot._verbose_output(f"      → Parsed requirements: {[str(r) for r in day_requirements]}")
 
-        # Selection with retry loop
+        # Selection with retry loop: retries rebuild pools and re-select only the
+        # dates that failed validation; validated days stay fixed
         logger.info(f"[RETRY-LOOP] Starting selection with MAX_RETRIES={MAX_RETRIES}")
         excluded_ids_by_date: Dict[str, Set[int]] = {d: set() for d in dates}
         validation_feedback = None
-        selected = []
+        selected_by_date: Dict[str, Recipe] = {}
+        retry_dates: Set[str] = set(dates)
         candidates_by_date = {}
         pool_timing = {}
         total_retry_time = 0.0
 
         for attempt in range(MAX_RETRIES + 1):
             attempt_start = time.time()
-            logger.info(f"[RETRY-LOOP] === Attempt {attempt} ===")
+            attempt_reqs = [req for req in day_requirements if req.date in retry_dates]
+            logger.info(f"[RETRY-LOOP] === Attempt {attempt} === ({len(attempt_reqs)}/{len(day_requirements)} days)")
 
             chatbot._verbose_output(f"Building candidate pools{' (retry ' + str(attempt) + ')' if attempt > 0 else ''}...")
 
-            candidates_by_date, pool_timing = build_per_day_pools(
+            attempt_pools, attempt_timing = build_per_day_pools(
                 db=chatbot.assistant.db,
                 day_requirements=day_requirements,
                 recent_names=recent_names,
@@ -664,9 +739,13 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                 week_of=week_of,
                 verbose=chatbot.verbose,
                 verbose_callback=chatbot._verbose_output,
+                only_dates=retry_dates if attempt > 0 else None,
             )
+            candidates_by_date.update(attempt_pools)
+            for date, t in attempt_timing.items():
+                pool_timing[date] = pool_timing.get(date, 0.0) + t
 
-            empty_pools = [req.date for req in day_requirements if not candidates_by_date.get(req.date)]
+            empty_pools = [req.date for req in attempt_reqs if not candidates_by_date.get(req.date)]
             if empty_pools:
                 logger.info(f"[RETRY-LOOP] Empty pools detected: {empty_pools}")
                 if attempt == 0:
@@ -674,29 +753,45 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                 else:
                     logger.warning(f"Empty pools on retry for: {empty_pools}")
 
-            total_candidates = sum(len(pool) for pool in candidates_by_date.values())
-            chatbot._verbose_output(f"Selecting {num_days} recipes from {total_candidates} candidates...")
+            total_candidates = sum(len(attempt_pools.get(req.date, [])) for req in attempt_reqs)
+            chatbot._verbose_output(f"Selecting {len(attempt_reqs)} recipes from {total_candidates} candidates...")
 
-            selected = select_recipes_with_llm(
+            # Validated days are passed as fixed context so they aren't repeated
+            fixed = {d: r for d, r in selected_by_date.items() if d not in retry_dates}
+            attempt_selected = select_recipes_with_llm(
                 client=chatbot.client,
-                candidates_by_date=candidates_by_date,
-                day_requirements=day_requirements,
+                candidates_by_date={req.date: candidates_by_date.get(req.date, []) for req in attempt_reqs},
+                day_requirements=attempt_reqs,
                 recent_meals=recent_names,
                 validation_feedback=validation_feedback,
                 verbose=chatbot.verbose,
                 verbose_callback=chatbot._verbose_output,
+                user_message=user_message,
+                user_profile=user_profile,
+                favorites=favorites,
+                fixed_selections=fixed,
             )
 
-            if not selected:
+            if not attempt_selected and attempt == 0:
                 return "Could not select any recipes. Try different constraints."
 
-            chatbot._verbose_output(f"Selected: {', '.join([r.name[:25] for r in selected[:3]])}...")
+            # select_recipes_with_llm returns one recipe per day that has candidates
+            reqs_with_pools = [req for req in attempt_reqs if candidates_by_date.get(req.date)]
+            attempt_by_date = {req.date: r for req, r in zip(reqs_with_pools, attempt_selected)}
+            selected_by_date.update(attempt_by_date)
+            selected = [selected_by_date[d] for d in dates if d in selected_by_date]
+
+            chatbot._verbose_output(f"Selected: {', '.join([r.name[:25] for r in attempt_by_date.values()][:3])}...")
 
             if chatbot.verbose:
                 chatbot._verbose_output(f"      → Full selection: {', '.join([r.name[:30] for r in selected])}")
 
+            # Only the re-selected days can fail; the others already passed
             validate_start = time.time()
-            hard_failures, soft_warnings = validate_plan(selected, day_requirements)
+            checked_reqs = [req for req in attempt_reqs if req.date in selected_by_date]
+            hard_failures, soft_warnings = validate_plan(
+                [selected_by_date[req.date] for req in checked_reqs], checked_reqs
+            )
             validate_time = time.time() - validate_start
             logger.info(f"[VALIDATE] validate_plan completed in {validate_time:.3f}s")
             logger.info(f"[VALIDATE] hard_failures={len(hard_failures)}, soft_warnings={len(soft_warnings)}")
@@ -716,6 +811,8 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                     logger.info(f"[RETRY-LOOP] Success on first attempt")
                 break
 
+            retry_dates = {f.date for f in hard_failures}
+
             if attempt < MAX_RETRIES:
                 total_retry_time += attempt_time
                 validation_feedback = ""
@@ -723,7 +820,7 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                     validation_feedback += f"- {f.date}: {f.recipe_name} - {f.reason}\n"
                     excluded_ids_by_date[f.date].add(f.recipe_id)
 
-                logger.info(f"[RETRY-LOOP] Retry {attempt + 1}/{MAX_RETRIES} after {len(hard_failures)} hard failures")
+                logger.info(f"[RETRY-LOOP] Retry {attempt + 1}/{MAX_RETRIES} for {len(retry_dates)} failed day(s): {sorted(retry_dates)}")
                 logger.info(f"[RETRY-LOOP] Excluded IDs by date: {dict((k, list(v)) for k, v in excluded_ids_by_date.items() if v)}")
                 logger.info(f"[RETRY-LOOP] Validation feedback:\n{validation_feedback}")
                 chatbot._verbose_output(f"      ⚠️  {len(hard_failures)} validation failures, retrying...")
@@ -736,14 +833,14 @@ def handle_plan_meals_smart(chatbot, tool_input: Dict[str, Any]) -> str:
                 for f in hard_failures:
                     chatbot._verbose_output(f"         - {f}")
 
-                failed_dates = {f.date for f in hard_failures}
-                for i, req in enumerate(day_requirements):
-                    if req.date in failed_dates and i < len(selected):
-                        pool = candidates_by_date.get(req.date, [])
-                        valid_pool = [r for r in pool if r.id not in excluded_ids_by_date[req.date]]
+                for date in retry_dates:
+                    if date in selected_by_date:
+                        pool = candidates_by_date.get(date, [])
+                        valid_pool = [r for r in pool if r.id not in excluded_ids_by_date[date]]
                         if valid_pool:
-                            selected[i] = valid_pool[0]
-                            logger.info(f"Deterministic fallback for {req.date}: {valid_pool[0].name}")
+                            selected_by_date[date] = valid_pool[0]
+                            logger.info(f"Deterministic fallback for {date}: {valid_pool[0].name}")
+                selected = [selected_by_date[d] for d in dates if d in selected_by_date]
 
     # Log final plan summary
     logger.info(f"[FINAL-PLAN] === Final Selected Plan Summary ===")
@@ -842,6 +939,10 @@ def handle_create_shopping_list(chatbot, tool_input: Dict[str, Any]) -> str:
     if result["success"]:
         chatbot.current_shopping_list_id = result["grocery_list_id"]
         scaling_note = f" (with scaling: {scaling_instructions})" if scaling_instructions else ""
+        unapplied = result.get("unapplied_scaling")
+        if unapplied:
+            scaling_note += (f". These scaling instructions could not be applied, so those quantities are "
+                             f"unscaled (tell the user): {'; '.join(unapplied)}")
         return f"Created shopping list with {result['num_items']} items, organized by store section{scaling_note}."
     else:
         return f"Error: {result.get('error')}"
@@ -999,23 +1100,50 @@ def handle_swap_meal_fast(chatbot, tool_input: Dict[str, Any]) -> str:
     candidates = []
     used_category = None
     match_mode = None
+    backup_recipes = chatbot.last_meal_plan.backup_recipes or {}
 
-    for category, backups in chatbot.last_meal_plan.backup_recipes.items():
+    # Step 1a: Rule checks per category (no LLM calls)
+    for category, backups in backup_recipes.items():
         mode = check_backup_match(
             client=chatbot.client,
             requirements=requirements,
             category=category,
             verbose=chatbot.verbose,
             verbose_callback=chatbot._verbose_output,
+            use_llm=False,
         )
         if mode != "no_match":
             candidates = backups
             used_category = category
             match_mode = mode
-            if chatbot.verbose:
-                chatbot._verbose_output(f"      → Found {len(candidates)} backup recipes for '{category}' (0 DB queries)")
             break
 
+    # Step 1b: Score the request against every backup recipe and category locally;
+    # ask the LLM (about the best category only) when the score is ambiguous
+    if backup_recipes and match_mode != "confirm":
+        match_start = time.time()
+        vectorizer = BackupVectorizer(backup_recipes)
+        if match_mode == "auto":
+            # Rule match: put the recipes closest to the request first
+            candidates = vectorizer.rank_category(used_category, vectorizer.score(requirements))
+        else:
+            match = vectorizer.match(requirements)
+            if match is not None and match.score >= SWAP_MATCH_MIN_SCORE:
+                confident = match.score >= SWAP_MATCH_AUTO_SCORE
+                if confident or llm_semantic_match(chatbot.client, requirements, match.category,
+                                                   chatbot.verbose, chatbot._verbose_output):
+                    candidates = match.ranked
+                    used_category = match.category
+                    match_mode = "auto"
+                logger.info(f"[SWAP] '{requirements}' → '{match.category}' score={match.score:.2f} "
+                            f"({'local' if confident else 'LLM checked'}, matched={match_mode == 'auto'}, "
+                            f"{(time.time() - match_start) * 1000:.1f}ms)")
+            elif match is not None:
+                logger.info(f"[SWAP] '{requirements}' → no backup category (best score={match.score:.2f})")
+
+    if candidates and chatbot.verbose:
+        chatbot._verbose_output(f"      → Found {len(candidates)} backup recipes for '{used_category}' (0 DB queries)")
+
     # Step 2: Fall back to fresh search if no match
     if not candidates:
         if chatbot.verbose:
@@ -5,6 +5,10 @@ Maps tool names to their handler functions.
 Centralizes dispatch logic for auditable tool execution.
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
 from chatbot_modules.tool_handlers import (
     handle_plan_meals,
     handle_plan_meals_smart,
@@ -55,6 +59,80 @@ TOOL_HANDLERS = {
 }
 
 
+# Read-only handlers with no side effects on chatbot state or the database.
+# These can run concurrently with each other within one chat turn.
+INDEPENDENT_TOOLS = frozenset({
+    "search_recipes",
+    "get_cooking_guide",
+    "get_meal_history",
+    "show_shopping_list",
+    "check_allergens",
+    "list_meals_by_allergen",
+    "get_day_ingredients",
+    "show_favorites",
+})
+
+# Bounded pool shared by all chat turns
+TOOL_MAX_WORKERS = 4
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+
+def is_independent(tool_name: str) -> bool:
+    """Return True if a tool is read-only and safe to run alongside others."""
+    return tool_name in INDEPENDENT_TOOLS
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(
+                max_workers=TOOL_MAX_WORKERS, thread_name_prefix="chat-tool"
+            )
+        return _tool_executor
+
+
+def execute_tools(chatbot, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """
+    Execute the tool calls from one model response, preserving result order.
+
+    Consecutive independent (read-only) calls run concurrently on a bounded
+    executor; any other tool runs on its own and acts as a barrier, so a
+    write never overlaps the reads before or after it.
+
+    Args:
+        chatbot: The MealPlanningChatbot instance
+        calls: (tool_name, tool_input) pairs in the order the model issued them
+
+    Returns:
+        Result strings in the same order as calls
+    """
+    results: List[Optional[str]] = [None] * len(calls)
+    batch: List[int] = []
+
+    def flush():
+        if len(batch) == 1:
+            name, tool_input = calls[batch[0]]
+            results[batch[0]] = execute_tool(chatbot, name, tool_input)
+        elif batch:
+            executor = _get_tool_executor()
+            futures = {i: executor.submit(execute_tool, chatbot, *calls[i]) for i in batch}
+            for i, future in futures.items():
+                results[i] = future.result()
+        batch.clear()
+
+    for i, (name, tool_input) in enumerate(calls):
+        if is_independent(name):
+            batch.append(i)
+            continue
+        flush()
+        results[i] = execute_tool(chatbot, name, tool_input)
+    flush()
+
+    return results
+
+
 def execute_tool(chatbot, tool_name: str, tool_input: dict) -> str:
     """
     Execute a tool by name.
@@ -7,72 +7,18 @@ Extracted from chatbot.py - contains tool schemas and system prompt generation.
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from llm_provider import system_blocks, with_cache_breakpoint
 
-def build_system_prompt(
-    current_meal_plan_id: Optional[str],
-    current_shopping_list_id: Optional[str],
-    last_meal_plan: Optional[Any],
-    selected_dates: Optional[List[str]] = None,
-) -> str:
-    """
-    Build the system prompt for the LLM.
-
-    Args:
-        current_meal_plan_id: Current meal plan ID if any
-        current_shopping_list_id: Current shopping list ID if any
-        last_meal_plan: The last meal plan object (with meals list)
-        selected_dates: List of dates selected by user from UI (YYYY-MM-DD format)
 
-    Returns:
-        System prompt string for the LLM
-    """
-    context = []
-    if current_meal_plan_id:
-        context.append(f"Current meal plan ID: {current_meal_plan_id}")
-    if current_shopping_list_id:
-        context.append(f"Current shopping list ID: {current_shopping_list_id}")
-
-    # Add selected dates context - this tells the LLM it can immediately call plan_meals_smart
-    if selected_dates:
-        dates_with_days = []
-        for date_str in selected_dates:
-            try:
-                dt = datetime.fromisoformat(date_str)
-                dates_with_days.append(f"{date_str} ({dt.strftime('%A')})")
-            except ValueError:
-                dates_with_days.append(date_str)
-        context.append(f"User has selected these dates for planning: {', '.join(dates_with_days)}")
-        context.append(f"Number of days to plan: {len(selected_dates)}")
-
-    context_str = "\n".join(context) if context else "No active plans yet."
-
-    # Add meal plan date mapping for interpreting day references
-    meal_plan_dates_context = ""
-    if last_meal_plan and last_meal_plan.meals:
-        meal_plan_dates_context = "\n\nCurrent meal plan dates:\n"
-        for i, meal in enumerate(last_meal_plan.meals, 1):
-            # Handle both datetime objects and string dates
-            if isinstance(meal.date, str):
-                meal_date = datetime.fromisoformat(meal.date)
-                day_name = meal_date.strftime("%A")
-            else:
-                day_name = meal.date.strftime("%A")
-                meal_date = meal.date
-
-            meal_plan_dates_context += f"  Day {i}: {day_name} ({meal.date}) - {meal.recipe.name}\n"
-
-        meal_plan_dates_context += "\nWhen user says 'day 1', 'day 2', etc., they mean the Nth meal in the plan (day 1 = first meal, day 2 = second meal, etc.)"
-
-    return f"""You are a helpful meal planning assistant. You help users plan their weekly meals, create shopping lists, and provide cooking guidance.
+# Static instructions - identical on every turn, so they sit before the
+# prompt-cache breakpoint. Per-session state goes in build_plan_context().
+STATIC_SYSTEM_PROMPT = """You are a helpful meal planning assistant. You help users plan their weekly meals, create shopping lists, and provide cooking guidance.
 
 You have access to a database of 492,630 recipes and can search, plan meals, generate shopping lists, and provide cooking instructions.
 
-Current context:
-{context_str}{meal_plan_dates_context}
-
 When users ask about meal planning:
 - IMMEDIATELY call plan_meals_smart to create the plan - don't search first
-- If "User has selected these dates for planning" appears in Current context, DO NOT ask how many days - just call plan_meals_smart immediately (it will use those dates)
+- If "User has selected these dates for planning" appears in the Current context section, DO NOT ask how many days - just call plan_meals_smart immediately (it will use those dates)
 - ALWAYS use plan_meals_smart (never use plan_meals or search_recipes for planning)
 - For CUISINE-SPECIFIC requests (e.g., "French meals", "Italian week", "Asian dishes"):
   * Call plan_meals_smart DIRECTLY with the cuisine as search_query
@@ -110,12 +56,12 @@ When users want to change a meal:
 - Only use swap_meal directly if swap_meal_fast is not appropriate
 
 IMPORTANT - Interpreting day/meal references for swaps:
-- "day 1", "day 2", "day 3" = the 1st, 2nd, 3rd meal in the plan (see Current meal plan dates above)
+- "day 1", "day 2", "day 3" = the 1st, 2nd, 3rd meal in the plan (see Current meal plan dates in the context below)
 - "Monday", "Tuesday", etc. = the meal on that specific day of the week
 - "the chicken meal", "that pasta" = find the meal matching that description
 - "November 3rd", "2025-11-03" = specific calendar date (use exactly as given)
 Examples:
-  - "swap day 3" → Use date from "Day 3" above (e.g., if Day 3 is 2025-11-02, use that date)
+  - "swap day 3" → Use date from "Day 3" in the context below (e.g., if Day 3 is 2025-11-02, use that date)
   - "swap Monday" → Find Monday's date in the plan
   - "swap the chicken" → Find which meal has chicken, use its date
 
@@ -151,6 +97,106 @@ Working with favorites:
 IMPORTANT: Keep responses concise. For meal plans, include brief reasoning for each day. For other actions (swaps, shopping lists, etc.), confirm with 1-2 sentences. ALWAYS answer the user's actual question based on tool results."""
 
 
+def build_plan_context(
+    current_meal_plan_id: Optional[str],
+    current_shopping_list_id: Optional[str],
+    last_meal_plan: Optional[Any],
+    selected_dates: Optional[List[str]] = None,
+) -> str:
+    """
+    Build the dynamic "Current context" section of the system prompt.
+
+    Args:
+        current_meal_plan_id: Current meal plan ID if any
+        current_shopping_list_id: Current shopping list ID if any
+        last_meal_plan: The last meal plan object (with meals list)
+        selected_dates: List of dates selected by user from UI (YYYY-MM-DD format)
+
+    Returns:
+        Context section string
+    """
+    context = []
+    if current_meal_plan_id:
+        context.append(f"Current meal plan ID: {current_meal_plan_id}")
+    if current_shopping_list_id:
+        context.append(f"Current shopping list ID: {current_shopping_list_id}")
+
+    # Add selected dates context - this tells the LLM it can immediately call plan_meals_smart
+    if selected_dates:
+        dates_with_days = []
+        for date_str in selected_dates:
+            try:
+                dt = datetime.fromisoformat(date_str)
+                dates_with_days.append(f"{date_str} ({dt.strftime('%A')})")
+            except ValueError:
+                dates_with_days.append(date_str)
+        context.append(f"User has selected these dates for planning: {', '.join(dates_with_days)}")
+        context.append(f"Number of days to plan: {len(selected_dates)}")
+
+    context_str = "\n".join(context) if context else "No active plans yet."
+
+    # Add meal plan date mapping for interpreting day references
+    meal_plan_dates_context = ""
+    if last_meal_plan and last_meal_plan.meals:
+        meal_plan_dates_context = "\n\nCurrent meal plan dates:\n"
+        for i, meal in enumerate(last_meal_plan.meals, 1):
+            # Handle both datetime objects and string dates
+            if isinstance(meal.date, str):
+                meal_date = datetime.fromisoformat(meal.date)
+                day_name = meal_date.strftime("%A")
+            else:
+                day_name = meal.date.strftime("%A")
+                meal_date = meal.date
+
+            meal_plan_dates_context += f"  Day {i}: {day_name} ({meal.date}) - {meal.recipe.name}\n"
+
+        meal_plan_dates_context += "\nWhen user says 'day 1', 'day 2', etc., they mean the Nth meal in the plan (day 1 = first meal, day 2 = second meal, etc.)"
+
+    return f"Current context:\n{context_str}{meal_plan_dates_context}"
+
+
+def build_system_prompt(
+    current_meal_plan_id: Optional[str],
+    current_shopping_list_id: Optional[str],
+    last_meal_plan: Optional[Any],
+    selected_dates: Optional[List[str]] = None,
+) -> str:
+    """
+    Build the system prompt for the LLM as a single string.
+
+    Args:
+        current_meal_plan_id: Current meal plan ID if any
+        current_shopping_list_id: Current shopping list ID if any
+        last_meal_plan: The last meal plan object (with meals list)
+        selected_dates: List of dates selected by user from UI (YYYY-MM-DD format)
+
+    Returns:
+        System prompt string for the LLM
+    """
+    context = build_plan_context(
+        current_meal_plan_id, current_shopping_list_id, last_meal_plan, selected_dates
+    )
+    return f"{STATIC_SYSTEM_PROMPT}\n\n{context}"
+
+
+def build_system_blocks(
+    current_meal_plan_id: Optional[str],
+    current_shopping_list_id: Optional[str],
+    last_meal_plan: Optional[Any],
+    selected_dates: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build the system prompt as content blocks with a cache breakpoint.
+
+    The static instructions carry the breakpoint so the tools + instructions
+    prefix is reused across turns; the plan context follows it uncached.
+    """
+    context = build_plan_context(
+        current_meal_plan_id, current_shopping_list_id, last_meal_plan, selected_dates
+    )
+    return system_blocks(STATIC_SYSTEM_PROMPT, context)
+
+
 # Tool definitions - static configuration
 TOOL_DEFINITIONS: List[Dict[str, Any]] = [
     {
@@ -472,6 +518,11 @@ TOOL_DEFINITIONS: List[Dict[str, Any]] = [
 ]
 
 
-def get_tools() -> List[Dict[str, Any]]:
-    """Get the tool definitions list."""
-    return TOOL_DEFINITIONS
+# Same schema with a cache breakpoint on the last tool (tools are the start of
+# the prompt prefix, so this caches the whole tool list)
+CACHED_TOOL_DEFINITIONS: List[Dict[str, Any]] = with_cache_breakpoint(TOOL_DEFINITIONS)
+
+
+def get_tools(cache_breakpoint: bool = False) -> List[Dict[str, Any]]:
+    """Get the tool definitions list, optionally marked for prompt caching."""
+    return CACHED_TOOL_DEFINITIONS if cache_breakpoint else TOOL_DEFINITIONS
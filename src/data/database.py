@@ -9,8 +9,13 @@ Manages two SQLite databases:
 import sqlite3
 import json
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import base64
+import hashlib
+import os
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Callable, Tuple, Iterator
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from .models import Recipe, MealPlan, PlannedMeal, GroceryList, GroceryItem, MealEvent, UserProfile, Ingredient
@@ -18,9 +23,147 @@ from .models import Recipe, MealPlan, PlannedMeal, GroceryList, GroceryItem, Mea
 logger = logging.getLogger(__name__)
 
 
+class PoolCache:
+    """
+    Thread-safe LRU cache of sampled candidate pools.
+
+    Entries are keyed by (recipes_db, db version, include_tags, exclude_tags,
+    query, exclude_ids hash, limit, seed). The db version is the file's
+    (mtime, size, inode), so a rebuilt recipes.db never serves old pools,
+    and entries for the previous version are dropped on first sight of it.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, List[Recipe]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def db_version(recipes_db: Path) -> Optional[Tuple[int, int, int]]:
+        """(mtime_ns, size, inode) of the recipes database, or None if missing."""
+        try:
+            st = os.stat(recipes_db)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @staticmethod
+    def make_key(
+        recipes_db: Path,
+        version: Tuple[int, int, int],
+        include_tags: Optional[List[str]],
+        exclude_tags: Optional[List[str]],
+        exclude_ids: Optional[List[str]],
+        query: Optional[str],
+        limit: int,
+        seed: int,
+    ) -> Tuple:
+        ids_hash = hashlib.sha1(
+            ",".join(sorted(str(i) for i in exclude_ids or ())).encode()
+        ).hexdigest()[:16]
+        return (
+            str(recipes_db), version, tuple(include_tags or ()), tuple(sorted(exclude_tags or ())),
+            query or None, ids_hash, limit, seed,
+        )
+
+    def check_version(self, recipes_db: Path, version: Tuple[int, int, int]):
+        """Drop every entry for recipes_db if the file changed since last seen."""
+        path = str(recipes_db)
+        with self._lock:
+            if self._versions.get(path) == version:
+                return
+            stale = [k for k in self._entries if k[0] == path]
+            for key in stale:
+                del self._entries[key]
+            if path in self._versions and stale:
+                logger.info(f"[POOL] recipes.db changed - dropped {len(stale)} cached pools")
+            self._versions[path] = version
+
+    def get(self, key: Tuple) -> Optional[List[Recipe]]:
+        with self._lock:
+            pool = self._entries.get(key)
+            if pool is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(pool)
+
+    def put(self, key: Tuple, pool: List[Recipe]):
+        with self._lock:
+            self._entries[key] = list(pool)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached pools."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def hit_ratio(self) -> float:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss counts."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+            }
+
+
 class DatabaseInterface:
     """Interface for interacting with SQLite databases."""
 
+    # Callbacks notified with the snapshot ID after every snapshot write.
+    # Shared across instances so caches see writes made through any interface.
+    _snapshot_write_listeners: List[Callable[[str], None]] = []
+
+    # Latest (plan_id, week_of, grocery_list_id) per (user_db, user_id).
+    # Class-level so a save through one interface invalidates every reader.
+    _plan_pointer_cache: Dict[Tuple[str, int], Optional[Tuple[str, str, Optional[str]]]] = {}
+    # Bumped on every invalidation so a read that overlapped a save isn't cached
+    _plan_pointer_generation: Dict[Tuple[str, int], int] = {}
+    _plan_pointer_lock = threading.Lock()
+
+    # Sampled candidate pools, shared so every interface benefits from warm pools
+    _pool_cache = PoolCache()
+
+    @classmethod
+    def pool_cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss counts for the shared candidate pool cache."""
+        return cls._pool_cache.stats()
+
+    @classmethod
+    def reset_pool_cache_stats(cls):
+        cls._pool_cache.reset_stats()
+
+    @classmethod
+    def add_snapshot_write_listener(cls, callback: Callable[[str], None]):
+        """
+        Register a callback invoked after a snapshot is written.
+
+        Args:
+            callback: Function called with the saved snapshot ID
+        """
+        if callback not in cls._snapshot_write_listeners:
+            cls._snapshot_write_listeners.append(callback)
+
     def __init__(self, db_dir: str = "data"):
         """
         Initialize database interface.
@@ -36,6 +179,12 @@ class DatabaseInterface:
 
         self._init_user_database()
 
+        # A recreated user_data.db at the same path must not see old pointers
+        with self._plan_pointer_lock:
+            for key in [k for k in self._plan_pointer_cache if k[0] == str(self.user_db)]:
+                del self._plan_pointer_cache[key]
+                self._plan_pointer_generation[key] = self._plan_pointer_generation.get(key, 0) + 1
+
     def _init_user_database(self):
         """Initialize user data database schema."""
         with sqlite3.connect(self.user_db) as conn:
@@ -249,12 +398,39 @@ class DatabaseInterface:
                 ON user_favorites(user_id)
             """)
 
+            # Draft plans built ahead of time by the preplanner
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS precomputed_plans (
+                    user_id INTEGER NOT NULL,
+                    week_of TEXT NOT NULL,
+                    dates_json TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    meals_json TEXT NOT NULL,
+                    backups_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, week_of)
+                )
+            """)
+
             conn.commit()
             logger.info("User database initialized")
 
             # Run multi-user migration
             self._migrate_to_multi_user(conn)
 
+            # Indexes for the latest-plan pointer lookup (need user_id, so after migration)
+            for index_sql in (
+                "CREATE INDEX IF NOT EXISTS idx_meal_plans_user_created "
+                "ON meal_plans(user_id, created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_grocery_lists_user_week_created "
+                "ON grocery_lists(user_id, week_of, created_at)",
+            ):
+                try:
+                    cursor.execute(index_sql)
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Skipping index creation: {e}")
+            conn.commit()
+
     def _migrate_to_multi_user(self, conn):
         """
         Migrate database tables to support multiple users.
@@ -584,6 +760,256 @@ class DatabaseInterface:
 
             return recipes
 
+    # Columns needed to produce each Recipe.to_dict() field in projections
+    RECIPE_FIELD_COLUMNS = {
+        "id": ("id",),
+        "name": ("name",),
+        "description": ("description",),
+        "ingredients": ("ingredients",),
+        "ingredients_raw": ("ingredients_raw",),
+        "ingredients_structured": ("ingredients_structured",),
+        "steps": ("steps",),
+        "servings": ("servings",),
+        "serving_size": ("serving_size",),
+        "tags": ("tags",),
+        "estimated_time": ("tags",),
+        "cuisine": ("tags",),
+        "difficulty": ("tags",),
+    }
+
+    # Time tags and their minute values, used to push max_time into SQL
+    TIME_TAG_MINUTES = {
+        "15-minutes-or-less": 15,
+        "30-minutes-or-less": 30,
+        "60-minutes-or-less": 60,
+        "4-hours-or-less": 240,
+    }
+
+    def iter_browse_recipes(
+        self,
+        query: Optional[str] = None,
+        max_time: Optional[int] = None,
+        include_tags: Optional[List[str]] = None,
+        exclude_tags: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        randomize: bool = False,
+    ) -> Tuple[Iterator[Dict[str, Any]], int, Optional[str]]:
+        """
+        List recipes as lazily decoded projected dicts with keyset pagination.
+
+        Only the columns needed for the requested fields are read, and rows are
+        decoded as the returned iterator is consumed, so a response can be
+        streamed without materialising every recipe dict.
+        Pages are ordered by rowid and continue after the rowid stored in the
+        cursor, so deep pages cost the same as the first one.
+
+        Args:
+            query: Keywords to search in name/description/ingredients
+            max_time: Maximum cooking time in minutes
+            include_tags: Tags that recipes MUST have
+            exclude_tags: Tags that recipes must NOT have
+            fields: Recipe.to_dict() keys to return (default: all). "id" is always included.
+            cursor: Opaque cursor from a previous page (None for the first page)
+            limit: Page size
+            randomize: Return a random sample instead of a page (no cursor)
+
+        Returns:
+            Tuple of (recipe dict iterator, number of rows in the page,
+            next_cursor or None when there are no more pages)
+
+        Raises:
+            ValueError: If fields contains an unknown name or the cursor is invalid
+        """
+        fields = self._resolve_recipe_fields(fields)
+        columns = sorted({col for f in fields for col in self.RECIPE_FIELD_COLUMNS[f]})
+        where, params = self._recipe_filter_sql(query, max_time, include_tags, exclude_tags)
+        filter_key = self._recipe_filter_key(query, max_time, include_tags, exclude_tags)
+
+        if randomize:
+            order = "ORDER BY RANDOM()"
+        else:
+            order = "ORDER BY rowid"
+            if cursor:
+                where += " AND rowid > ?"
+                params.append(self._decode_recipe_cursor(cursor, filter_key))
+
+        sql = f"SELECT rowid AS _rowid, {', '.join(columns)} FROM recipes WHERE {where} {order} LIMIT ?"
+        params.append(limit + 1)
+
+        with sqlite3.connect(self.recipes_db) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(sql, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        def recipes():
+            for row in rows:
+                try:
+                    yield self._row_to_projection(row, fields)
+                except Exception as e:
+                    logger.warning(f"Error parsing recipe {row['id']}: {e}")
+
+        next_cursor = None
+        if has_more and not randomize:
+            next_cursor = self._encode_recipe_cursor(rows[-1]["_rowid"], filter_key)
+        return recipes(), len(rows), next_cursor
+
+    def browse_recipes(
+        self,
+        query: Optional[str] = None,
+        max_time: Optional[int] = None,
+        include_tags: Optional[List[str]] = None,
+        exclude_tags: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        randomize: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List recipes as projected dicts with keyset pagination.
+
+        Same arguments as iter_browse_recipes().
+
+        Returns:
+            Tuple of (recipe dicts, next_cursor or None when there are no more pages)
+        """
+        recipes, _, next_cursor = self.iter_browse_recipes(
+            query=query,
+            max_time=max_time,
+            include_tags=include_tags,
+            exclude_tags=exclude_tags,
+            fields=fields,
+            cursor=cursor,
+            limit=limit,
+            randomize=randomize,
+        )
+        return list(recipes), next_cursor
+
+
+    def count_recipes(
+        self,
+        query: Optional[str] = None,
+        max_time: Optional[int] = None,
+        include_tags: Optional[List[str]] = None,
+        exclude_tags: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Count recipes matching the browse_recipes() filters without loading them.
+
+        Returns:
+            Number of matching recipes
+        """
+        where, params = self._recipe_filter_sql(query, max_time, include_tags, exclude_tags)
+        with sqlite3.connect(self.recipes_db) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM recipes WHERE {where}", params).fetchone()[0]
+
+    def _resolve_recipe_fields(self, fields: Optional[List[str]]) -> List[str]:
+        """Validate a field projection, defaulting to every Recipe.to_dict() key."""
+        if not fields:
+            return list(self.RECIPE_FIELD_COLUMNS)
+        unknown = [f for f in fields if f not in self.RECIPE_FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown recipe fields: {', '.join(unknown)}")
+        return ["id"] + [f for f in dict.fromkeys(fields) if f != "id"]
+
+    def _recipe_filter_sql(
+        self,
+        query: Optional[str],
+        max_time: Optional[int],
+        include_tags: Optional[List[str]],
+        exclude_tags: Optional[List[str]],
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause shared by browse_recipes() and count_recipes()."""
+        clauses = ["1=1"]
+        params: List[Any] = []
+
+        if query:
+            clauses.append("(name LIKE ? OR description LIKE ? OR ingredients LIKE ?)")
+            search_term = f"%{query}%"
+            params.extend([search_term, search_term, search_term])
+
+        if max_time:
+            # Only time tags at or under max_time qualify, so no post-filtering is needed
+            time_tags = [t for t, minutes in self.TIME_TAG_MINUTES.items() if minutes <= max_time]
+            if time_tags:
+                clauses.append("(" + " OR ".join("tags LIKE ?" for _ in time_tags) + ")")
+                params.extend([f"%{tag}%" for tag in time_tags])
+            else:
+                clauses.append("0")
+
+        for tag in include_tags or []:
+            clauses.append("tags LIKE ?")
+            params.append(f"%{tag}%")
+
+        for tag in exclude_tags or []:
+            clauses.append("tags NOT LIKE ?")
+            params.append(f"%{tag}%")
+
+        return " AND ".join(clauses), params
+
+    @staticmethod
+    def _recipe_filter_key(query, max_time, include_tags, exclude_tags) -> str:
+        """Short fingerprint of browse filters, embedded in cursors."""
+        raw = json.dumps([query, max_time, include_tags or [], exclude_tags or []])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=6).hexdigest()
+
+    @staticmethod
+    def _encode_recipe_cursor(rowid: int, filter_key: str) -> str:
+        """Encode a keyset position as an opaque URL-safe cursor."""
+        raw = json.dumps({"r": rowid, "f": filter_key}).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_recipe_cursor(cursor: str, filter_key: str) -> int:
+        """Decode a cursor from _encode_recipe_cursor(), checking it matches the filters."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            rowid = int(data["r"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if data.get("f") != filter_key:
+            raise ValueError("Cursor does not match the current filters")
+        return rowid
+
+    def _row_to_projection(self, row: sqlite3.Row, fields: List[str]) -> Dict[str, Any]:
+        """Convert a partial recipe row to a dict holding only the requested fields."""
+        keys = row.keys()
+
+        def column(name, default=None):
+            return row[name] if name in keys else default
+
+        def json_column(name):
+            value = column(name)
+            return json.loads(value) if value else []
+
+        ingredients_structured = None
+        if column("ingredients_structured"):
+            try:
+                ingredients_structured = [
+                    Ingredient(**ing) for ing in json.loads(row["ingredients_structured"])
+                ]
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.warning(f"Failed to parse ingredients_structured for recipe {row['id']}: {e}")
+
+        recipe = Recipe(
+            id=str(row["id"]),
+            name=column("name", ""),
+            description=column("description", ""),
+            ingredients=json_column("ingredients"),
+            ingredients_raw=json_column("ingredients_raw"),
+            ingredients_structured=ingredients_structured,
+            steps=json_column("steps"),
+            servings=column("servings") or 4,
+            serving_size=column("serving_size") or "",
+            tags=json_column("tags"),
+        )
+        data = recipe.to_dict()
+        return {f: data.get(f) for f in fields}
+
     def search_recipes_sampled(
         self,
         include_tags: Optional[List[str]] = None,
@@ -605,17 +1031,97 @@ class DatabaseInterface:
             exclude_ids: Recipe IDs to exclude
             query: Search query to match against name, description, or ingredients
             limit: Maximum number of results
-            seed: RNG seed for reproducible sampling (e.g., hash(user_id + week_of))
+            seed: RNG seed for reproducible sampling (e.g., pool_builder.day_seed(user_id, week_of, day))
                   If None, uses random sampling (not reproducible)
 
         Returns:
             List of matching Recipe objects
         """
-        import random
+        return self.search_recipes_sampled_batch(
+            include_tags=include_tags,
+            exclude_tags=exclude_tags,
+            exclude_ids=exclude_ids,
+            query=query,
+            limit=limit,
+            seeds=[seed],
+        )[0]
+
+    def search_recipes_sampled_batch(
+        self,
+        include_tags: Optional[List[str]] = None,
+        exclude_tags: Optional[List[str]] = None,
+        exclude_ids: Optional[List[str]] = None,
+        query: Optional[str] = None,
+        limit: int = 80,
+        seeds: Optional[List[Optional[int]]] = None,
+    ) -> List[List[Recipe]]:
+        """
+        Run one filtered candidate query and draw a seeded sample per seed.
+
+        Each sample is identical to search_recipes_sampled() with that seed,
+        but the candidate set is queried only once for all of them.
+
+        Args:
+            include_tags, exclude_tags, exclude_ids, query, limit: As search_recipes_sampled
+            seeds: One RNG seed per sample to draw (None entries are not reproducible)
+
+        Returns:
+            One list of Recipe objects per seed, in the same order as seeds
+        """
         import time
 
+        seeds = seeds if seeds is not None else [None]
         start_time = time.time()
+
+        # Seeded samples are deterministic for a given recipes.db, so cache them
+        version = PoolCache.db_version(self.recipes_db)
+        keys: List[Optional[Tuple]] = [None] * len(seeds)
+        samples: List[Optional[List[Recipe]]] = [None] * len(seeds)
+        if version is not None:
+            self._pool_cache.check_version(self.recipes_db, version)
+            for i, seed in enumerate(seeds):
+                if seed is not None:
+                    keys[i] = PoolCache.make_key(self.recipes_db, version, include_tags, exclude_tags,
+                                                 exclude_ids, query, limit, seed)
+                    samples[i] = self._pool_cache.get(keys[i])
+
+        missing = [i for i, sample in enumerate(samples) if sample is None]
+        cache_note = (f"cache_hits={len(seeds) - len(missing)}/{len(seeds)} "
+                      f"hit_ratio={self._pool_cache.hit_ratio():.2f}")
+        if not missing:
+            elapsed_ms = (time.time() - start_time) * 1000
+            seed_label = seeds[0] if len(seeds) == 1 else f"{len(seeds)}x"
+            logger.info(f"[POOL] tags={include_tags} rows={len(samples[0])} "
+                       f"elapsed_ms={elapsed_ms:.1f} seed={seed_label} method=cache {cache_note}")
+            return samples
+
+        fetched = self._query_sampled_batch(
+            include_tags, exclude_tags, exclude_ids, query, limit,
+            [seeds[i] for i in missing], start_time, cache_note,
+        )
+        for i, pool in zip(missing, fetched):
+            samples[i] = pool
+            if keys[i] is not None:
+                self._pool_cache.put(keys[i], pool)
+        return samples
+
+    def _query_sampled_batch(
+        self,
+        include_tags: Optional[List[str]],
+        exclude_tags: Optional[List[str]],
+        exclude_ids: Optional[List[str]],
+        query: Optional[str],
+        limit: int,
+        seeds: List[Optional[int]],
+        start_time: float,
+        cache_note: str,
+    ) -> List[List[Recipe]]:
+        """Run the candidate query and draw one sample per seed (no caching)."""
+        import random
+        import time
+
         use_recipe_tags = False
+        seed_label = seeds[0] if len(seeds) == 1 else f"{len(seeds)}x"
 
         with sqlite3.connect(self.recipes_db) as conn:
             # Apply read-only optimizations
@@ -633,13 +1139,17 @@ class DatabaseInterface:
             if use_recipe_tags and include_tags:
                 # Phase 2: Use optimized recipe_tags index queries
                 candidates = self._search_with_recipe_tags(
-                    cursor, include_tags, exclude_tags, exclude_ids, query, limit, seed
+                    cursor, include_tags, exclude_tags, exclude_ids, query, limit
                 )
                 if candidates is not None:
+                    samples = []
+                    for seed in seeds:
+                        rng = random.Random(seed) if seed is not None else random.Random()
+                        samples.append(rng.sample(candidates, min(limit, len(candidates))))
                     elapsed_ms = (time.time() - start_time) * 1000
-                    logger.info(f"[POOL] tags={include_tags} rows={len(candidates)} "
-                               f"elapsed_ms={elapsed_ms:.1f} seed={seed} method=recipe_tags")
-                    return candidates
+                    logger.info(f"[POOL] tags={include_tags} rows={len(samples[0])} "
+                               f"elapsed_ms={elapsed_ms:.1f} seed={seed_label} method=recipe_tags {cache_note}")
+                    return samples
                 # Fall through to LIKE if recipe_tags query failed
 
             # Phase 1 fallback: LIKE-based queries with rowid sampling
@@ -672,36 +1182,45 @@ class DatabaseInterface:
 
             if not all_rowids:
                 logger.info(f"[POOL] tags={include_tags} rows=0 total_match=0 "
-                           f"elapsed_ms={(time.time()-start_time)*1000:.1f} seed={seed} method=like")
-                return []
+                           f"elapsed_ms={(time.time()-start_time)*1000:.1f} seed={seed_label} method=like {cache_note}")
+                return [[] for _ in seeds]
 
             # Sample with seeded RNG for reproducibility
-            rng = random.Random(seed) if seed is not None else random.Random()
             sample_size = min(limit, len(all_rowids))
-            sampled_rowids = rng.sample(all_rowids, sample_size)
-
-            # Fetch full records by rowid
-            placeholders = ",".join(["?" for _ in sampled_rowids])
+            sampled_by_seed = []
+            for seed in seeds:
+                rng = random.Random(seed) if seed is not None else random.Random()
+                sampled_by_seed.append(rng.sample(all_rowids, sample_size))
+
+            # Fetch the union of sampled records once, by rowid
+            wanted = sorted(set().union(*sampled_by_seed))
+            placeholders = ",".join(["?" for _ in wanted])
             cursor.execute(
-                f"SELECT * FROM recipes WHERE rowid IN ({placeholders})",
-                sampled_rowids
+                f"SELECT rowid AS sample_rowid, * FROM recipes WHERE rowid IN ({placeholders})",
+                wanted
             )
             rows = cursor.fetchall()
 
-            recipes = []
+            recipes_by_rowid = {}
             for row in rows:
                 try:
-                    recipe = self._row_to_recipe(row)
-                    recipes.append(recipe)
+                    recipes_by_rowid[row["sample_rowid"]] = self._row_to_recipe(row)
                 except Exception as e:
                     logger.warning(f"Error parsing recipe {row['id']}: {e}")
                     continue
 
+            # Rowid order, as a single "rowid IN (...)" fetch returns it
+            samples = [
+                [recipes_by_rowid[r] for r in sorted(sampled) if r in recipes_by_rowid]
+                for sampled in sampled_by_seed
+            ]
+
             elapsed_ms = (time.time() - start_time) * 1000
-            logger.info(f"[POOL] tags={include_tags} rows={len(recipes)} "
-                       f"total_match={len(all_rowids)} elapsed_ms={elapsed_ms:.1f} seed={seed} method=like")
+            logger.info(f"[POOL] tags={include_tags} rows={len(samples[0])} "
+                       f"total_match={len(all_rowids)} elapsed_ms={elapsed_ms:.1f} seed={seed_label} method=like "
+                       f"{cache_note}")
 
-            return recipes
+            return samples
 
     def _search_with_recipe_tags(
         self,
@@ -711,16 +1230,14 @@ class DatabaseInterface:
         exclude_ids: Optional[List[str]],
         query: Optional[str],
         limit: int,
-        seed: Optional[int],
     ) -> Optional[List[Recipe]]:
         """
         Phase 2: Search using normalized recipe_tags table.
 
         Uses smart tag ordering (smallest result set first) with EXISTS
-        for 10-12x faster queries compared to LIKE.
+        for 10-12x faster queries compared to LIKE. Returns the unsampled
+        candidate set (up to 5x limit); callers draw seeded samples from it.
         """
-        import random
-
         try:
             # Get counts for each include tag to find smallest
             tag_counts = {}
@@ -806,10 +1323,7 @@ class DatabaseInterface:
                     logger.warning(f"Error parsing recipe {row['id']}: {e}")
                     continue
 
-            # Sample from candidates
-            rng = random.Random(seed) if seed is not None else random.Random()
-            sample_size = min(limit, len(candidates))
-            return rng.sample(candidates, sample_size)
+            return candidates
 
         except Exception as e:
             logger.warning(f"recipe_tags query failed, falling back to LIKE: {e}")
@@ -955,6 +1469,7 @@ class DatabaseInterface:
 
             conn.commit()
 
+        self._invalidate_plan_pointer(user_id)
         logger.info(f"Saved meal plan {meal_plan.id} with {len(meal_plan.meals)} meal events")
         return meal_plan.id
 
@@ -1057,6 +1572,57 @@ class DatabaseInterface:
                 for row in rows
             ]
 
+    def get_latest_plan_pointer(self, user_id: int = 1) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        Get IDs for a user's most recent meal plan without loading its meals.
+
+        Runs a single indexed query and caches the result per user until
+        the next meal plan or grocery list save. A result read while a save
+        invalidated the pointer is returned but not cached.
+
+        Args:
+            user_id: User ID (defaults to 1 for backward compatibility)
+
+        Returns:
+            Tuple of (plan_id, week_of, grocery_list_id) or None if the user
+            has no plans. grocery_list_id is None when no list exists for that week.
+        """
+        cache_key = (str(self.user_db), user_id)
+        with self._plan_pointer_lock:
+            if cache_key in self._plan_pointer_cache:
+                return self._plan_pointer_cache[cache_key]
+            generation = self._plan_pointer_generation.get(cache_key, 0)
+
+        with sqlite3.connect(self.user_db) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT mp.id, mp.week_of,
+                    (SELECT gl.id FROM grocery_lists gl
+                     WHERE gl.user_id = mp.user_id AND gl.week_of = mp.week_of
+                     ORDER BY gl.created_at DESC LIMIT 1)
+                FROM meal_plans mp
+                WHERE mp.user_id = ?
+                ORDER BY mp.created_at DESC
+                LIMIT 1
+                """,
+                (user_id,),
+            )
+            row = cursor.fetchone()
+
+        pointer = (row[0], row[1], row[2]) if row else None
+        with self._plan_pointer_lock:
+            if self._plan_pointer_generation.get(cache_key, 0) == generation:
+                self._plan_pointer_cache[cache_key] = pointer
+        return pointer
+
+    def _invalidate_plan_pointer(self, user_id: int):
+        """Drop the cached latest-plan pointer for a user."""
+        cache_key = (str(self.user_db), user_id)
+        with self._plan_pointer_lock:
+            self._plan_pointer_cache.pop(cache_key, None)
+            self._plan_pointer_generation[cache_key] = self._plan_pointer_generation.get(cache_key, 0) + 1
+
     def swap_meal_in_plan(
         self, plan_id: str, date: str, new_recipe_id: str, user_id: int = 1
     ) -> Optional[MealPlan]:
@@ -1256,6 +1822,7 @@ class DatabaseInterface:
             )
             conn.commit()
 
+        self._invalidate_plan_pointer(user_id)
         logger.info(f"Saved grocery list {grocery_list.id}")
         return grocery_list.id
 
@@ -2109,8 +2676,17 @@ class DatabaseInterface:
             conn.commit()
 
         logger.info(f"Saved snapshot {snapshot['id']} for user {snapshot['user_id']}, week {snapshot['week_of']}")
+        self._notify_snapshot_write(snapshot['id'])
         return snapshot['id']
 
+    def _notify_snapshot_write(self, snapshot_id: str):
+        """Notify registered listeners that a snapshot changed."""
+        for callback in list(self._snapshot_write_listeners):
+            try:
+                callback(snapshot_id)
+            except Exception as e:
+                logger.warning(f"Snapshot write listener failed for {snapshot_id}: {e}")
+
     def get_snapshot(self, snapshot_id: str) -> Optional[Dict]:
         """
         Get a snapshot by ID.
@@ -2136,6 +2712,37 @@ class DatabaseInterface:
 
         return None
 
+    def get_snapshot_meta(self, snapshot_id: str) -> Optional[Dict]:
+        """
+        Get snapshot metadata without loading the snapshot JSON.
+
+        Cheap enough to run on every request (primary key lookup), so it is
+        used to derive ETags and cache keys for plan responses.
+
+        Args:
+            snapshot_id: Snapshot ID
+
+        Returns:
+            Dict with id, user_id, week_of, version, updated_at or None
+        """
+        with sqlite3.connect(self.user_db) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                SELECT id, user_id, week_of, version, updated_at
+                FROM meal_plan_snapshots WHERE id = ?
+                """,
+                (snapshot_id,)
+            )
+            row = cursor.fetchone()
+
+            if row:
+                return dict(row)
+
+        return None
+
     def swap_meal_in_snapshot(
         self, snapshot_id: str, date: str, new_recipe_id: str, user_id: int = 1
     ) -> Optional[Dict]:
@@ -2230,6 +2837,131 @@ class DatabaseInterface:
 
             return [json.loads(row['snapshot_json']) for row in rows]
 
+    # ==================== Precomputed Plans ====================
+
+    def save_precomputed_plan(
+        self,
+        user_id: int,
+        week_of: str,
+        dates: List[str],
+        fingerprint: str,
+        meals: List[PlannedMeal],
+        backups: List[Recipe],
+    ):
+        """
+        Store (or replace) a user's precomputed draft plan for a week.
+
+        Args:
+            user_id: User ID
+            week_of: First date of the drafted week
+            dates: Dates the draft covers
+            fingerprint: Digest of the inputs the draft was built from
+            meals: Drafted meals with embedded recipes
+            backups: Full backup recipes for swaps
+        """
+        with sqlite3.connect(self.user_db) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO precomputed_plans
+                (user_id, week_of, dates_json, fingerprint, meals_json, backups_json, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    user_id,
+                    week_of,
+                    json.dumps(dates),
+                    fingerprint,
+                    json.dumps([meal.to_dict() for meal in meals]),
+                    json.dumps([recipe.to_dict() for recipe in backups]),
+                    datetime.now().isoformat(),
+                ),
+            )
+            conn.commit()
+
+    def get_precomputed_plan(self, user_id: int, dates: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get the newest precomputed plan covering every one of dates.
+
+        Args:
+            user_id: User ID
+            dates: Dates the caller wants planned
+
+        Returns:
+            Dict with week_of, dates, fingerprint, meals (PlannedMeal list),
+            backups (Recipe list) and created_at, or None if no draft covers them
+        """
+        for row in self._covering_precomputed_plans(user_id, dates):
+            return self._precomputed_plan_from_row(row)
+        return None
+
+    def claim_precomputed_plan(self, user_id: int, dates: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Take the newest precomputed plan covering dates, deleting it as it is read.
+
+        The delete only succeeds for the caller that still finds the row, so
+        concurrent requests can never both claim the same draft.
+
+        Args:
+            user_id: User ID
+            dates: Dates the caller wants planned
+
+        Returns:
+            Same dict as get_precomputed_plan(), or None if no draft was claimed
+        """
+        for row in self._covering_precomputed_plans(user_id, dates):
+            with sqlite3.connect(self.user_db) as conn:
+                claimed = conn.execute(
+                    "DELETE FROM precomputed_plans WHERE user_id = ? AND week_of = ? AND created_at = ?",
+                    (user_id, row["week_of"], row["created_at"])
+                ).rowcount
+                conn.commit()
+            if claimed:
+                return self._precomputed_plan_from_row(row)
+        return None
+
+    def _covering_precomputed_plans(self, user_id: int, dates: List[str]) -> List[sqlite3.Row]:
+        """A user's precomputed plan rows covering every one of dates, newest first."""
+        with sqlite3.connect(self.user_db) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM precomputed_plans WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            ).fetchall()
+        return [row for row in rows if set(dates) <= set(json.loads(row["dates_json"]))]
+
+    @staticmethod
+    def _precomputed_plan_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "week_of": row["week_of"],
+            "dates": json.loads(row["dates_json"]),
+            "fingerprint": row["fingerprint"],
+            "meals": [PlannedMeal.from_dict(m) for m in json.loads(row["meals_json"])],
+            "backups": [Recipe.from_dict(r) for r in json.loads(row["backups_json"])],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+        }
+
+    def get_active_user_ids(self, weeks_back: int = 4) -> List[int]:
+        """
+        Users who saved a meal plan or snapshot in the past N weeks.
+
+        Args:
+            weeks_back: Number of weeks to look back
+
+        Returns:
+            Sorted list of user IDs
+        """
+        since = (datetime.now() - timedelta(weeks=weeks_back)).isoformat()
+        with sqlite3.connect(self.user_db) as conn:
+            rows = conn.execute(
+                """
+                SELECT user_id FROM meal_plans WHERE created_at >= ?
+                UNION
+                SELECT user_id FROM meal_plan_snapshots WHERE updated_at >= ?
+                """,
+                (since, since)
+            ).fetchall()
+        return sorted(row[0] for row in rows if row[0] is not None)
+
     # ==================== User Authentication Operations ====================
 
     def create_user(self, username: str, password_hash: str) -> Optional[int]:
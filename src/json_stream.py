@@ -0,0 +1,193 @@
+"""
+Streaming, compressed JSON responses for large API payloads.
+
+Payload dicts may contain generators in place of lists; they are encoded
+element by element so a large recipe or grocery list never has to exist as
+one JSON string. Small responses are buffered and sent as-is; once the body
+passes a size threshold it is streamed, gzip- or brotli-compressed when the
+client accepts it.
+"""
+
+import itertools
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Response
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this are sent uncompressed in a single response
+STREAM_THRESHOLD_BYTES = 8 * 1024
+
+# Encoded JSON is coalesced into chunks of about this size before sending
+CHUNK_BYTES = 16 * 1024
+
+
+def iter_json(value: Any) -> Iterator[str]:
+    """
+    Encode a value as JSON text fragments.
+
+    Dicts are walked key by key; lists, tuples and iterators are emitted one
+    element at a time (each element encoded whole). Everything else goes
+    through json.dumps.
+    """
+    if isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + json.dumps(str(key)) + ":"
+            yield from iter_json(item)
+        yield "}"
+    elif isinstance(value, (list, tuple)) or _is_iterator(value):
+        yield "["
+        for i, item in enumerate(value):
+            yield ("," if i else "") + json.dumps(item, default=str)
+        yield "]"
+    else:
+        yield json.dumps(value, default=str)
+
+
+def _is_iterator(value: Any) -> bool:
+    return hasattr(value, "__next__") and hasattr(value, "__iter__")
+
+
+def _coalesce(fragments: Iterable[str], size: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Join small text fragments into byte chunks of roughly `size` bytes."""
+    buffer = []
+    buffered = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick a content encoding from the request's Accept-Encoding.
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    offered = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def _compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress chunks incrementally, flushing after each so clients can decode early."""
+    if encoding == "br":
+        compressor = brotli.Compressor()
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+        for chunk in chunks:
+            out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield compressor.flush()
+
+
+def compress_bytes(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given encoding ("br" or "gzip")."""
+    return b"".join(_compress_stream([body], encoding))
+
+
+def json_response(
+    payload: Dict[str, Any],
+    accept_encodings,
+    status: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    threshold: int = STREAM_THRESHOLD_BYTES,
+) -> Response:
+    """
+    Build a JSON response, streaming and compressing it once it is large.
+
+    Args:
+        payload: Dict to encode (values may be generators of JSON-able items)
+        accept_encodings: request.accept_encodings for compression negotiation
+        status: HTTP status code
+        headers: Extra response headers
+        threshold: Bodies below this many bytes are buffered and sent uncompressed
+
+    Returns:
+        Flask Response
+    """
+    chunks = _coalesce(iter_json(payload), size=min(CHUNK_BYTES, threshold) or CHUNK_BYTES)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= threshold:
+            break
+    else:
+        response = Response(b"".join(head), status=status, mimetype="application/json")
+        response.headers.update(headers or {})
+        return response
+
+    body = itertools.chain(head, chunks)
+    encoding = negotiate_encoding(accept_encodings)
+    if encoding:
+        body = _compress_stream(body, encoding)
+
+    response = Response(body, status=status, mimetype="application/json")
+    response.headers.update(headers or {})
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def json_bytes_response(
+    body: bytes,
+    accept_encodings,
+    status: int = 200,
+    compressed: Optional[Dict[str, bytes]] = None,
+    threshold: int = STREAM_THRESHOLD_BYTES,
+) -> Response:
+    """
+    Build a response from an already-encoded JSON body, compressing large ones.
+
+    Args:
+        body: Encoded JSON
+        accept_encodings: request.accept_encodings for compression negotiation
+        status: HTTP status code
+        compressed: Optional per-encoding cache; compressed bodies are stored
+                    here so repeated responses are compressed only once
+        threshold: Bodies below this many bytes are sent uncompressed
+
+    Returns:
+        Flask Response
+    """
+    encoding = negotiate_encoding(accept_encodings) if len(body) >= threshold else None
+    if encoding:
+        if compressed is not None and encoding in compressed:
+            data = compressed[encoding]
+        else:
+            data = compress_bytes(body, encoding)
+            if compressed is not None:
+                compressed[encoding] = data
+    else:
+        data = body
+
+    response = Response(data, status=status, mimetype="application/json")
+    if len(body) >= threshold:
+        response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
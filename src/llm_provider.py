@@ -4,13 +4,29 @@ LLM Provider Abstraction.
 Provides a unified interface for LLM calls that can be swapped between:
 - AnthropicProvider: Real Claude API calls
 - NullLLMProvider: Test stub for CI/CD without API keys
+- CachingLLMProvider: Disk-backed response cache around any provider
+- LocalPromptCacheProvider: Offline stand-in that accounts prompt-prefix caching
+- ReplayLLMProvider: Records real responses to fixtures and replays them offline
+- RateLimitedLLMProvider: Shared token bucket + adaptive per-model concurrency
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Optional, List, Any, Dict
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict, is_dataclass
+from pathlib import Path
+from typing import Optional, List, Any, Callable, Dict, Tuple
+import hashlib
+import json
+import math
 import os
 import logging
+import random
+import sqlite3
+import threading
+import time
+
+from perf_metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +47,22 @@ class MockToolUseBlock:
     type: str = "tool_use"
 
 
+@dataclass
+class MockUsage:
+    """Token usage, including prompt-cache accounting."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
 @dataclass
 class MockResponse:
     """Minimal response structure matching Anthropic API."""
     content: List[Any]
     stop_reason: str = "end_turn"
     model: str = "null-llm"
+    usage: Optional[MockUsage] = None
 
     @property
     def text(self) -> str:
@@ -47,6 +73,42 @@ class MockResponse:
         return ""
 
 
+# ==================== Prompt Caching ====================
+
+CACHE_CONTROL_EPHEMERAL = {"type": "ephemeral"}
+
+
+def with_cache_breakpoint(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Return a copy of a tools/system block list with a cache breakpoint on the last item.
+
+    The API caches the prompt prefix up to and including the marked item, so
+    marking the last tool caches the whole tool schema.
+    """
+    if not items:
+        return list(items)
+    marked = list(items)
+    marked[-1] = {**marked[-1], "cache_control": CACHE_CONTROL_EPHEMERAL}
+    return marked
+
+
+def system_blocks(static_text: str, dynamic_text: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Build system content blocks with a breakpoint between the static and dynamic parts.
+
+    Args:
+        static_text: Instructions that are identical on every call (cached)
+        dynamic_text: Per-call context placed after the breakpoint
+
+    Returns:
+        List of system text blocks
+    """
+    blocks = [{"type": "text", "text": static_text, "cache_control": CACHE_CONTROL_EPHEMERAL}]
+    if dynamic_text:
+        blocks.append({"type": "text", "text": dynamic_text})
+    return blocks
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -63,6 +125,29 @@ class LLMProvider(ABC):
         """Create a message/completion request."""
         pass
 
+    def stream_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Create a message, passing generated text to on_text as it arrives.
+
+        Providers without native streaming deliver each text block once the
+        full response is back. Returns the complete response either way.
+        """
+        response = self.create_message(
+            model=model, max_tokens=max_tokens, messages=messages,
+            system=system, tools=tools, **kwargs
+        )
+        emit_response_text(response, on_text)
+        return response
+
     @property
     @abstractmethod
     def is_null(self) -> bool:
@@ -70,10 +155,29 @@ class LLMProvider(ABC):
         pass
 
 
+def emit_response_text(response: Any, on_text: Optional[Callable[[str], None]]):
+    """Pass each text block of a complete response to on_text."""
+    if not on_text:
+        return
+    for block in getattr(response, "content", None) or []:
+        if getattr(block, "type", None) == "text" and block.text:
+            on_text(block.text)
+
+
 class AnthropicProvider(LLMProvider):
     """Real Anthropic Claude API provider."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client: Any = None):
+        """
+        Args:
+            api_key: API key (uses env var if not provided)
+            client: Existing Anthropic client to reuse instead of creating one
+        """
+        if client is not None:
+            self.api_key = api_key
+            self.client = client
+            return
+
         from anthropic import Anthropic
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
@@ -89,6 +193,28 @@ class AnthropicProvider(LLMProvider):
         tools: Optional[List[Dict[str, Any]]] = None,
         **kwargs
     ) -> Any:
+        params = self._build_params(model, max_tokens, messages, system, tools, **kwargs)
+        return self.client.messages.create(**params)
+
+    def stream_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Any:
+        params = self._build_params(model, max_tokens, messages, system, tools, **kwargs)
+        with self.client.messages.stream(**params) as stream:
+            for text in stream.text_stream:
+                if on_text:
+                    on_text(text)
+            return stream.get_final_message()
+
+    @staticmethod
+    def _build_params(model, max_tokens, messages, system, tools, **kwargs) -> Dict[str, Any]:
         params = {
             "model": model,
             "max_tokens": max_tokens,
@@ -99,7 +225,7 @@ class AnthropicProvider(LLMProvider):
         if tools:
             params["tools"] = tools
         params.update(kwargs)
-        return self.client.messages.create(**params)
+        return params
 
     @property
     def is_null(self) -> bool:
@@ -152,6 +278,1145 @@ class NullLLMProvider(LLMProvider):
         return True
 
 
+class LocalPromptCacheProvider(LLMProvider):
+    """
+    Offline stand-in that accounts for prompt-prefix caching like the API does.
+
+    The prompt is walked in API order (tools, system blocks, message content)
+    and every cache_control breakpoint records a hash of the prefix so far.
+    A later call whose prefix hash was already seen (within the TTL) reads
+    those tokens from cache; new breakpoints are written. Tokens are
+    estimated at ~4 characters each. Usage is returned on each response and
+    totals, with an estimated prefill latency, are available from stats(),
+    so breakpoint placement can be measured without an API key.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        min_cacheable_tokens: int = 1024,
+        seconds_per_1k_tokens: float = 0.05,
+        cache_read_cost: float = 0.1,
+        simulate_latency: bool = False,
+        response_text: str = "[LocalPromptCache: No real LLM call made]",
+    ):
+        """
+        Args:
+            ttl_seconds: How long a cached prefix stays warm (refreshed on read)
+            min_cacheable_tokens: Prefixes shorter than this are never cached
+            seconds_per_1k_tokens: Estimated prefill time for uncached input
+            cache_read_cost: Fraction of that time charged for cache reads
+            simulate_latency: Sleep for the estimated prefill time on each call
+            response_text: Text returned in every response
+        """
+        self.ttl_seconds = ttl_seconds
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.cache_read_cost = cache_read_cost
+        self.simulate_latency = simulate_latency
+        self.response_text = response_text
+        self._prefixes: Dict[str, float] = {}  # prefix hash -> expires_at
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def _segments(self, system: Any, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]):
+        """Yield prompt segments in cache-prefix order."""
+        for tool in tools or []:
+            yield tool
+        if isinstance(system, str):
+            yield {"type": "text", "text": system}
+        else:
+            for block in system or []:
+                yield block
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                for block in content:
+                    yield block
+            else:
+                yield {"type": "text", "text": content}
+
+    def _estimate_latency(self, uncached: int, cache_read: int) -> float:
+        rate = self.seconds_per_1k_tokens / 1000
+        return uncached * rate + cache_read * rate * self.cache_read_cost
+
+    def create_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[Any] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs
+    ) -> MockResponse:
+        hasher = hashlib.sha256(model.encode("utf-8"))
+        total = 0
+        breakpoints = []  # (prefix hash, tokens up to and including this segment)
+        for segment in self._segments(system, messages, tools):
+            if isinstance(segment, dict):
+                content = {k: v for k, v in segment.items() if k != "cache_control"}
+                marked = "cache_control" in segment
+            else:
+                content, marked = segment, False
+            encoded = json.dumps(content, sort_keys=True, default=_canonical_default)
+            hasher.update(encoded.encode("utf-8"))
+            total += max(1, len(encoded) // self.CHARS_PER_TOKEN)
+            if marked and total >= self.min_cacheable_tokens:
+                breakpoints.append((hasher.copy().hexdigest(), total))
+
+        now = time.time()
+        with self._lock:
+            cache_read = 0
+            for prefix, tokens in breakpoints:
+                if self._prefixes.get(prefix, 0) > now:
+                    cache_read = max(cache_read, tokens)
+            cache_creation = 0
+            if breakpoints and breakpoints[-1][1] > cache_read:
+                cache_creation = breakpoints[-1][1] - cache_read
+            for prefix, tokens in breakpoints:
+                self._prefixes[prefix] = now + self.ttl_seconds
+
+            input_tokens = total - cache_read - cache_creation
+            latency = self._estimate_latency(input_tokens + cache_creation, cache_read)
+            self._stats["calls"] += 1
+            self._stats["input_tokens"] += input_tokens
+            self._stats["cache_creation_input_tokens"] += cache_creation
+            self._stats["cache_read_input_tokens"] += cache_read
+            self._stats["prompt_tokens"] += total
+            self._stats["estimated_latency_s"] += latency
+            self._stats["estimated_uncached_latency_s"] += self._estimate_latency(total, 0)
+
+        if self.simulate_latency:
+            time.sleep(latency)
+
+        return MockResponse(
+            content=[MockTextBlock(text=self.response_text)],
+            stop_reason="end_turn",
+            model=model,
+            usage=MockUsage(
+                input_tokens=input_tokens,
+                output_tokens=0,
+                cache_creation_input_tokens=cache_creation,
+                cache_read_input_tokens=cache_read,
+            ),
+        )
+
+    def reset_stats(self):
+        self._stats = {
+            "calls": 0, "input_tokens": 0, "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0, "prompt_tokens": 0,
+            "estimated_latency_s": 0.0, "estimated_uncached_latency_s": 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Token totals, the share of prompt tokens read from cache, and latency estimates."""
+        with self._lock:
+            stats = dict(self._stats)
+        prompt = stats["prompt_tokens"]
+        stats["cache_read_ratio"] = round(stats["cache_read_input_tokens"] / prompt, 3) if prompt else 0.0
+        return stats
+
+    @property
+    def is_null(self) -> bool:
+        return True
+
+
+# ==================== Response Cache ====================
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "llm_cache.db"
+DEFAULT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_REPLAY_DIR = Path(__file__).parent.parent / "data" / "llm_fixtures"
+
+
+def _canonical_default(value: Any) -> Any:
+    """JSON fallback for SDK content blocks and dataclasses in message history."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if is_dataclass(value):
+        return asdict(value)
+    return str(value)
+
+
+def request_cache_key(
+    model: str,
+    system: Any = None,
+    messages: Optional[List[Dict[str, Any]]] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    **params
+) -> str:
+    """
+    Hash a request into a stable cache key.
+
+    The key covers (model, system, messages, tools, params) with dict keys
+    sorted, so logically identical requests hash the same regardless of how
+    their dicts were built.
+    """
+    canonical = json.dumps(
+        {
+            "model": model,
+            "system": system,
+            "messages": messages or [],
+            "tools": tools or [],
+            "params": params,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_canonical_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _serialize_response(response: Any) -> Optional[str]:
+    """Encode a response for storage, or None if it cannot be cached."""
+    try:
+        if isinstance(response, MockResponse):
+            return json.dumps({"kind": "null", "data": asdict(response)})
+        if hasattr(response, "model_dump"):
+            return json.dumps({"kind": "anthropic", "data": response.model_dump()})
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _deserialize_response(payload: str) -> Any:
+    """Rebuild a stored response with the same types the provider returned."""
+    record = json.loads(payload)
+    data = record["data"]
+    if record["kind"] == "anthropic":
+        from anthropic.types import Message
+        return Message.model_validate(data)
+
+    blocks = []
+    for block in data["content"]:
+        if block.get("type") == "tool_use":
+            blocks.append(MockToolUseBlock(**block))
+        else:
+            blocks.append(MockTextBlock(**block))
+    usage = MockUsage(**data["usage"]) if data.get("usage") else None
+    return MockResponse(content=blocks, stop_reason=data["stop_reason"], model=data["model"], usage=usage)
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed store for LLM responses.
+
+    Entries expire after a TTL and the table is kept under a byte budget by
+    evicting least-recently-used rows. A small in-memory LRU sits in front so
+    repeat hits skip SQLite and deserialization entirely.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        memory_entries: int = 256,
+    ):
+        self.db_path = Path(db_path or os.environ.get("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self._init_db()
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed "
+                "ON llm_responses(last_accessed)"
+            )
+            conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] <= now:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            elif row:
+                conn.execute(
+                    "UPDATE llm_responses SET last_accessed = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+
+        if not row:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        response = _deserialize_response(row[0])
+        with self._lock:
+            self._stats["hits"] += 1
+            self._remember(key, row[1], response)
+        return response
+
+    def put(self, key: str, response: Any, model: Optional[str] = None) -> bool:
+        """Store a response. Returns False if the response is not serializable."""
+        payload = _serialize_response(response)
+        if payload is None:
+            return False
+
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses
+                    (key, model, response, size, created_at, expires_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, model, payload, len(payload), now, expires_at, now),
+            )
+            conn.commit()
+            evicted = self._evict(conn, now)
+
+        with self._lock:
+            self._stats["stores"] += 1
+            self._stats["evictions"] += evicted
+            self._remember(key, expires_at, response)
+        return True
+
+    def _remember(self, key: str, expires_at: float, response: Any):
+        """Add to the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired rows, then least-recently-used rows over the byte budget."""
+        evicted = conn.execute(
+            "DELETE FROM llm_responses WHERE expires_at <= ?", (now,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            victims = []
+            freed = 0
+            for key, size in conn.execute(
+                "SELECT key, size FROM llm_responses ORDER BY last_accessed"
+            ):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+            evicted += len(victims)
+            with self._lock:
+                for (key,) in victims:
+                    self._memory.pop(key, None)
+
+        conn.commit()
+        return evicted
+
+    def clear(self):
+        """Remove all cached responses."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+        with self._lock:
+            self._memory.clear()
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def reset_stats(self):
+        self._stats = {
+            "hits": 0, "memory_hits": 0, "misses": 0,
+            "stores": 0, "evictions": 0, "bypassed": 0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the current hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# ==================== Record / Replay ====================
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode when no fixture matches a request."""
+
+
+class ReplayLLMProvider(LLMProvider):
+    """
+    Records request/response pairs to fixture files and replays them by request hash.
+
+    In "record" mode every call goes to the wrapped provider and the response
+    plus its measured latency is written to <fixture_dir>/<hash>.json. In
+    "replay" mode responses are served from those files with no network, and
+    latency is injected so end-to-end flows can be profiled deterministically.
+
+    Latency options:
+        None             - return immediately
+        float            - fixed delay in seconds
+        "recorded"       - the latency measured when the fixture was recorded
+        (name, *args)    - draw from a random.Random distribution method,
+                           e.g. ("uniform", 0.5, 1.5) or ("lognormvariate", 0, 0.5)
+        callable(rng)    - custom distribution returning seconds
+    """
+
+    def __init__(
+        self,
+        fixture_dir: str,
+        mode: str = "replay",
+        provider: Optional[LLMProvider] = None,
+        latency: Any = "recorded",
+        seed: Optional[int] = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            fixture_dir: Directory holding <hash>.json fixtures
+            mode: "record" or "replay"
+            provider: Real provider to call when recording
+            latency: Latency injection on replay (see class docstring)
+            seed: Seed for distribution-drawn latency
+            sleep: Sleep function (injectable for tests)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        if mode == "record" and provider is None:
+            raise ValueError("Record mode requires a provider to record from")
+
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.provider = provider
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def create_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[Any] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs
+    ) -> Any:
+        params = dict(model=model, max_tokens=max_tokens, messages=messages,
+                      system=system, tools=tools, **kwargs)
+        key = request_cache_key(**params)
+        if self.mode == "record":
+            return self._record(key, params)
+        return self._replay(key, model)
+
+    def _record(self, key: str, params: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        response = self.provider.create_message(**params)
+        elapsed = time.perf_counter() - start
+
+        payload = _serialize_response(response)
+        if payload is None:
+            logger.warning(f"[REPLAY] response for {key[:12]} not serializable, not recorded")
+            return response
+
+        fixture = {
+            "key": key,
+            "model": params["model"],
+            "latency_s": round(elapsed, 4),
+            "request": json.loads(json.dumps(params, default=_canonical_default)),
+            "response": json.loads(payload),
+        }
+        path = self.fixture_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(fixture, indent=2, ensure_ascii=False))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._fixtures[key] = fixture
+            self._stats["recorded"] += 1
+        return response
+
+    def _replay(self, key: str, model: str) -> Any:
+        fixture = self._load_fixture(key)
+        if fixture is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            raise ReplayMissError(
+                f"No replay fixture for request {key[:12]} (model={model}) in {self.fixture_dir}"
+            )
+
+        delay = self._draw_latency(fixture)
+        if delay > 0:
+            self._sleep(delay)
+        with self._lock:
+            self._stats["replayed"] += 1
+            self._stats["injected_latency_s"] += delay
+        return _deserialize_response(json.dumps(fixture["response"]))
+
+    def _load_fixture(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._fixtures:
+                return self._fixtures[key]
+        path = self.fixture_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        fixture = json.loads(path.read_text())
+        with self._lock:
+            self._fixtures[key] = fixture
+        return fixture
+
+    def _draw_latency(self, fixture: Dict[str, Any]) -> float:
+        latency = self.latency
+        if latency is None:
+            return 0.0
+        if latency == "recorded":
+            return float(fixture.get("latency_s", 0.0))
+        if isinstance(latency, (int, float)):
+            return float(latency)
+        with self._lock:
+            if callable(latency):
+                value = latency(self._rng)
+            else:
+                name, *args = latency
+                value = getattr(self._rng, name)(*args)
+        return max(0.0, float(value))
+
+    def reset_stats(self):
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0, "injected_latency_s": 0.0}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    @property
+    def is_null(self) -> bool:
+        return self.mode == "replay"
+
+
+def parse_latency_spec(spec: Optional[str]) -> Any:
+    """
+    Parse an LLM_REPLAY_LATENCY value.
+
+    "none" -> None, "recorded" -> "recorded", "0.8" -> 0.8,
+    "uniform:0.5:1.5" -> ("uniform", 0.5, 1.5)
+    """
+    if not spec or spec.lower() == "none":
+        return None
+    if spec == "recorded":
+        return spec
+    if ":" in spec:
+        name, *args = spec.split(":")
+        return (name, *(float(a) for a in args))
+    return float(spec)
+
+
+# ==================== Rate Limiting ====================
+
+DEFAULT_MAX_RPM = 50
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Upstream statuses that mean "slow down" (rate limited / overloaded)
+OVERLOAD_STATUS_CODES = {429, 503, 529}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """True for rate-limit/overload responses that should shrink concurrency."""
+    return _status_code(exc) in OVERLOAD_STATUS_CODES or type(exc).__name__ in (
+        "RateLimitError", "OverloadedError",
+    )
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """True for errors worth retrying: overloads plus connection failures/timeouts."""
+    return is_overload_error(exc) or type(exc).__name__ in (
+        "APIConnectionError", "APITimeoutError", "InternalServerError",
+    )
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, sleep: Callable[[float], None] = time.sleep) -> float:
+        """Take one token, waiting if needed. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+            waited += wait
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Semaphore whose limit adapts with AIMD.
+
+    Each success raises the limit by 1/limit (about +1 per window of calls);
+    each overload multiplies it by decrease_factor. Waiters are admitted while
+    in-flight calls are below floor(limit).
+    """
+
+    def __init__(self, initial: float, minimum: float = 1, maximum: float = DEFAULT_MAX_CONCURRENCY,
+                 decrease_factor: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= max(1, math.floor(self.limit)):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def on_overload(self):
+        with self._cond:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+class LLMRateLimiter:
+    """
+    Process-wide limiter shared by every RateLimitedLLMProvider.
+
+    A token bucket caps request starts per second across all models; an
+    AdaptiveConcurrencyLimit per model caps calls in flight. Overloads are
+    retried with full-jitter exponential backoff (honouring retry-after).
+    """
+
+    def __init__(
+        self,
+        max_rpm: float = DEFAULT_MAX_RPM,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 20.0,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.bucket = TokenBucket(rate_per_second=max_rpm / 60.0, capacity=max(1.0, max_rpm / 10.0))
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._limits: Dict[str, AdaptiveConcurrencyLimit] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _model_limit(self, model: str) -> AdaptiveConcurrencyLimit:
+        with self._lock:
+            if model not in self._limits:
+                self._limits[model] = AdaptiveConcurrencyLimit(
+                    initial=self.max_concurrency, maximum=self.max_concurrency
+                )
+                self._stats[model] = {
+                    "calls": 0, "retries": 0, "overloads": 0, "failures": 0,
+                    "queue_time_s": 0.0, "max_queue_time_s": 0.0,
+                }
+            return self._limits[model]
+
+    def _record(self, model: str, **deltas):
+        with self._lock:
+            stats = self._stats[model]
+            for name, value in deltas.items():
+                if name == "max_queue_time_s":
+                    stats[name] = max(stats[name], value)
+                else:
+                    stats[name] += value
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Full-jitter exponential backoff, at least any retry-after the server sent."""
+        with self._lock:
+            delay = self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        retry_after = _retry_after_seconds(exc)
+        return max(delay, retry_after or 0.0)
+
+    def run(self, model: str, call: Callable[[], Any], retryable: Callable[[], bool] = lambda: True) -> Any:
+        """
+        Run call() under the bucket and the model's concurrency limit, retrying overloads.
+
+        Args:
+            model: Model name (selects the concurrency limit)
+            call: Zero-argument function making the upstream request
+            retryable: Checked before each retry (e.g. False once a stream has emitted text)
+        """
+        limit = self._model_limit(model)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            self.bucket.acquire(self._sleep)
+            limit.acquire()
+            queued = time.perf_counter() - start
+            self._record(model, calls=1, queue_time_s=queued, max_queue_time_s=queued)
+            try:
+                result = call()
+            except Exception as e:
+                if is_overload_error(e):
+                    limit.on_overload()
+                    self._record(model, overloads=1)
+                if attempt >= self.max_retries or not is_retryable_error(e) or not retryable():
+                    self._record(model, failures=1)
+                    raise
+                delay = self.backoff(attempt, e)
+                logger.warning(
+                    f"[LLM-LIMIT] {model} {type(e).__name__} - retry {attempt + 1}/{self.max_retries} "
+                    f"in {delay:.2f}s (limit now {limit.limit:.1f})"
+                )
+                self._record(model, retries=1)
+                attempt += 1
+            else:
+                limit.on_success()
+                return result
+            finally:
+                limit.release()
+            self._sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model call/retry/overload counts, queue times and current limits."""
+        with self._lock:
+            models = {}
+            for model, stats in self._stats.items():
+                limit = self._limits[model]
+                calls = stats["calls"]
+                models[model] = {
+                    **stats,
+                    "avg_queue_time_ms": round(stats["queue_time_s"] / calls * 1000, 2) if calls else 0.0,
+                    "concurrency_limit": round(limit.limit, 2),
+                    "in_flight": limit.in_flight,
+                }
+            return {"models": models, "rpm_limit": round(self.bucket.rate * 60, 1)}
+
+    def reset_stats(self):
+        with self._lock:
+            for stats in self._stats.values():
+                for name in stats:
+                    stats[name] = 0
+
+
+class RateLimitedLLMProvider(LLMProvider):
+    """Provider wrapper that sends every call through an LLMRateLimiter."""
+
+    def __init__(self, provider: LLMProvider, limiter: Optional[LLMRateLimiter] = None):
+        self.provider = provider
+        self.limiter = limiter or get_rate_limiter()
+
+    def create_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs
+    ) -> Any:
+        return self.limiter.run(model, lambda: self.provider.create_message(
+            model=model, max_tokens=max_tokens, messages=messages,
+            system=system, tools=tools, **kwargs
+        ))
+
+    def stream_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Any:
+        # A stream can only be retried before any text reached the caller
+        emitted = []
+
+        def forward(text: str):
+            emitted.append(True)
+            if on_text:
+                on_text(text)
+
+        return self.limiter.run(
+            model,
+            lambda: self.provider.stream_message(
+                model=model, max_tokens=max_tokens, messages=messages,
+                system=system, tools=tools, on_text=forward, **kwargs
+            ),
+            retryable=lambda: not emitted,
+        )
+
+    @property
+    def is_null(self) -> bool:
+        return self.provider.is_null
+
+
+# ==================== Cached Client ====================
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls onto one in-flight execution.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait on the same future and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers.
+
+        Returns:
+            (result, shared) - shared is True if this caller reused another's call
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def reset_stats(self):
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        """Upstream calls made and calls saved by coalescing."""
+        with self._lock:
+            return {**self._stats, "saved_calls": self._stats["coalesced"],
+                    "in_flight": len(self._inflight)}
+
+
+class CachingLLMProvider(LLMProvider):
+    """
+    Provider wrapper that serves repeated requests from an LLMResponseCache.
+
+    Caching is opt-in per call: pass cache=True to create_message() only for
+    deterministic requests (query params, semantic/category matches, patch
+    generation) whose answer should not change between identical calls.
+    Everything else - meal name generation, recipe selection, conversational
+    turns - is sent fresh by default so repeated requests get new answers.
+    Identical requests already in flight are coalesced through a
+    SingleFlight whether or not they are cached, so concurrent callers share
+    one upstream call. With enabled=False responses are not stored but
+    concurrent identical calls are still coalesced.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        cache: Optional[LLMResponseCache] = None,
+        enabled: bool = True,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self.provider = provider
+        self.cache = (cache or get_llm_cache()) if enabled else None
+        self.single_flight = single_flight or get_single_flight()
+
+    def create_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        cache: bool = False,
+        **kwargs
+    ) -> Any:
+        return self._call(
+            self.provider.create_message, None, cache,
+            model=model, max_tokens=max_tokens, messages=messages,
+            system=system, tools=tools, **kwargs
+        )
+
+    def stream_message(
+        self,
+        model: str,
+        max_tokens: int,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        cache: bool = False,
+        **kwargs
+    ) -> Any:
+        """Stream a message; cache hits replay their text blocks to on_text."""
+        def stream(**params):
+            return self.provider.stream_message(on_text=on_text, **params)
+
+        return self._call(
+            stream, on_text, cache,
+            model=model, max_tokens=max_tokens, messages=messages,
+            system=system, tools=tools, **kwargs
+        )
+
+    def _call(self, send: Callable[..., Any], on_text, cache: bool, **params) -> Any:
+        """Serve the request and record its latency, source and tokens in perf metrics."""
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return self._serve(send, on_text, cache, **params)[0]
+
+        start = time.perf_counter()
+        try:
+            response, source = self._serve(send, on_text, cache, **params)
+        except Exception:
+            metrics.observe_llm(params["model"], time.perf_counter() - start, error=True)
+            raise
+        metrics.observe_llm(params["model"], time.perf_counter() - start, source=source,
+                            usage=getattr(response, "usage", None))
+        return response
+
+    def _serve(self, send: Callable[..., Any], on_text, cache: bool, **params) -> Tuple[Any, str]:
+        """
+        Serve a request from the cache or an identical in-flight call, else send it.
+
+        Returns:
+            (response, source) where source is "bypass", "cache", "coalesced" or "upstream"
+        """
+        key = request_cache_key(**params)
+        store = cache and self.cache is not None
+        if store:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"[LLM-CACHE] hit {key[:12]} model={params['model']}")
+                emit_response_text(cached, on_text)
+                return cached, "cache"
+        elif self.cache is not None:
+            self.cache.record_bypass()
+
+        def fetch():
+            response = send(**params)
+            if store and not self.cache.put(key, response, model=params["model"]):
+                logger.debug(f"[LLM-CACHE] response for {key[:12]} not cacheable")
+            return response
+
+        # Identical concurrent calls share one upstream call, cached or not
+        response, shared = self.single_flight.do(key, fetch)
+        if shared:
+            logger.debug(f"[LLM-CACHE] coalesced {key[:12]} onto in-flight call")
+            emit_response_text(response, on_text)
+            return response, "coalesced"
+        return response, "upstream" if cache else "bypass"
+
+    @property
+    def is_null(self) -> bool:
+        return self.provider.is_null
+
+
+class _ProviderMessages:
+    """messages.create() facade over an LLMProvider."""
+
+    def __init__(self, provider: LLMProvider):
+        self._provider = provider
+
+    def create(self, **params) -> Any:
+        return self._provider.create_message(**params)
+
+
+class ProviderClient:
+    """
+    Anthropic-client-shaped wrapper around an LLMProvider.
+
+    Lets existing `client.messages.create(...)` call sites go through the
+    provider layer without being rewritten.
+    """
+
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+        self.messages = _ProviderMessages(provider)
+
+    def stream_message(self, on_text: Optional[Callable[[str], None]] = None, **params) -> Any:
+        """Create a message, passing text deltas to on_text as they arrive."""
+        return self.provider.stream_message(on_text=on_text, **params)
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+_default_single_flight = SingleFlight()
+_default_rate_limiter: Optional[LLMRateLimiter] = None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """
+    Get the process-wide rate limiter (created on first use).
+
+    Environment Variables:
+        LLM_MAX_RPM: Requests per minute across all models (default 50)
+        LLM_MAX_CONCURRENCY: Max in-flight calls per model (default 8)
+    """
+    global _default_rate_limiter
+    with _default_cache_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = LLMRateLimiter(
+                max_rpm=float(os.environ.get("LLM_MAX_RPM", DEFAULT_MAX_RPM)),
+                max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            )
+        return _default_rate_limiter
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group shared by all cached clients."""
+    return _default_single_flight
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the process-wide response cache (created on first use)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
+
+
+def _without_sdk_retries(client: Any) -> Any:
+    """
+    Turn off the Anthropic SDK's own retries so 429/529s reach the rate limiter.
+
+    Only real Anthropic clients are changed; test doubles pass through as-is.
+    """
+    try:
+        from anthropic import Anthropic
+    except ImportError:
+        return client
+    if isinstance(client, Anthropic):
+        return client.with_options(max_retries=0)
+    return client
+
+
+def cached_client(client: Any) -> Any:
+    """
+    Route an Anthropic client through the shared response cache.
+
+    Only calls made with cache=True are served from or stored in the cache.
+
+    Environment Variables:
+        LLM_CACHE_DISABLED: Set to "true" to pass every call straight through
+        LLM_RATE_LIMIT_DISABLED: Set to "true" to skip the shared rate limiter
+        LLM_CACHE_PATH: SQLite file for cached responses
+        LLM_REPLAY_MODE: "record" or "replay" to route calls through a
+            ReplayLLMProvider (the response cache is disabled so every call
+            is recorded or replayed)
+        LLM_REPLAY_DIR: Fixture directory for record/replay
+        LLM_REPLAY_LATENCY: Replay latency - "recorded" (default), "none",
+            seconds, or "<random method>:<args>" such as "uniform:0.5:1.5"
+    """
+    enabled = os.environ.get("LLM_CACHE_DISABLED", "").lower() != "true"
+    replay_mode = os.environ.get("LLM_REPLAY_MODE", "").lower()
+
+    # Replay never touches the network, so the real client is not needed
+    provider = None
+    if replay_mode != "replay":
+        provider = AnthropicProvider(client=_without_sdk_retries(client))
+        if os.environ.get("LLM_RATE_LIMIT_DISABLED", "").lower() != "true":
+            provider = RateLimitedLLMProvider(provider)
+    if replay_mode:
+        provider = ReplayLLMProvider(
+            fixture_dir=os.environ.get("LLM_REPLAY_DIR") or str(DEFAULT_REPLAY_DIR),
+            mode=replay_mode,
+            provider=provider,
+            latency=parse_latency_spec(os.environ.get("LLM_REPLAY_LATENCY", "recorded")),
+        )
+        enabled = False
+
+    return ProviderClient(CachingLLMProvider(provider, enabled=enabled))
+
+
 def get_llm_provider(
     api_key: Optional[str] = None,
     use_null: bool = False
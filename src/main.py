@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from data.database import DatabaseInterface
+from chatbot_modules.preplanner import precompute_active_users
 
 # Try to import agentic agents first (LLM-powered)
 try:
@@ -222,7 +223,7 @@ def main():
     parser = argparse.ArgumentParser(description="Meal Planning Assistant")
     parser.add_argument(
         "command",
-        choices=["plan", "shop", "cook", "workflow"],
+        choices=["plan", "shop", "cook", "workflow", "preplan"],
         help="Command to run",
     )
     parser.add_argument(
@@ -240,6 +241,12 @@ def main():
         type=str,
         help="Recipe ID for cooking guide",
     )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        action="append",
+        help="User to preplan (repeatable; default: all active users)",
+    )
     parser.add_argument(
         "--db-dir",
         type=str,
@@ -249,6 +256,17 @@ def main():
 
     args = parser.parse_args()
 
+    if args.command == "preplan":
+        # Draft next week for active users; no agents needed (run from cron)
+        dates = None
+        if args.week:
+            week_start = datetime.fromisoformat(args.week)
+            dates = [(week_start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+        results = precompute_active_users(DatabaseInterface(db_dir=args.db_dir), dates=dates,
+                                          user_ids=args.user_id)
+        print(f"✓ Precomputed plans for {sum(results.values())}/{len(results)} users")
+        return
+
     assistant = MealPlanningAssistant(db_dir=args.db_dir)
 
     if args.command == "plan":
@@ -510,11 +510,12 @@ def generate_patch_ops(
     if client is None:
         try:
             from anthropic import Anthropic
+            from llm_provider import cached_client
             import os
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not set")
-            client = Anthropic(api_key=api_key)
+            client = cached_client(Anthropic(api_key=api_key))
         except Exception as e:
             logger.error(f"[PATCH_GEN] Failed to create Anthropic client: {e}")
             raise ValueError(f"Cannot create Anthropic client: {e}")
@@ -541,7 +542,8 @@ Generate the appropriate patch operations. Output JSON only."""
             model=PATCH_GEN_MODEL,
             max_tokens=500,
             system=PATCH_GEN_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            cache=True,
         )
 
         content = response.content[0].text.strip()
@@ -825,12 +827,13 @@ def generate_warnings(
     if client is None:
         try:
             from anthropic import Anthropic
+            from llm_provider import cached_client
             import os
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 logger.warning("[WARN_GEN] No API key, skipping warning generation")
                 return []
-            client = Anthropic(api_key=api_key)
+            client = cached_client(Anthropic(api_key=api_key))
         except Exception as e:
             logger.error(f"[WARN_GEN] Failed to create Anthropic client: {e}")
             return []
@@ -866,7 +869,8 @@ Generate warnings about these modifications. Output JSON only."""
             model=PATCH_GEN_MODEL,
             max_tokens=300,
             system=WARN_GEN_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            cache=True,
         )
 
         content = response.content[0].text.strip()
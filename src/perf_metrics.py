@@ -0,0 +1,340 @@
+"""
+Production performance metrics with fixed memory.
+
+Latencies go into log-bucketed histograms (p50/p95/p99 estimated from the
+buckets), so memory stays constant no matter how many calls are recorded.
+Series are kept per LLM model, per database method and per Flask route,
+alongside LLM token counts and response/prompt cache hit counts.
+
+Metrics are exported as JSON (snapshot) or Prometheus text (prometheus_text).
+When disabled (PERF_METRICS_DISABLED=true) nothing is wrapped or hooked and
+every observe_* call returns immediately.
+"""
+
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds: 1ms growing by 1.5x up to ~5 minutes
+HISTOGRAM_BUCKETS: Tuple[float, ...] = tuple(0.001 * 1.5 ** i for i in range(32))
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Usage fields summed per model
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+# How an LLM request was served
+LLM_SOURCES = ("upstream", "cache", "coalesced", "bypass")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe; callers hold a lock)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = 0
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / count
+                return min(max(estimate, self.min), self.max)
+            cumulative += count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        result = {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}_ms"] = round(self.quantile(q) * 1000, 2)
+        return result
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe store of latency histograms and counters."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded metrics."""
+        with self._lock:
+            self._llm: Dict[str, Histogram] = {}
+            self._llm_sources: Dict[Tuple[str, str], int] = {}
+            self._llm_tokens: Dict[Tuple[str, str], int] = {}
+            self._llm_errors: Dict[str, int] = {}
+            self._db: Dict[str, Histogram] = {}
+            self._db_errors: Dict[str, int] = {}
+            self._routes: Dict[Tuple[str, str], Histogram] = {}
+            self._statuses: Dict[Tuple[str, str, int], int] = {}
+
+    # ---- Recording ----
+
+    def observe_llm(self, model: str, duration: float, source: str = "upstream",
+                    usage: Any = None, error: bool = False):
+        """
+        Record one LLM request.
+
+        Args:
+            model: Model name
+            duration: Seconds spent serving the request
+            source: One of LLM_SOURCES (upstream/cache/coalesced/bypass)
+            usage: Response usage object; tokens are counted for upstream/bypass only
+            error: True if the request raised
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._llm.setdefault(model, Histogram()).observe(duration)
+            if error:
+                self._llm_errors[model] = self._llm_errors.get(model, 0) + 1
+                return
+            self._llm_sources[(model, source)] = self._llm_sources.get((model, source), 0) + 1
+            if usage is not None and source in ("upstream", "bypass"):
+                for field in TOKEN_FIELDS:
+                    tokens = getattr(usage, field, None)
+                    if isinstance(tokens, int) and tokens:
+                        self._llm_tokens[(model, field)] = self._llm_tokens.get((model, field), 0) + tokens
+
+    def observe_db(self, method: str, duration: float, error: bool = False):
+        """Record one database method call."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._db.setdefault(method, Histogram()).observe(duration)
+            if error:
+                self._db_errors[method] = self._db_errors.get(method, 0) + 1
+
+    def observe_route(self, route: str, method: str, status: int, duration: float):
+        """Record one HTTP request against its route pattern (not the raw path)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._routes.setdefault((method, route), Histogram()).observe(duration)
+            key = (method, route, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    # ---- Export ----
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly summary with percentiles, tokens and cache hit ratios."""
+        with self._lock:
+            llm = {}
+            for model, histogram in self._llm.items():
+                sources = {s: self._llm_sources.get((model, s), 0) for s in LLM_SOURCES}
+                tokens = {f: self._llm_tokens.get((model, f), 0) for f in TOKEN_FIELDS}
+                cacheable = sources["upstream"] + sources["cache"] + sources["coalesced"]
+                prompt_tokens = (tokens["input_tokens"] + tokens["cache_read_input_tokens"]
+                                 + tokens["cache_creation_input_tokens"])
+                llm[model] = {
+                    **histogram.summary(),
+                    "sources": sources,
+                    "errors": self._llm_errors.get(model, 0),
+                    "tokens": tokens,
+                    "response_cache_hit_ratio": round(
+                        (sources["cache"] + sources["coalesced"]) / cacheable, 3) if cacheable else 0.0,
+                    "prompt_cache_read_ratio": round(
+                        tokens["cache_read_input_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+                }
+            db = {
+                method: {**histogram.summary(), "errors": self._db_errors.get(method, 0)}
+                for method, histogram in self._db.items()
+            }
+            routes = {}
+            for (method, route), histogram in self._routes.items():
+                statuses = {str(status): count for (m, r, status), count in self._statuses.items()
+                            if m == method and r == route}
+                routes[f"{method} {route}"] = {**histogram.summary(), "statuses": statuses}
+            return {"enabled": self.enabled, "llm": llm, "db": db, "routes": routes}
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            self._histogram_lines(lines, "dinner_llm_request_seconds", "LLM request latency",
+                                  {(m,): h for m, h in self._llm.items()}, ("model",))
+            lines.append("# HELP dinner_llm_requests_total LLM requests by how they were served")
+            lines.append("# TYPE dinner_llm_requests_total counter")
+            for (model, source), count in sorted(self._llm_sources.items()):
+                lines.append(f"dinner_llm_requests_total{_labels(model=model, source=source)} {count}")
+            lines.append("# HELP dinner_llm_errors_total LLM requests that raised")
+            lines.append("# TYPE dinner_llm_errors_total counter")
+            for model, count in sorted(self._llm_errors.items()):
+                lines.append(f"dinner_llm_errors_total{_labels(model=model)} {count}")
+            lines.append("# HELP dinner_llm_tokens_total Tokens billed by upstream LLM calls")
+            lines.append("# TYPE dinner_llm_tokens_total counter")
+            for (model, field), count in sorted(self._llm_tokens.items()):
+                kind = field.replace("_tokens", "")
+                lines.append(f"dinner_llm_tokens_total{_labels(model=model, kind=kind)} {count}")
+
+            self._histogram_lines(lines, "dinner_db_query_seconds", "Database method latency",
+                                  {(m,): h for m, h in self._db.items()}, ("method",))
+            lines.append("# HELP dinner_db_errors_total Database method calls that raised")
+            lines.append("# TYPE dinner_db_errors_total counter")
+            for method, count in sorted(self._db_errors.items()):
+                lines.append(f"dinner_db_errors_total{_labels(method=method)} {count}")
+
+            self._histogram_lines(lines, "dinner_http_request_seconds", "HTTP request latency by route",
+                                  self._routes, ("method", "route"))
+            lines.append("# HELP dinner_http_responses_total HTTP responses by route and status")
+            lines.append("# TYPE dinner_http_responses_total counter")
+            for (method, route, status), count in sorted(self._statuses.items()):
+                labels = _labels(method=method, route=route, status=status)
+                lines.append(f"dinner_http_responses_total{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(lines: List[str], name: str, help_text: str,
+                         series: Dict[Tuple[str, ...], Histogram], label_names: Tuple[str, ...]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(series.items()):
+            base = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(**base, le=f'{bound:.6g}')} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(**base, le='+Inf')} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(**base)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(**base)} {histogram.count}")
+
+
+_registry = MetricsRegistry(
+    enabled=os.environ.get("PERF_METRICS_DISABLED", "").lower() != "true"
+)
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+# ==================== Instrumentation ====================
+
+def instrument_database(db: Any, registry: Optional[MetricsRegistry] = None) -> Any:
+    """
+    Time every public method of a DatabaseInterface instance.
+
+    Methods are wrapped on the instance, so other instances are unaffected.
+    Generator methods are timed from the first next() to exhaustion. Does
+    nothing when the registry is disabled.
+    """
+    registry = registry or get_metrics()
+    if not registry.enabled:
+        return db
+
+    for name in dir(type(db)):
+        if name.startswith("_"):
+            continue
+        method = getattr(db, name, None)
+        if not callable(method) or isinstance(getattr(type(db), name, None), (property, type)):
+            continue
+        setattr(db, name, _timed(method, name, registry))
+    return db
+
+
+def _timed(method: Callable, name: str, registry: MetricsRegistry) -> Callable:
+    if inspect.isgeneratorfunction(method):
+        # Creating a generator runs none of its body; time the iteration instead,
+        # from the first next() until it is exhausted, raises or is closed early
+        @functools.wraps(method)
+        def generator_wrapper(*args, **kwargs):
+            generator = method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                yield from generator
+            except Exception:
+                registry.observe_db(name, time.perf_counter() - start, error=True)
+                raise
+            except GeneratorExit:
+                registry.observe_db(name, time.perf_counter() - start)
+                raise
+            registry.observe_db(name, time.perf_counter() - start)
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            registry.observe_db(name, time.perf_counter() - start, error=True)
+            raise
+        registry.observe_db(name, time.perf_counter() - start)
+        return result
+    return wrapper
+
+
+def instrument_flask(app: Any, registry: Optional[MetricsRegistry] = None):
+    """
+    Record per-route request latency and status codes for a Flask app.
+
+    Requests are labelled by URL rule (e.g. /api/recipe/<recipe_id>) so the
+    number of series stays bounded. Does nothing when the registry is disabled.
+    """
+    from flask import g, request
+
+    registry = registry or get_metrics()
+    if not registry.enabled:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            registry.observe_route(route, request.method, response.status_code,
+                                   time.perf_counter() - start)
+        return response
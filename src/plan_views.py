@@ -0,0 +1,228 @@
+"""
+View-model builder for meal plan pages and JSON APIs.
+
+/plan, /cook, /api/plan/current and /api/plan/<id> all turn snapshot meal
+dicts into the same flattened frontend shape. This module owns that
+transform and caches the result per (snapshot_id, updated_at, page), so a
+warm render skips JSON decoding, variant resolution and date formatting.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Pages that use the display date ("Friday, November 01") instead of ISO dates
+DISPLAY_DATE_PAGES = ("plan", "cook")
+
+# Recipe fields flattened onto each meal for frontend compatibility
+FLATTENED_RECIPE_FIELDS = ("description", "estimated_time", "cuisine", "difficulty")
+
+
+@lru_cache(maxsize=512)
+def format_meal_date(date_str: str) -> str:
+    """Format an ISO date for display (e.g., "Friday, November 01")."""
+    return datetime.strptime(date_str, '%Y-%m-%d').strftime('%A, %B %d')
+
+
+def _flatten_recipe(view: Dict[str, Any], recipe: Dict[str, Any]):
+    """Copy recipe identity and summary fields onto a meal view."""
+    view['recipe_id'] = recipe.get('id')
+    view['recipe_name'] = recipe.get('name')
+    for field in FLATTENED_RECIPE_FIELDS:
+        view[field] = recipe.get(field)
+
+
+def build_meal_view(meal_dict: Dict[str, Any], page: str) -> Dict[str, Any]:
+    """
+    Flatten a planned meal dict into the frontend view shape.
+
+    Args:
+        meal_dict: PlannedMeal dict (snapshot 'planned_meals' entry or to_dict())
+        page: "plan" (base recipe, variant name only), "cook" or "api"
+              (full compiled recipe when a variant exists)
+
+    Returns:
+        New dict with recipe_id, recipe_name, flattened recipe fields,
+        has_variant and meal_date
+    """
+    view = dict(meal_dict)
+    recipe = view.get('recipe')
+    variant = view.get('variant')
+    compiled = variant.get('compiled_recipe') if variant else None
+
+    if page == "plan":
+        # Plan page keeps base recipe details and shows the variant's name
+        if recipe:
+            _flatten_recipe(view, recipe)
+        view['has_variant'] = bool(variant)
+        if variant and 'compiled_recipe' in variant:
+            view['recipe_name'] = (compiled or {}).get('name', view.get('recipe_name'))
+            view['recipe_id'] = variant.get('variant_id', view.get('recipe_id'))
+    elif compiled:
+        # Cook page and APIs cook/shop from the compiled variant
+        _flatten_recipe(view, compiled)
+        view['recipe_id'] = variant.get('variant_id', compiled.get('id'))
+        view['recipe'] = compiled
+        view['has_variant'] = True
+        view['warnings'] = variant.get('warnings', [])
+    elif recipe:
+        _flatten_recipe(view, recipe)
+        view['has_variant'] = False
+
+    if page in DISPLAY_DATE_PAGES:
+        date_str = view.get('date')
+        view['meal_date'] = format_meal_date(date_str) if date_str else date_str
+    else:
+        # APIs rename 'date' to 'meal_date' and keep ISO format
+        view['meal_date'] = view.pop('date', None)
+
+    return view
+
+
+def build_plan_view(
+    plan_id: str,
+    week_of: str,
+    meal_dicts: List[Dict[str, Any]],
+    page: str,
+    sort_by_date: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the plan view-model shared by pages and JSON APIs.
+
+    Args:
+        plan_id: Meal plan / snapshot ID
+        week_of: Week start date
+        meal_dicts: Planned meal dicts
+        page: View flavour passed to build_meal_view()
+        sort_by_date: Sort meals chronologically before flattening
+
+    Returns:
+        Dict with id, week_of and meals
+    """
+    if sort_by_date:
+        meal_dicts = sorted(meal_dicts, key=lambda m: m.get('date') or '')
+    return {
+        'id': plan_id,
+        'week_of': week_of,
+        'meals': [build_meal_view(m, page) for m in meal_dicts],
+    }
+
+
+class PlanViewCache:
+    """
+    Thread-safe LRU cache of plan view-models.
+
+    Entries are keyed by (snapshot_id, updated_at, page); a snapshot write
+    changes updated_at so stale views are never served, and invalidate()
+    frees them eagerly. Render timings are split by warm/cold cache so
+    the cost of a warm page render is visible in the metrics endpoint.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._render_stats: Dict[str, Dict[str, float]] = {}
+
+    def get_or_build(
+        self,
+        snapshot_id: str,
+        updated_at: str,
+        page: str,
+        build: Callable[[], Optional[Dict[str, Any]]],
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Return the cached view-model or build and cache it.
+
+        Args:
+            snapshot_id: Snapshot ID
+            updated_at: Snapshot updated_at timestamp
+            page: Page / endpoint name
+            build: Callable producing the view-model (None results are not cached)
+
+        Returns:
+            Tuple of (view_model, was_cached)
+        """
+        key = (snapshot_id, updated_at, page)
+        with self._lock:
+            view = self._entries.get(key)
+            if view is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return view, True
+            self.misses += 1
+
+        view = build()
+        if view is not None:
+            with self._lock:
+                self._entries[key] = view
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return view, False
+
+    def invalidate(self, snapshot_id: str):
+        """Drop every cached view built from a snapshot."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == snapshot_id]:
+                del self._entries[key]
+
+    def reset_stats(self):
+        """Reset hit/miss counts and render timings (cached views are kept)."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._render_stats = {}
+
+    def record_render(self, page: str, duration: float, warm: bool):
+        """Record a page render duration (seconds) under warm or cold cache."""
+        bucket = f"{page}:{'warm' if warm else 'cold'}"
+        with self._lock:
+            stats = self._render_stats.setdefault(bucket, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts and per-page render timings."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            renders = {
+                bucket: {
+                    "count": s["count"],
+                    "avg_ms": (s["total"] / s["count"]) * 1000 if s["count"] else 0,
+                    "max_ms": s["max"] * 1000,
+                }
+                for bucket, s in self._render_stats.items()
+            }
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "renders": renders,
+            }
+
+
+class RenderTimer:
+    """Context manager that reports a render duration to a PlanViewCache."""
+
+    def __init__(self, cache: PlanViewCache, page: str):
+        self.cache = cache
+        self.page = page
+        self.warm = False
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.cache.record_render(self.page, time.perf_counter() - self._start, self.warm)
+        return False
@@ -0,0 +1,498 @@
+"""
+Rule-based consolidation of recipe ingredients into shopping list items.
+
+Replaces the shopping agent's LLM pass for every line it can read:
+- names are normalised (lowercase, no prep/size words, singular)
+- quantities in compatible units are converted and summed: volume with
+  volume, weight with weight, count units only with the same unit
+- store sections come from the enriched category, else name keywords
+- numeric scaling instructions ("double the tacos", "triple everything",
+  "lasagna x1.5", "chili for 8") multiply the matching recipes' quantities
+
+Raw lines the parser can't read are handed back as leftovers; only those
+go to the LLM, and its answers are merged in with add_external().
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.models import IngredientContribution
+
+logger = logging.getLogger(__name__)
+
+# Canonical unit -> (dimension, size in the dimension's base unit: ml or g)
+UNIT_SIZES: Dict[str, Tuple[str, float]] = {
+    "tsp": ("volume", 4.92892),
+    "tbsp": ("volume", 14.7868),
+    "fl oz": ("volume", 29.5735),
+    "cup": ("volume", 236.588),
+    "pint": ("volume", 473.176),
+    "quart": ("volume", 946.353),
+    "gallon": ("volume", 3785.41),
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "g": ("weight", 1.0),
+    "kg": ("weight", 1000.0),
+    "oz": ("weight", 28.3495),
+    "lb": ("weight", 453.592),
+}
+METRIC_UNITS = {"ml", "l", "g", "kg"}
+PACKAGED_UNITS = {"can", "jar", "bottle", "box"}  # Shelf-stable: pantry unless enriched says otherwise
+
+# Units counted as-is; they only add up with the same unit
+COUNT_UNITS = {
+    "clove", "can", "package", "jar", "bottle", "bunch", "slice", "piece", "pinch",
+    "dash", "stick", "head", "sprig", "stalk", "box", "bag", "container", "envelope",
+}
+
+UNIT_ALIASES: Dict[str, str] = {
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tbl": "tbsp",
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "pint": "pint", "pints": "pint", "pt": "pint",
+    "quart": "quart", "quarts": "quart", "qt": "quart",
+    "gallon": "gallon", "gallons": "gallon", "gal": "gallon",
+    "fl oz": "fl oz", "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "milliliter": "ml", "milliliters": "ml", "ml": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l", "l": "l",
+    "gram": "g", "grams": "g", "g": "g",
+    "kilogram": "kg", "kilograms": "kg", "kg": "kg",
+    "ounce": "oz", "ounces": "oz", "oz": "oz",
+    "pound": "lb", "pounds": "lb", "lb": "lb", "lbs": "lb",
+    **{unit: unit for unit in COUNT_UNITS},
+    **{f"{unit}s": unit for unit in COUNT_UNITS},
+    "bunches": "bunch", "boxes": "box", "pinches": "pinch", "dashes": "dash",
+    "pkg": "package", "pkgs": "package",
+}
+# Recipe shorthand where case matters: "1 T butter" is a tablespoon, "1 t salt" a teaspoon
+CASE_SENSITIVE_UNITS = {"T": "tbsp", "t": "tsp"}
+
+WORD_NUMBERS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "dozen": 12,
+}
+UNICODE_FRACTIONS = {"¼": 0.25, "½": 0.5, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3, "⅛": 0.125}
+
+# Dropped from names: preparation, size and freshness words
+NAME_NOISE = {
+    "fresh", "freshly", "chopped", "diced", "minced", "sliced", "thinly", "finely", "coarsely",
+    "roughly", "crushed", "grated", "shredded", "peeled", "seeded", "cored", "cubed", "halved",
+    "quartered", "julienned", "trimmed", "rinsed", "drained", "softened", "melted", "beaten",
+    "sifted", "packed", "large", "medium", "small", "extra-large", "jumbo", "whole", "ripe",
+    "boneless", "skinless", "uncooked", "cooked", "raw", "optional", "divided", "plus", "more",
+    "about", "approximately", "good", "quality",
+}
+NAME_SUFFIXES = re.compile(r"\b(to taste|as needed|for garnish|for serving|or more|or to taste)\b")
+NAME_ALIASES = {
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "clove garlic": "garlic",
+    "clove of garlic": "garlic",
+    "egg yolk": "egg",
+    "egg white": "egg",
+    "cilantro leaf": "cilantro",
+    "kosher salt": "salt",
+    "sea salt": "salt",
+    "ground black pepper": "black pepper",
+    "extra virgin olive oil": "olive oil",
+    "extra-virgin olive oil": "olive oil",
+    "all-purpose flour": "flour",
+    "all purpose flour": "flour",
+}
+SINGULAR_EXCEPTIONS = {
+    "asparagus", "hummus", "couscous", "molasses", "swiss", "brussels", "citrus",
+    "grits", "greens", "chives",
+}
+
+SECTION_KEYWORDS: Dict[str, str] = {
+    # Multi-word keys are checked first, so they win over their parts
+    "peanut butter": "pantry", "coconut milk": "pantry", "tomato paste": "pantry",
+    "tomato sauce": "pantry", "soy sauce": "pantry", "black pepper": "pantry",
+    "red pepper flake": "pantry", "bell pepper": "produce", "red pepper": "produce",
+    "green pepper": "produce", "jalapeno pepper": "produce", "green onion": "produce",
+    "sour cream": "dairy", "cream cheese": "dairy", "heavy cream": "dairy", "ice cream": "frozen",
+    "frozen pea": "frozen", "frozen corn": "frozen", "ground beef": "meat",
+    "garlic powder": "pantry", "onion powder": "pantry", "chili powder": "pantry",
+    "baking powder": "pantry", "baking soda": "pantry", "olive oil": "pantry",
+    **dict.fromkeys((
+        "tomato", "onion", "garlic", "potato", "carrot", "celery", "lettuce", "spinach",
+        "broccoli", "cauliflower", "zucchini", "cucumber", "mushroom", "avocado", "lemon",
+        "lime", "apple", "banana", "orange", "berry", "strawberry", "blueberry", "cilantro",
+        "parsley", "basil", "thyme", "rosemary", "ginger", "kale", "cabbage", "corn", "jalapeno",
+        "shallot", "leek", "squash", "mint", "dill", "asparagus", "eggplant",
+    ), "produce"),
+    **dict.fromkeys((
+        "chicken", "beef", "pork", "turkey", "bacon", "sausage", "steak", "lamb", "ham",
+        "prosciutto", "chorizo", "meatball",
+    ), "meat"),
+    **dict.fromkeys((
+        "salmon", "tuna", "shrimp", "cod", "tilapia", "halibut", "crab", "lobster", "scallop",
+        "mussel", "clam", "fish", "prawn",
+    ), "seafood"),
+    **dict.fromkeys((
+        "milk", "cream", "butter", "cheese", "cheddar", "mozzarella", "parmesan", "yogurt",
+        "ricotta", "feta", "egg", "half-and-half",
+    ), "dairy"),
+    **dict.fromkeys(("bread", "tortilla", "bun", "roll", "baguette", "pita", "naan"), "bakery"),
+    **dict.fromkeys(("frozen",), "frozen"),
+    **dict.fromkeys((
+        "flour", "sugar", "salt", "rice", "pasta", "spaghetti", "noodle", "oil", "vinegar",
+        "sauce", "broth", "stock", "bean", "chickpea", "lentil", "quinoa", "oat", "honey", "pepper",
+        "syrup", "cumin", "paprika", "oregano", "cinnamon", "nutmeg", "mustard", "ketchup",
+        "mayonnaise", "salsa", "breadcrumb", "cornstarch", "yeast", "vanilla", "spice",
+    ), "pantry"),
+}
+_MULTIWORD_SECTION_KEYS = sorted((k for k in SECTION_KEYWORDS if " " in k), key=len, reverse=True)
+
+SCALE_WORDS = {"double": 2.0, "twice": 2.0, "triple": 3.0, "quadruple": 4.0, "halve": 0.5, "half": 0.5}
+ALL_RECIPES_TARGETS = {
+    "", "everything", "all", "all recipes", "all meals", "every recipe", "all of them",
+    # No recipe named: "make it for 8", "double them"
+    "it", "them", "this", "that", "these", "those", "the list", "the plan", "the week", "the whole thing",
+}
+
+_QUANTITY_RE = re.compile(
+    r"^(?P<qty>\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?(?:\s*-\s*\d+(?:\.\d+)?)?|[¼½¾⅓⅔⅛])"
+    r"(?P<frac>[¼½¾⅓⅔⅛])?\s*(?P<rest>.*)$"
+)
+_WORD_RE = re.compile(r"[a-z][a-z'\-]*")
+_CLAUSE_SPLIT_RE = re.compile(
+    r"[,;]|\.(?!\d)|\band\s+(?=(?:double|triple|quadruple|halve|half|scale|multiply|make)\b)"
+)
+_TARGET_STOPWORDS = {"the", "a", "an", "of", "recipe", "recipes", "meal", "meals", "dish", "please"}
+
+
+def parse_quantity(text: str) -> Tuple[Optional[float], str]:
+    """Leading quantity (mixed numbers, fractions, ranges, words) and the rest."""
+    text = text.strip()
+    match = _QUANTITY_RE.match(text)
+    if match:
+        qty_str = match.group("qty")
+        if qty_str in UNICODE_FRACTIONS:
+            quantity = UNICODE_FRACTIONS[qty_str]
+        elif "/" in qty_str:
+            whole, _, frac = qty_str.rpartition(" ")
+            num, denom = frac.split("/")
+            quantity = (float(whole) if whole else 0.0) + (float(num) / float(denom) if float(denom) else 0.0)
+        elif "-" in qty_str:
+            low, high = qty_str.split("-")
+            quantity = (float(low) + float(high)) / 2
+        else:
+            quantity = float(qty_str)
+        if match.group("frac"):
+            quantity += UNICODE_FRACTIONS[match.group("frac")]
+        return quantity, match.group("rest")
+
+    first, _, rest = text.partition(" ")
+    if first.lower() in WORD_NUMBERS and rest:
+        return float(WORD_NUMBERS[first.lower()]), rest
+    return None, text
+
+
+def canonical_unit(token: str) -> Optional[str]:
+    """Canonical unit for a unit word, or None (T/t are checked before lowercasing)."""
+    token = token.rstrip(".")
+    return CASE_SENSITIVE_UNITS.get(token) or UNIT_ALIASES.get(token.lower())
+
+
+def parse_unit(text: str) -> Tuple[Optional[str], str]:
+    """Canonical unit at the start of text (after any parenthetical size) and the rest."""
+    text = re.sub(r"^\([^)]*\)\s*", "", text.strip())
+    words = text.split()
+    for size in (2, 1):
+        if len(words) >= size:
+            unit = canonical_unit(" ".join(words[:size]))
+            if unit:
+                rest = " ".join(words[size:])
+                return unit, re.sub(r"^of\s+", "", rest)
+    return None, text
+
+
+def _singular(word: str) -> str:
+    if word in SINGULAR_EXCEPTIONS or len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize_name(name: str) -> str:
+    """Shopping name: lowercase, no parentheticals/prep words, singular head noun."""
+    return name_and_count_unit(name)[0]
+
+
+def name_and_count_unit(name: str) -> Tuple[str, Optional[str]]:
+    """Shopping name and any trailing count unit ("garlic cloves" -> ("garlic", "clove"))."""
+    normalized = _strip_name(name)
+    head, _, last = normalized.rpartition(" ")
+    if head and last in COUNT_UNITS:
+        return NAME_ALIASES.get(head, head), last
+    return NAME_ALIASES.get(normalized, normalized), None
+
+
+def _strip_name(name: str) -> str:
+    text = re.sub(r"\([^)]*\)", " ", name.lower())
+    text = text.split(",")[0]
+    text = NAME_SUFFIXES.sub(" ", text)
+    words = [w.strip("'-") for w in _WORD_RE.findall(text)]
+    words = [w for w in words if w and w not in NAME_NOISE]
+    while words and words[0] in ("of", "and", "or"):
+        words = words[1:]
+    while words and words[-1] in ("of", "and", "or"):
+        words = words[:-1]
+    if not words:
+        return ""
+    words[-1] = _singular(words[-1])
+    return " ".join(words)
+
+
+def store_section(name: str, category: Optional[str] = None) -> str:
+    """Store section: the enriched category if it has one, else by keyword."""
+    if category and category != "other":
+        return category
+    padded = f" {name} "
+    for key in _MULTIWORD_SECTION_KEYS:
+        if f" {key} " in padded:
+            return SECTION_KEYWORDS[key]
+    # Head noun first ("chicken broth" is pantry, "ground beef" is meat)
+    for word in reversed(name.split()):
+        section = SECTION_KEYWORDS.get(word) or SECTION_KEYWORDS.get(_singular(word))
+        if section:
+            return section
+    return "other"
+
+
+def _target_words(text: str) -> set:
+    return {_singular(w) for w in _WORD_RE.findall(text.lower())} - _TARGET_STOPWORDS
+
+
+def parse_scaling(instructions: Optional[str], servings_by_recipe: Dict[str, int]) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Per-recipe factors from numeric scaling instructions.
+
+    Understands "double/triple/halve X", "X x2" / "2x X", "scale X by 1.5"
+    and "X for 8 (people)" (relative to the recipe's servings), where X is
+    a recipe name fragment, or "everything" / "it" / nothing for all recipes.
+
+    Returns:
+        (factors by recipe name, clauses that couldn't be applied)
+    """
+    factors: Dict[str, float] = {}
+    unparsed: List[str] = []
+    if not instructions:
+        return factors, unparsed
+
+    recipe_words = {name: _target_words(name) for name in servings_by_recipe}
+    for clause in _CLAUSE_SPLIT_RE.split(instructions.lower()):
+        clause = clause.strip()
+        if not clause:
+            continue
+
+        factor, target, people = None, None, None
+        if match := re.match(r"^(?:please\s+)?(double|twice|triple|quadruple|halve|half)(?:\s+(?:of\s+)?(.+))?$", clause):
+            factor, target = SCALE_WORDS[match.group(1)], match.group(2) or ""
+        elif match := re.match(r"^(?:scale|multiply)(?:\s+(.+?))?\s+by\s+(\d+(?:\.\d+)?)$", clause):
+            target, factor = match.group(1) or "", float(match.group(2))
+        elif match := re.match(r"^(\d+(?:\.\d+)?)\s*x(?:\s+(.+))?$", clause):
+            factor, target = float(match.group(1)), match.group(2) or ""
+        elif match := re.match(r"^(?:(.+?)\s*)?x\s*(\d+(?:\.\d+)?)$", clause):
+            target, factor = match.group(1) or "", float(match.group(2))
+        elif match := re.match(
+            r"^(?:make\s+)?(?:(.+?)\s+)?for\s+(\d+)(?:\s+(?:people|servings|guests|persons))?$", clause
+        ):
+            target, people = match.group(1) or "", int(match.group(2))
+
+        if target is None:
+            unparsed.append(clause)
+            continue
+
+        target = target.strip()
+        if target not in ALL_RECIPES_TARGETS:
+            target = re.sub(r"^(?:the|all the)\s+", "", target)
+        if target in ALL_RECIPES_TARGETS:
+            matched = list(servings_by_recipe)
+        else:
+            wanted = _target_words(target)
+            overlap = {name: len(wanted & words) for name, words in recipe_words.items()}
+            best = max(overlap.values(), default=0)
+            matched = [name for name, n in overlap.items() if best and n == best]
+        if not matched:
+            unparsed.append(clause)
+            continue
+
+        for name in matched:
+            if people is not None:
+                factors[name] = people / (servings_by_recipe[name] or 4)
+            else:
+                factors[name] = factors.get(name, 1.0) * factor
+
+    if unparsed:
+        logger.warning(f"[SHOP] Scaling instructions not applied: {unparsed}")
+    return factors, unparsed
+
+
+def format_amount(amount: float) -> str:
+    """1.5 -> "1 1/2", 1.125 -> "1 1/8", 2.0 -> "2", 0.15 -> "0.15"."""
+    whole = int(amount)
+    frac = amount - whole
+    if frac < 0.02:
+        return str(whole)
+    if frac > 0.98:
+        return str(whole + 1)
+    for value, text in ((0.125, "1/8"), (0.25, "1/4"), (1 / 3, "1/3"), (0.5, "1/2"), (2 / 3, "2/3"), (0.75, "3/4")):
+        if abs(frac - value) < 0.02:
+            return f"{whole} {text}" if whole else text
+    return f"{amount:.2f}".rstrip("0").rstrip(".")
+
+
+def _display_unit(dimension: str, base_amount: float, metric: bool) -> str:
+    if dimension == "volume":
+        if metric:
+            return "l" if base_amount >= 1000 else "ml"
+        if base_amount >= UNIT_SIZES["cup"][1] / 4:
+            return "cup"
+        return "tbsp" if base_amount >= UNIT_SIZES["tbsp"][1] else "tsp"
+    if metric:
+        return "kg" if base_amount >= 1000 else "g"
+    return "lb" if base_amount >= UNIT_SIZES["lb"][1] else "oz"
+
+
+def _quantity_text(amount: float, unit: Optional[str]) -> str:
+    if not unit:
+        return format_amount(amount)
+    plural = amount > 1 and (unit in COUNT_UNITS or unit in ("cup", "pint", "quart", "gallon"))
+    if plural:
+        unit = {"bunch": "bunches", "box": "boxes", "pinch": "pinches", "dash": "dashes"}.get(unit, f"{unit}s")
+    return f"{format_amount(amount)} {unit}"
+
+
+@dataclass
+class _ItemTotals:
+    """Running totals for one normalised ingredient."""
+    name: str
+    category: str
+    amounts: Dict[str, float] = field(default_factory=dict)  # measure key -> base amount
+    imperial: Dict[str, bool] = field(default_factory=dict)  # measure key -> saw imperial units
+    contributions: List[Tuple[str, str, str, float]] = field(default_factory=list)  # (recipe, text, key, base)
+    extras: List[str] = field(default_factory=list)  # Quantities that couldn't be added up
+    sources: List[str] = field(default_factory=list)
+
+
+def _measure(unit: Optional[str]) -> Tuple[str, float]:
+    """(measure key, base size) of a canonical unit; count units are their own key."""
+    if unit in UNIT_SIZES:
+        return UNIT_SIZES[unit]
+    return f"count:{unit or ''}", 1.0
+
+
+def _has_digit(text: str) -> bool:
+    return bool(re.search(r"\d", re.sub(r"^\([^)]*\)", "", text.strip())))
+
+
+class IngredientConsolidator:
+    """Merges ingredient lines into shopping items by normalised name and unit."""
+
+    def __init__(self, factors: Optional[Dict[str, float]] = None):
+        self.factors = factors or {}
+        self._items: Dict[str, _ItemTotals] = {}
+
+    def _totals(self, name: str, category: Optional[str], recipes: List[str]) -> _ItemTotals:
+        totals = self._items.get(name)
+        if totals is None:
+            totals = self._items[name] = _ItemTotals(name=name, category=store_section(name, category))
+        totals.sources.extend(r for r in recipes if r and r not in totals.sources)
+        return totals
+
+    def _add_amount(self, totals: _ItemTotals, quantity: float, unit: Optional[str], recipe: str, text: str):
+        key, size = _measure(unit)
+        base = quantity * self.factors.get(recipe, 1.0) * size
+        totals.amounts[key] = totals.amounts.get(key, 0.0) + base
+        totals.imperial[key] = totals.imperial.get(key, False) or unit not in METRIC_UNITS
+        totals.contributions.append((recipe, text, key, base))
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        Add one collected ingredient.
+
+        item: {"ingredient": line, "recipe": name} plus, for enriched
+        recipes, "name", "quantity", "unit", "category" and "raw".
+
+        Returns:
+            False if the line couldn't be parsed (an LLM leftover)
+        """
+        recipe = item.get("recipe", "")
+        name = name_and_count_unit(item.get("name") or "")
+        if name[0] and not _has_digit(item["name"]):
+            unit = item.get("unit")
+            unit = (canonical_unit(unit) or unit) if unit else None
+            names, quantity = [name], item.get("quantity")
+        else:
+            line = item.get("raw") or item.get("ingredient", "")
+            quantity, rest = parse_quantity(line)
+            unit, rest = parse_unit(rest) if quantity is not None else (None, rest)
+            if _has_digit(rest):  # "juice of 2 lemons", "1 (8 oz) can" sizes left mid-line
+                return False
+            # "salt and pepper to taste" is two items
+            parts = re.split(r"\s+and\s+", rest) if quantity is None else [rest]
+            names = [name_and_count_unit(part) for part in parts]
+            if not all(n for n, _ in names) or any(len(n.split()) > 4 for n, _ in names):
+                return False
+
+        for name, trailing_unit in names:
+            # "2 garlic cloves": the count unit trails the name
+            item_unit = unit or trailing_unit
+
+            category = item.get("category") or ("pantry" if item_unit in PACKAGED_UNITS else None)
+            totals = self._totals(name, category, [recipe])
+            if quantity is not None:
+                self._add_amount(totals, quantity, item_unit, recipe, item.get("ingredient", ""))
+        return True
+
+    def add_external(self, name: str, quantity: str, category: Optional[str], recipes: List[str]):
+        """Merge an item consolidated elsewhere (the LLM), adding up its quantity when it parses."""
+        name = (not _has_digit(name) and normalize_name(name)) or name.strip().lower()
+        totals = self._totals(name, category, recipes)
+        amount, rest = parse_quantity(quantity)
+        unit, rest = parse_unit(rest) if amount is not None else (None, rest)
+        if amount is not None and not rest.strip():
+            self._add_amount(totals, amount, unit, recipes[0] if len(recipes) == 1 else "", quantity)
+        elif quantity.strip():
+            totals.extras.append(quantity.strip())
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Consolidated items, in first-seen order, as the shopping agent saves them."""
+        result = []
+        for totals in self._items.values():
+            display: Dict[str, Optional[str]] = {}
+            parts = []
+            for key, base in totals.amounts.items():
+                if key.startswith("count:"):
+                    display[key] = key[len("count:"):] or None
+                    parts.append(_quantity_text(base, display[key]))
+                else:
+                    unit = _display_unit(key, base, metric=not totals.imperial[key])
+                    display[key] = unit
+                    parts.append(_quantity_text(base / UNIT_SIZES[unit][1], unit))
+            parts.extend(totals.extras)
+
+            contributions = []
+            for recipe, text, key, base in totals.contributions:
+                size = 1.0 if key.startswith("count:") else UNIT_SIZES[display[key]][1]
+                contributions.append(IngredientContribution(
+                    recipe_name=recipe, quantity=text, unit=display[key] or "count", amount=base / size,
+                ))
+
+            result.append({
+                "name": totals.name,
+                "quantity": " + ".join(parts) or "as needed",
+                "category": totals.category,
+                "recipe_sources": totals.sources,
+                "contributions": contributions,
+            })
+        return result
@@ -15,6 +15,7 @@ import threading
 import sqlite3
 import uuid
 import json
+import hashlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from flask import Flask, render_template, request, jsonify, session, Response, redirect, url_for, flash
@@ -33,6 +34,12 @@ sys.path.insert(0, os.path.join(project_root, 'src'))
 from main import MealPlanningAssistant
 from chatbot import MealPlanningChatbot
 from onboarding import OnboardingFlow, check_onboarding_status
+from plan_views import PlanViewCache, RenderTimer, build_plan_view
+from json_stream import json_response, json_bytes_response
+from llm_provider import get_llm_cache, get_rate_limiter, get_single_flight
+from perf_metrics import get_metrics, instrument_database, instrument_flask
+from chatbot_modules.name_index import warm_name_index
+from chatbot_modules.preplanner import start_preplan_timer
 
 # Setup logging with both console and file output
 logs_dir = os.path.join(project_root, 'logs')
@@ -52,20 +59,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import performance monitoring (optional, only if available)
-try:
-    sys.path.insert(0, os.path.join(project_root, 'tests'))
-    from performance.instrumentation import PerformanceMonitor, track_llm_calls, track_database_queries
-    PERFORMANCE_MONITORING_ENABLED = True
-except ImportError:
-    PERFORMANCE_MONITORING_ENABLED = False
-    logger.warning("Performance monitoring not available - instrumentation.py not found")
-
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-key-change-in-production")
 CORS(app)
 
+# Performance metrics (disable with PERF_METRICS_DISABLED=true)
+perf_metrics = get_metrics()
+PERFORMANCE_MONITORING_ENABLED = perf_metrics.enabled
+instrument_flask(app, perf_metrics)
+
 # Structured logging helpers for snapshot operations
 def log_snapshot_save(snapshot_id: str, user_id: int, week_of: str):
     """Log snapshot save operation."""
@@ -121,28 +124,16 @@ def migrate_hardcoded_users():
 # Migrate existing hardcoded users to database
 migrate_hardcoded_users()
 
-# Wire up performance monitoring if available
-if PERFORMANCE_MONITORING_ENABLED:
-    perf_monitor = PerformanceMonitor()
-
-    # Track LLM calls if using agentic agents
-    if assistant.is_agentic and hasattr(assistant.planning_agent, 'client'):
-        track_llm_calls(assistant.planning_agent.client)
-        logger.info("Performance monitoring enabled for planning agent")
+# Time database calls (LLM calls are recorded by the provider layer)
+instrument_database(assistant.db, perf_metrics)
 
-    if assistant.is_agentic and hasattr(assistant.shopping_agent, 'client'):
-        track_llm_calls(assistant.shopping_agent.client)
-        logger.info("Performance monitoring enabled for shopping agent")
+# Build the recipe name index used by fuzzy meal matching in the background
+warm_name_index(assistant.db.recipes_db)
 
-    if assistant.is_agentic and hasattr(assistant.cooking_agent, 'client'):
-        track_llm_calls(assistant.cooking_agent.client)
-        logger.info("Performance monitoring enabled for cooking agent")
-
-    # Track database queries
-    track_database_queries(assistant.db)
-    logger.info("Performance monitoring enabled for database queries")
-else:
-    perf_monitor = None
+# Optionally draft next week's plans for active users in the background
+# (PREPLAN_INTERVAL_HOURS=6 re-runs every 6 hours; unset leaves it to cron)
+if os.environ.get("PREPLAN_INTERVAL_HOURS"):
+    start_preplan_timer(assistant.db, float(os.environ["PREPLAN_INTERVAL_HOURS"]))
 
 # Helper to set progress callback for the current request
 def set_agent_progress_callback(session_id: str, enable_verbose: bool = False):
@@ -186,6 +177,134 @@ state_change_lock = threading.Lock()
 shopping_list_locks = {}  # meal_plan_id -> Lock
 shopping_list_lock = threading.Lock()
 
+# Rendered plan API responses, keyed by (route, meal_plan_id, user_id, extra)
+# and stored with the ETag they were rendered for. Invalidated on snapshot writes.
+plan_response_cache = {}  # cache_key -> (etag, body_bytes, compressed_bodies)
+plan_response_cache_lock = threading.Lock()
+PLAN_RESPONSE_CACHE_MAX = 256
+
+
+def invalidate_plan_response_cache(snapshot_id: str):
+    """Drop cached plan responses that were rendered from a snapshot."""
+    with plan_response_cache_lock:
+        stale = [key for key in plan_response_cache if snapshot_id in key]
+        for key in stale:
+            del plan_response_cache[key]
+    if stale:
+        logger.debug(f"[PLAN-CACHE] Invalidated {len(stale)} response(s) for {snapshot_id}")
+
+
+assistant.db.add_snapshot_write_listener(invalidate_plan_response_cache)
+
+# Plan view-models shared by /plan, /cook and the plan APIs
+plan_view_cache = PlanViewCache()
+assistant.db.add_snapshot_write_listener(plan_view_cache.invalidate)
+
+
+def load_plan_view(snapshot_id: str, page: str):
+    """Load the view-model for a snapshot page render, using the view cache.
+
+    Returns:
+        Tuple of (view_model or None, was_cached)
+    """
+    meta = assistant.db.get_snapshot_meta(snapshot_id)
+    if not meta:
+        return None, False
+
+    def build():
+        snapshot = assistant.db.get_snapshot(snapshot_id)
+        if not snapshot or not snapshot.get('planned_meals'):
+            return None
+        log_snapshot_load(snapshot_id)
+        return build_plan_view(snapshot['id'], snapshot['week_of'], snapshot['planned_meals'], page)
+
+    return plan_view_cache.get_or_build(snapshot_id, meta['updated_at'], page, build)
+
+
+def load_api_plan_view(meal_plan_id: str, user_id: int, page: str, sort_by_date: bool = False):
+    """Load the JSON API view-model for a meal plan (variants resolved).
+
+    Snapshot-backed plans go through the view cache; legacy plans are
+    built directly from the meal_plans table.
+    """
+    def build():
+        # Use get_effective_meal_plan to get variant data from snapshot
+        meal_plan = assistant.db.get_effective_meal_plan(meal_plan_id, user_id=user_id)
+        if not meal_plan:
+            return None
+        return build_plan_view(
+            meal_plan.id,
+            meal_plan.week_of,
+            [meal.to_dict() for meal in meal_plan.meals],
+            "api",
+            sort_by_date=sort_by_date,
+        )
+
+    meta = assistant.db.get_snapshot_meta(meal_plan_id)
+    if not meta:
+        return build()
+    view, _ = plan_view_cache.get_or_build(meal_plan_id, meta['updated_at'], page, build)
+    return view
+
+
+def compute_plan_etag(meal_plan_id, *related_snapshot_ids):
+    """Build an ETag from snapshot version/updated_at, or None if the plan has no snapshot.
+
+    Legacy plans (meal_plans table only) have no updated_at, so they are
+    served uncached without an ETag. Related snapshots (e.g. the one holding
+    backup recipes) contribute to the tag when present.
+    """
+    meta = assistant.db.get_snapshot_meta(meal_plan_id)
+    if not meta:
+        return None
+    parts = [f"{meta['id']}:{meta['version']}:{meta['updated_at']}"]
+    for snapshot_id in related_snapshot_ids:
+        related = assistant.db.get_snapshot_meta(snapshot_id) if snapshot_id else None
+        parts.append(f"{related['version']}:{related['updated_at']}" if related else "-")
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return digest
+
+
+def conditional_plan_response(cache_key, etag, build_payload):
+    """Serve a plan API response with ETag / 304 handling and a response cache.
+
+    Args:
+        cache_key: Tuple identifying the response (must contain the snapshot ID)
+        etag: ETag from compute_plan_etag(), or None to bypass caching
+        build_payload: Callable returning (payload_dict, status_code)
+    """
+    if etag is None:
+        payload, status = build_payload()
+        return json_response(payload, request.accept_encodings, status=status)
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    with plan_response_cache_lock:
+        cached = plan_response_cache.get(cache_key)
+
+    if cached and cached[0] == etag:
+        logger.debug(f"[PLAN-CACHE] Hit for {cache_key}")
+        _, body, compressed = cached
+    else:
+        payload, status = build_payload()
+        if status != 200:
+            return jsonify(payload), status
+        body = app.json.dumps(payload).encode("utf-8")
+        compressed = {}  # encoding -> compressed body, filled on first use
+        with plan_response_cache_lock:
+            if len(plan_response_cache) >= PLAN_RESPONSE_CACHE_MAX:
+                plan_response_cache.pop(next(iter(plan_response_cache)))
+            plan_response_cache[cache_key] = (etag, body, compressed)
+
+    response = json_bytes_response(body, request.accept_encodings, compressed=compressed)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 
 def fetch_recipes_parallel(recipe_ids):
     """Fetch multiple recipes in parallel for faster enrichment."""
@@ -358,16 +477,17 @@ def restore_session_from_db():
     """
     user_id = session.get('user_id', 1)
     # Always get the most recent meal plan and update session if newer
-    recent_plans = assistant.db.get_recent_meal_plans(user_id=user_id, limit=1)
+    # (pointer lookup only - no meal decoding)
+    pointer = assistant.db.get_latest_plan_pointer(user_id=user_id)
 
     # If user cleared plan, only show plans created AFTER the clear
     if session.get('plan_cleared'):
-        if not recent_plans:
+        if not pointer:
             return  # No plans at all, stay cleared
 
         # Check if the most recent plan is the same one that was cleared
         cleared_plan_id = session.get('cleared_plan_id')
-        latest_plan_id = recent_plans[0].id
+        latest_plan_id = pointer[0]
 
         if cleared_plan_id == latest_plan_id:
             # Same plan that was cleared, don't restore it
@@ -379,8 +499,8 @@ def restore_session_from_db():
             session.pop('cleared_plan_id', None)
             logger.info(f"New plan created after clear: {latest_plan_id} (was {cleared_plan_id})")
 
-    if recent_plans:
-        latest_plan_id = recent_plans[0].id
+    if pointer:
+        latest_plan_id, _, grocery_list_id = pointer
         current_session_plan_id = session.get('meal_plan_id')
 
         if current_session_plan_id != latest_plan_id:
@@ -391,20 +511,9 @@ def restore_session_from_db():
             logger.info(f"Restored meal_plan_id from database: {session['meal_plan_id']}")
 
             # Also try to restore shopping list for this plan
-            if 'shopping_list_id' not in session:
-                meal_plan = recent_plans[0]
-                # Query for grocery list by week_of
-                with sqlite3.connect(assistant.db.user_db) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT id FROM grocery_lists WHERE week_of = ? AND user_id = ? ORDER BY created_at DESC LIMIT 1",
-                        (meal_plan.week_of, user_id)
-                    )
-                    row = cursor.fetchone()
-                    if row:
-                        session['shopping_list_id'] = row['id']
-                        logger.info(f"Restored shopping_list_id from database: {session['shopping_list_id']}")
+            if 'shopping_list_id' not in session and grocery_list_id:
+                session['shopping_list_id'] = grocery_list_id
+                logger.info(f"Restored shopping_list_id from database: {session['shopping_list_id']}")
 
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -533,62 +642,20 @@ def plan_page():
             snapshot_id = chatbot_instance.current_meal_plan_id
             session['snapshot_id'] = snapshot_id  # Sync session
 
-    # Load plan from snapshot (snapshots are now the only source)
-    if snapshot_id:
-        try:
-            snapshot = assistant.db.get_snapshot(snapshot_id)
-            if snapshot and snapshot.get('planned_meals'):
-                log_snapshot_load(snapshot_id)
-
-                # Transform snapshot data to frontend format
-                enriched_meals = []
-                for meal_dict in snapshot['planned_meals']:
-                    # Flatten recipe fields for frontend compatibility
-                    if 'recipe' in meal_dict and meal_dict['recipe']:
-                        recipe = meal_dict['recipe']
-                        meal_dict['recipe_id'] = recipe.get('id')
-                        meal_dict['recipe_name'] = recipe.get('name')
-                        meal_dict['description'] = recipe.get('description')
-                        meal_dict['estimated_time'] = recipe.get('estimated_time')
-                        meal_dict['cuisine'] = recipe.get('cuisine')
-                        meal_dict['difficulty'] = recipe.get('difficulty')
-
-                    # Check for variant (modified recipe)
-                    if 'variant' in meal_dict and meal_dict['variant']:
-                        meal_dict['has_variant'] = True
-                        variant = meal_dict['variant']
-                        # Use compiled recipe name for display
-                        if 'compiled_recipe' in variant:
-                            meal_dict['recipe_name'] = variant['compiled_recipe'].get('name', meal_dict.get('recipe_name'))
-                            # Use variant ID for cook link
-                            meal_dict['recipe_id'] = variant.get('variant_id', meal_dict.get('recipe_id'))
-                    else:
-                        meal_dict['has_variant'] = False
-
-                    # Format date nicely (e.g., "Friday, November 1")
-                    date_str = meal_dict.get('date')
-                    if date_str:
-                        from datetime import datetime
-                        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        meal_dict['meal_date'] = date_obj.strftime('%A, %B %d')
-                    else:
-                        meal_dict['meal_date'] = date_str
-                    enriched_meals.append(meal_dict)
-
-                current_plan = {
-                    'id': snapshot['id'],
-                    'week_of': snapshot['week_of'],
-                    'meals': enriched_meals,
-                }
-        except Exception as e:
-            logger.error(f"Error loading meal plan from snapshot: {e}")
+    # Load plan view from snapshot (snapshots are now the only source)
+    with RenderTimer(plan_view_cache, "plan") as timer:
+        if snapshot_id:
+            try:
+                current_plan, timer.warm = load_plan_view(snapshot_id, "plan")
+            except Exception as e:
+                logger.error(f"Error loading meal plan from snapshot: {e}")
 
-    return render_template(
-        'plan.html',
-        current_plan=current_plan,
-        api_key_available=API_KEY_AVAILABLE,
-        needs_onboarding=needs_onboarding,
-    )
+        return render_template(
+            'plan.html',
+            current_plan=current_plan,
+            api_key_available=API_KEY_AVAILABLE,
+            needs_onboarding=needs_onboarding,
+        )
 
 
 @app.route('/shop')
@@ -649,65 +716,19 @@ def cook_page():
             snapshot_id = chatbot_instance.current_meal_plan_id
             session['snapshot_id'] = snapshot_id  # Sync session
 
-    # Load plan from snapshot (snapshots are now the only source)
-    if snapshot_id:
-        try:
-            snapshot = assistant.db.get_snapshot(snapshot_id)
-            if snapshot and snapshot.get('planned_meals'):
-                log_snapshot_load(snapshot_id)
-
-                # Transform snapshot data to frontend format
-                enriched_meals = []
-                for meal_dict in snapshot['planned_meals']:
-                    # Check for variant first - use compiled_recipe if exists
-                    variant = meal_dict.get('variant')
-                    if variant and variant.get('compiled_recipe'):
-                        # Use variant data for Cook page
-                        compiled = variant['compiled_recipe']
-                        meal_dict['recipe_id'] = variant.get('variant_id', compiled.get('id'))
-                        meal_dict['recipe_name'] = compiled.get('name')
-                        meal_dict['description'] = compiled.get('description')
-                        meal_dict['estimated_time'] = compiled.get('estimated_time')
-                        meal_dict['cuisine'] = compiled.get('cuisine')
-                        meal_dict['difficulty'] = compiled.get('difficulty')
-                        meal_dict['recipe'] = compiled  # Use compiled recipe for embedding
-                        meal_dict['has_variant'] = True
-                        meal_dict['warnings'] = variant.get('warnings', [])
-                        logger.info(f"[COOK] Using variant for {meal_dict.get('date')}: {compiled.get('name')}")
-                    elif 'recipe' in meal_dict and meal_dict['recipe']:
-                        # Flatten recipe fields for frontend compatibility
-                        recipe = meal_dict['recipe']
-                        meal_dict['recipe_id'] = recipe.get('id')
-                        meal_dict['recipe_name'] = recipe.get('name')
-                        meal_dict['description'] = recipe.get('description')
-                        meal_dict['estimated_time'] = recipe.get('estimated_time')
-                        meal_dict['cuisine'] = recipe.get('cuisine')
-                        meal_dict['difficulty'] = recipe.get('difficulty')
-                        meal_dict['has_variant'] = False
-
-                    # Format date nicely (e.g., "Friday, November 1")
-                    date_str = meal_dict.get('date')
-                    if date_str:
-                        from datetime import datetime
-                        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        meal_dict['meal_date'] = date_obj.strftime('%A, %B %d')
-                    else:
-                        meal_dict['meal_date'] = date_str
-                    enriched_meals.append(meal_dict)
-
-                current_plan = {
-                    'id': snapshot['id'],
-                    'week_of': snapshot['week_of'],
-                    'meals': enriched_meals,
-                }
-        except Exception as e:
-            logger.error(f"Error loading meal plan from snapshot for cook page: {e}")
+    # Load plan view from snapshot (snapshots are now the only source)
+    with RenderTimer(plan_view_cache, "cook") as timer:
+        if snapshot_id:
+            try:
+                current_plan, timer.warm = load_plan_view(snapshot_id, "cook")
+            except Exception as e:
+                logger.error(f"Error loading meal plan from snapshot for cook page: {e}")
 
-    return render_template(
-        'cook.html',
-        current_plan=current_plan,
-        api_key_available=API_KEY_AVAILABLE,
-    )
+        return render_template(
+            'cook.html',
+            current_plan=current_plan,
+            api_key_available=API_KEY_AVAILABLE,
+        )
 
 
 @app.route('/settings')
@@ -1245,7 +1266,7 @@ def api_create_shopping_list():
             else:
                 logger.error(f"Shopping list creation failed: {result.get('error')}")
 
-            return jsonify(result)
+            return json_response(result, request.accept_encodings)
         finally:
             lock.release()
 
@@ -1254,6 +1275,56 @@ def api_create_shopping_list():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/shop/current', methods=['GET'])
+@login_required
+def api_get_current_shopping_list():
+    """
+    Get the grocery list for a meal plan (used by the Shop tab to refresh).
+
+    Query params:
+        meal_plan_id: Meal plan / snapshot ID (defaults to the session's plan)
+    """
+    try:
+        meal_plan_id = (request.args.get('meal_plan_id')
+                        or session.get('snapshot_id')
+                        or session.get('meal_plan_id'))
+        if not meal_plan_id:
+            return jsonify({"success": False, "error": "No meal plan available"}), 400
+
+        user_id = session.get('user_id', 1)
+
+        # Snapshot is the source of truth; fall back to legacy grocery_lists
+        grocery_list = None
+        snapshot = assistant.db.get_snapshot(meal_plan_id)
+        if snapshot and snapshot.get('user_id') != user_id:
+            return jsonify({"success": False, "error": "Meal plan not found"}), 404
+        if snapshot and snapshot.get('grocery_list'):
+            grocery_list = snapshot['grocery_list']
+        elif not snapshot:
+            legacy_list = assistant.db.get_grocery_list_by_meal_plan(meal_plan_id, user_id=user_id)
+            if legacy_list:
+                grocery_list = legacy_list.to_dict()
+
+        if not grocery_list:
+            return jsonify({"success": True, "grocery_list": None, "meal_plan_id": meal_plan_id})
+
+        # Stream item arrays instead of building one large JSON string
+        streamed_list = dict(grocery_list)
+        for key in ('items', 'extra_items'):
+            if isinstance(streamed_list.get(key), list):
+                streamed_list[key] = iter(streamed_list[key])
+
+        return json_response({
+            "success": True,
+            "meal_plan_id": meal_plan_id,
+            "grocery_list": streamed_list,
+        }, request.accept_encodings)
+
+    except Exception as e:
+        logger.error(f"Error getting current shopping list: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route('/api/cook/<recipe_id>', methods=['GET'])
 @login_required
 def api_get_cooking_guide(recipe_id):
@@ -1381,25 +1452,65 @@ def api_clear_variant():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def parse_recipe_fields(value):
+    """Parse a fields projection given as a list or comma-separated string."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [f.strip() for f in value if f and f.strip()] or None
+
+
+def is_truthy(value) -> bool:
+    """Interpret a query/json flag such as count=1 or count=true."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
 @app.route('/api/search-recipes', methods=['POST'])
 @login_required
 def api_search_recipes():
-    """Search for recipes."""
+    """
+    Search for recipes.
+
+    JSON body:
+        query, max_time, tags, limit: Search filters (as before)
+        fields: Recipe fields to return, list or comma-separated (default: all)
+        cursor: Opaque cursor for keyset paging; pass "" for the first page.
+                Without it, a random sample is returned (original behaviour).
+        count: If true, return only the number of matches
+    """
     try:
         data = request.json
+        filters = {
+            "query": data.get('query'),
+            "max_time": data.get('max_time'),
+            "include_tags": data.get('tags'),
+            "exclude_tags": None,
+        }
 
-        recipes = assistant.db.search_recipes(
-            query=data.get('query'),
-            max_time=data.get('max_time'),
-            tags=data.get('tags'),
+        if is_truthy(data.get('count')):
+            return jsonify({"success": True, "count": assistant.db.count_recipes(**filters)})
+
+        cursor = data.get('cursor')
+        recipes, _, next_cursor = assistant.db.iter_browse_recipes(
+            **filters,
+            fields=parse_recipe_fields(data.get('fields')),
+            cursor=cursor or None,
             limit=data.get('limit', 20),
+            randomize=cursor is None,
         )
 
-        return jsonify({
+        # Recipes are decoded while the response streams
+        return json_response({
             "success": True,
-            "recipes": [recipe.to_dict() for recipe in recipes],
-        })
+            "recipes": recipes,
+            "next_cursor": next_cursor,
+        }, request.accept_encodings)
 
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error searching recipes: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1417,8 +1528,13 @@ def api_browse_recipes():
         exclude_tags: Comma-separated tags recipes must NOT have (e.g., "salads")
         max_time: Maximum cooking time in minutes
         limit: Max results (default 20)
+        fields: Comma-separated recipe fields to return (default: all)
+        cursor: Opaque cursor for keyset paging; pass an empty value for the first page.
+                Without it, a random sample is returned.
+        count: If "1"/"true", return only the number of matches
 
     Example: /api/browse-recipes?query=chicken&include_tags=main-dish,whole-chicken&exclude_tags=salads
+    Paged:   /api/browse-recipes?include_tags=main-dish&fields=id,name,estimated_time&cursor=
     """
     try:
         query = request.args.get('query')
@@ -1426,31 +1542,45 @@ def api_browse_recipes():
         exclude_tags_str = request.args.get('exclude_tags', '')
         max_time = request.args.get('max_time', type=int)
         limit = request.args.get('limit', 20, type=int)
+        cursor = request.args.get('cursor')
 
         # Parse comma-separated tags
         include_tags = [t.strip() for t in include_tags_str.split(',') if t.strip()] or None
         exclude_tags = [t.strip() for t in exclude_tags_str.split(',') if t.strip()] or None
 
-        recipes = assistant.db.search_recipes(
-            query=query,
-            max_time=max_time,
-            include_tags=include_tags,
-            exclude_tags=exclude_tags,
+        filters = {
+            "query": query,
+            "include_tags": include_tags,
+            "exclude_tags": exclude_tags,
+            "max_time": max_time,
+        }
+
+        if is_truthy(request.args.get('count')):
+            return jsonify({
+                "success": True,
+                "count": assistant.db.count_recipes(**filters),
+                "filters": filters,
+            })
+
+        recipes, page_size, next_cursor = assistant.db.iter_browse_recipes(
+            **filters,
+            fields=parse_recipe_fields(request.args.get('fields')),
+            cursor=cursor or None,
             limit=limit,
+            randomize=cursor is None,
         )
 
-        return jsonify({
+        # Recipes are decoded while the response streams
+        return json_response({
             "success": True,
-            "recipes": [recipe.to_dict() for recipe in recipes],
-            "count": len(recipes),
-            "filters": {
-                "query": query,
-                "include_tags": include_tags,
-                "exclude_tags": exclude_tags,
-                "max_time": max_time,
-            }
-        })
-
+            "recipes": recipes,
+            "count": page_size,
+            "next_cursor": next_cursor,
+            "filters": filters,
+        }, request.accept_encodings)
+
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error browsing recipes: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1558,6 +1688,12 @@ def api_chat():
 
         chatbot_instance.verbose_callback = verbose_callback
 
+        # Stream LLM text to the progress stream as it is generated
+        def text_delta_callback(text):
+            emit_progress(session_id, text, "delta")
+
+        chatbot_instance.text_delta_callback = text_delta_callback
+
         # Set up progress callback for this session (for agents)
         set_agent_progress_callback(session_id, enable_verbose=verbose)
 
@@ -1890,64 +2026,36 @@ def api_get_current_plan():
             return jsonify({"success": False, "error": "No active meal plan"}), 404
 
         user_id = session.get('user_id', 1)
-        # Use get_effective_meal_plan to get variant data from snapshot
-        meal_plan = assistant.db.get_effective_meal_plan(meal_plan_id, user_id=user_id)
-        if not meal_plan:
-            return jsonify({"success": False, "error": "Meal plan not found"}), 404
-
-        # Use embedded Recipe objects from PlannedMeal (Phase 2 enhancement)
-        # No need to fetch recipes separately - they're already embedded!
-        # Sort meals by date to ensure chronological order in UI
-        sorted_meals = sorted(meal_plan.meals, key=lambda m: m.date)
-        enriched_meals = []
-        for meal in sorted_meals:
-            meal_dict = meal.to_dict()
-            # Check for variant - use compiled_recipe if exists
-            if meal.variant and 'compiled_recipe' in meal.variant:
-                compiled = meal.variant['compiled_recipe']
-                meal_dict['recipe_id'] = meal.variant.get('variant_id', compiled.get('id'))
-                meal_dict['recipe_name'] = compiled.get('name')
-                meal_dict['description'] = compiled.get('description')
-                meal_dict['estimated_time'] = compiled.get('estimated_time')
-                meal_dict['cuisine'] = compiled.get('cuisine')
-                meal_dict['difficulty'] = compiled.get('difficulty')
-                meal_dict['recipe'] = compiled  # Include full recipe for Cook page
-                meal_dict['has_variant'] = True
-                meal_dict['warnings'] = meal.variant.get('warnings', [])
-            elif meal.recipe:
-                # Flatten recipe fields for frontend compatibility
-                meal_dict['recipe_id'] = meal.recipe.id
-                meal_dict['recipe_name'] = meal.recipe.name
-                meal_dict['description'] = meal.recipe.description
-                meal_dict['estimated_time'] = meal.recipe.estimated_time
-                meal_dict['cuisine'] = meal.recipe.cuisine
-                meal_dict['difficulty'] = meal.recipe.difficulty
-                meal_dict['has_variant'] = False
-            # Rename 'date' to 'meal_date' for clarity
-            meal_dict['meal_date'] = meal_dict.pop('date', None)
-            enriched_meals.append(meal_dict)
-
-        # Get backup_recipes from snapshot (if available)
-        backup_recipes = []
         snapshot_id = session.get('snapshot_id')
-        if snapshot_id:
-            try:
-                snapshot = assistant.db.get_snapshot(snapshot_id)
-                if snapshot and 'backup_recipes' in snapshot:
-                    backup_recipes = snapshot['backup_recipes']
-                    logger.debug(f"[/api/plan/current] Found {len(backup_recipes)} backup recipes in snapshot")
-            except Exception as e:
-                logger.warning(f"Failed to load backup recipes from snapshot: {e}")
+        etag = compute_plan_etag(meal_plan_id, snapshot_id)
 
-        return jsonify({
-            "success": True,
-            "plan": {
-                'id': meal_plan.id,
-                'week_of': meal_plan.week_of,
-                'meals': enriched_meals,
-                'backup_recipes': backup_recipes,  # For instant swap modal
-            }
-        })
+        def build_payload():
+            # Sort meals by date to ensure chronological order in UI
+            plan_view = load_api_plan_view(meal_plan_id, user_id, "api_current", sort_by_date=True)
+            if not plan_view:
+                return {"success": False, "error": "Meal plan not found"}, 404
+
+            # Get backup_recipes from snapshot (if available)
+            backup_recipes = []
+            if snapshot_id:
+                try:
+                    snapshot = assistant.db.get_snapshot(snapshot_id)
+                    if snapshot and 'backup_recipes' in snapshot:
+                        backup_recipes = snapshot['backup_recipes']
+                        logger.debug(f"[/api/plan/current] Found {len(backup_recipes)} backup recipes in snapshot")
+                except Exception as e:
+                    logger.warning(f"Failed to load backup recipes from snapshot: {e}")
+
+            return {
+                "success": True,
+                "plan": {
+                    **plan_view,
+                    'backup_recipes': backup_recipes,  # For instant swap modal
+                }
+            }, 200
+
+        cache_key = ('plan_current', meal_plan_id, user_id, snapshot_id)
+        return conditional_plan_response(cache_key, etag, build_payload)
 
     except Exception as e:
         logger.error(f"Error getting current plan: {e}", exc_info=True)
@@ -1960,46 +2068,17 @@ def api_get_plan_by_id(meal_plan_id):
     """Get meal plan by ID (for cook page and localStorage-based lookups)."""
     user_id = session.get('user_id', 1)
     try:
-        # Use get_effective_meal_plan to get variant data from snapshot
-        meal_plan = assistant.db.get_effective_meal_plan(meal_plan_id, user_id=user_id)
-        if not meal_plan:
-            return jsonify({"success": False, "error": "Meal plan not found"}), 404
+        etag = compute_plan_etag(meal_plan_id)
 
-        # Use embedded Recipe objects from PlannedMeal (Phase 2 enhancement)
-        enriched_meals = []
-        for meal in meal_plan.meals:
-            meal_dict = meal.to_dict()
-            # Check for variant - use compiled_recipe if exists
-            if meal.variant and 'compiled_recipe' in meal.variant:
-                compiled = meal.variant['compiled_recipe']
-                meal_dict['recipe_id'] = meal.variant.get('variant_id', compiled.get('id'))
-                meal_dict['recipe_name'] = compiled.get('name')
-                meal_dict['description'] = compiled.get('description')
-                meal_dict['estimated_time'] = compiled.get('estimated_time')
-                meal_dict['cuisine'] = compiled.get('cuisine')
-                meal_dict['difficulty'] = compiled.get('difficulty')
-                meal_dict['recipe'] = compiled  # Include full recipe for Cook page
-                meal_dict['has_variant'] = True
-                meal_dict['warnings'] = meal.variant.get('warnings', [])
-            elif meal.recipe:
-                meal_dict['recipe_id'] = meal.recipe.id
-                meal_dict['recipe_name'] = meal.recipe.name
-                meal_dict['description'] = meal.recipe.description
-                meal_dict['estimated_time'] = meal.recipe.estimated_time
-                meal_dict['cuisine'] = meal.recipe.cuisine
-                meal_dict['difficulty'] = meal.recipe.difficulty
-                meal_dict['has_variant'] = False
-            meal_dict['meal_date'] = meal_dict.pop('date', None)
-            enriched_meals.append(meal_dict)
+        def build_payload():
+            plan_view = load_api_plan_view(meal_plan_id, user_id, "api")
+            if not plan_view:
+                return {"success": False, "error": "Meal plan not found"}, 404
 
-        return jsonify({
-            "success": True,
-            "plan": {
-                'id': meal_plan.id,
-                'week_of': meal_plan.week_of,
-                'meals': enriched_meals,
-            }
-        })
+            return {"success": True, "plan": plan_view}, 200
+
+        cache_key = ('plan_by_id', meal_plan_id, user_id)
+        return conditional_plan_response(cache_key, etag, build_payload)
 
     except Exception as e:
         logger.error(f"Error getting plan by ID: {e}", exc_info=True)
@@ -2030,7 +2109,7 @@ def api_preload_plan_data():
                     session['shopping_list_id'] = existing_list.id
                     logger.info(f"Found existing shopping list: {existing_list.id}, restoring to session")
                 else:
-                    logger.info("Generating shopping list (this may take 20-40 seconds)...")
+                    logger.info("Generating shopping list...")
                     shopping_result = assistant.create_shopping_list(meal_plan_id)
                     if shopping_result["success"]:
                         session['shopping_list_id'] = shopping_result['grocery_list_id']
@@ -2111,34 +2190,18 @@ def api_clear_plan():
 @login_required
 def api_get_performance_metrics():
     """Get current performance metrics (admin/debugging endpoint)."""
-    if not PERFORMANCE_MONITORING_ENABLED or not perf_monitor:
+    if not PERFORMANCE_MONITORING_ENABLED:
         return jsonify({"success": False, "error": "Performance monitoring not enabled"}), 503
 
     try:
-        metrics = perf_monitor.get_metrics()
-        summary = metrics.summary()
-
         return jsonify({
             "success": True,
-            "metrics": summary,
-            "llm_calls": [
-                {
-                    "timestamp": call.timestamp.isoformat(),
-                    "model": call.model,
-                    "duration": call.duration,
-                    "cached": call.cached
-                }
-                for call in metrics.llm_calls
-            ],
-            "db_queries": [
-                {
-                    "timestamp": query.timestamp.isoformat(),
-                    "query": query.query,
-                    "duration": query.duration,
-                    "rows": query.rows_returned
-                }
-                for query in metrics.db_queries
-            ]
+            "metrics": perf_metrics.snapshot(),
+            "view_cache": plan_view_cache.stats(),
+            "llm_cache": get_llm_cache().stats(),
+            "llm_single_flight": get_single_flight().stats(),
+            "llm_rate_limiter": get_rate_limiter().stats(),
+            "pool_cache": assistant.db.pool_cache_stats(),
         })
 
     except Exception as e:
@@ -2146,14 +2209,37 @@ def api_get_performance_metrics():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint.
+
+    If METRICS_TOKEN is set, requests must send "Authorization: Bearer <token>".
+    """
+    if not PERFORMANCE_MONITORING_ENABLED:
+        return Response("# performance monitoring disabled\n", status=503, mimetype="text/plain")
+
+    token = os.environ.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+
+    return Response(perf_metrics.prometheus_text(),
+                    content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.route('/api/performance/reset', methods=['POST'])
 def api_reset_performance_metrics():
     """Reset performance metrics (admin/debugging endpoint)."""
-    if not PERFORMANCE_MONITORING_ENABLED or not perf_monitor:
+    if not PERFORMANCE_MONITORING_ENABLED:
         return jsonify({"success": False, "error": "Performance monitoring not enabled"}), 503
 
     try:
-        perf_monitor.reset()
+        perf_metrics.reset()
+        plan_view_cache.reset_stats()
+        get_llm_cache().reset_stats()
+        get_single_flight().reset_stats()
+        get_rate_limiter().reset_stats()
+        assistant.db.reset_pool_cache_stats()
         logger.info("Performance metrics reset")
         return jsonify({"success": True, "message": "Performance metrics reset"})
 
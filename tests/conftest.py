@@ -56,6 +56,40 @@ def client():
         yield client
 
 
+@pytest.fixture
+def web_app(temp_db_dir, monkeypatch):
+    """
+    The src.web.app module backed by a fresh database, with plan caches reset.
+
+    The response/view caches are module-level and the snapshot listeners and
+    plan pointer cache live on DatabaseInterface, so they outlive a single
+    test; a stubbed `main` module left in sys.modules can also leave the
+    module's assistant a Mock. Each test gets its own assistant, caches and
+    listeners, all on the same module its test client serves.
+
+    Usage in tests:
+        def test_route(web_app):
+            client = web_app.app.test_client()
+            web_app.assistant.db.save_snapshot(...)
+    """
+    from types import SimpleNamespace
+    from data.database import DatabaseInterface as AppDatabaseInterface
+    from src.web import app as app_module
+
+    monkeypatch.setattr(AppDatabaseInterface, '_snapshot_write_listeners', [])
+    monkeypatch.setattr(AppDatabaseInterface, '_plan_pointer_cache', {})
+    monkeypatch.setattr(app_module, 'assistant', SimpleNamespace(db=AppDatabaseInterface(db_dir=temp_db_dir)))
+    monkeypatch.setattr(app_module, 'chatbot_instance', None)
+    monkeypatch.setattr(app_module, 'plan_response_cache', {})
+    monkeypatch.setattr(app_module, 'plan_view_cache', app_module.PlanViewCache())
+
+    AppDatabaseInterface.add_snapshot_write_listener(app_module.invalidate_plan_response_cache)
+    AppDatabaseInterface.add_snapshot_write_listener(app_module.plan_view_cache.invalidate)
+
+    app_module.app.config['TESTING'] = True
+    yield app_module
+
+
 @pytest.fixture
 def sample_recipe():
     """Sample recipe for testing."""
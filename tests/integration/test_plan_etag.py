@@ -0,0 +1,103 @@
+"""
+Integration tests for ETag / conditional responses on the plan APIs.
+
+Tests that /api/plan/current and /api/plan/<id> return an ETag derived from
+the snapshot, answer If-None-Match with 304, and re-render after snapshot writes.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+
+def _make_snapshot(recipe_name):
+    return {
+        'user_id': 1,
+        'week_of': '2025-12-01',
+        'version': 1,
+        'planned_meals': [
+            {
+                'date': '2025-12-01',
+                'meal_type': 'dinner',
+                'recipe': {
+                    'id': '789',
+                    'name': recipe_name,
+                    'description': 'ETag test recipe',
+                    'ingredients': [],
+                    'ingredients_raw': [],
+                    'steps': [],
+                    'servings': 4,
+                    'serving_size': '1',
+                    'tags': [],
+                },
+                'servings': 4,
+            }
+        ],
+        'grocery_list': None,
+    }
+
+
+@pytest.fixture
+def client(web_app):
+    """Test client for the same app module whose assistant the tests write to."""
+    with web_app.app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'admin'
+            sess['user_id'] = 1
+        yield client
+
+
+@pytest.fixture
+def logged_in_snapshot(client, web_app):
+    """Create a snapshot referenced by the session."""
+    snapshot = _make_snapshot('ETag Recipe')
+    snapshot_id = web_app.assistant.db.save_snapshot(snapshot)
+
+    with client.session_transaction() as sess:
+        sess['meal_plan_id'] = snapshot_id
+        sess['snapshot_id'] = snapshot_id
+
+    return snapshot
+
+
+def test_plan_by_id_returns_etag_and_304(client, logged_in_snapshot):
+    """A repeated request with If-None-Match gets 304 and no body."""
+    snapshot_id = logged_in_snapshot['id']
+
+    first = client.get(f'/api/plan/{snapshot_id}')
+    assert first.status_code == 200
+    assert first.headers.get('ETag')
+    assert first.get_json()['plan']['meals'][0]['recipe_name'] == 'ETag Recipe'
+
+    second = client.get(f'/api/plan/{snapshot_id}',
+                        headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.data == b''
+
+
+def test_current_plan_etag_changes_after_snapshot_write(client, web_app, logged_in_snapshot):
+    """Saving the snapshot invalidates the cached response and the ETag."""
+    first = client.get('/api/plan/current')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    snapshot = web_app.assistant.db.get_snapshot(logged_in_snapshot['id'])
+    snapshot['planned_meals'][0]['recipe']['name'] = 'Renamed Recipe'
+    web_app.assistant.db.save_snapshot(snapshot)
+
+    second = client.get('/api/plan/current', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != etag
+    assert second.get_json()['plan']['meals'][0]['recipe_name'] == 'Renamed Recipe'
+
+
+def test_legacy_plan_has_no_etag(client):
+    """Plans without a snapshot are served without caching."""
+    response = client.get('/api/plan/mp_missing_plan')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
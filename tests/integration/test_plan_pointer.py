@@ -0,0 +1,87 @@
+"""
+Integration tests for the lightweight latest-plan pointer lookup.
+
+Tests that get_latest_plan_pointer() returns (plan_id, week_of, grocery_list_id)
+for the newest plan and is invalidated by plan and grocery list saves.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from src.data.database import DatabaseInterface
+from src.data.models import MealPlan, PlannedMeal, GroceryList
+
+
+def _plan(sample_recipe, week_of, created_at):
+    return MealPlan(
+        week_of=week_of,
+        meals=[PlannedMeal(date=week_of, meal_type="dinner", recipe=sample_recipe, servings=4)],
+        created_at=created_at,
+    )
+
+
+def test_pointer_none_without_plans(db):
+    assert db.get_latest_plan_pointer(user_id=1) is None
+
+
+def test_pointer_tracks_latest_plan_and_grocery_list(db, sample_recipe):
+    now = datetime.now()
+    old_id = db.save_meal_plan(_plan(sample_recipe, "2025-11-17", now - timedelta(days=7)), user_id=1)
+    new_id = db.save_meal_plan(_plan(sample_recipe, "2025-11-24", now), user_id=1)
+
+    assert db.get_latest_plan_pointer(user_id=1) == (new_id, "2025-11-24", None)
+    assert old_id != new_id
+
+    list_id = db.save_grocery_list(GroceryList(week_of="2025-11-24", items=[]), user_id=1)
+
+    assert db.get_latest_plan_pointer(user_id=1) == (new_id, "2025-11-24", list_id)
+
+
+def test_pointer_is_scoped_per_user(db, sample_recipe):
+    plan_id = db.save_meal_plan(_plan(sample_recipe, "2025-11-24", datetime.now()), user_id=2)
+
+    assert db.get_latest_plan_pointer(user_id=1) is None
+    assert db.get_latest_plan_pointer(user_id=2)[0] == plan_id
+
+
+def test_pointer_cache_shared_across_interfaces(temp_db_dir, sample_recipe):
+    """A save through one interface is visible to another on the same database."""
+    reader = DatabaseInterface(db_dir=temp_db_dir)
+    writer = DatabaseInterface(db_dir=temp_db_dir)
+
+    assert reader.get_latest_plan_pointer(user_id=1) is None
+    plan_id = writer.save_meal_plan(_plan(sample_recipe, "2025-11-24", datetime.now()), user_id=1)
+
+    assert reader.get_latest_plan_pointer(user_id=1)[0] == plan_id
+
+
+def test_pointer_read_overlapping_a_save_is_not_cached(temp_db_dir, sample_recipe, monkeypatch):
+    """A save that commits while a read is mid-query must not be masked by the read's result."""
+    import src.data.database as database
+
+    reader = DatabaseInterface(db_dir=temp_db_dir)
+    writer = DatabaseInterface(db_dir=temp_db_dir)
+    plan_id = writer.save_meal_plan(_plan(sample_recipe, "2025-11-24", datetime.now()), user_id=1)
+    real_connect = database.sqlite3.connect
+    saved = []
+
+    class SaveAfterQuery:
+        """Connection whose query finishes just before a grocery list save commits."""
+
+        def __init__(self, *args, **kwargs):
+            self.conn = real_connect(*args, **kwargs)
+
+        def __enter__(self):
+            return self.conn.__enter__()
+
+        def __exit__(self, *exc):
+            result = self.conn.__exit__(*exc)
+            self.conn.close()
+            monkeypatch.setattr(database.sqlite3, "connect", real_connect)
+            saved.append(writer.save_grocery_list(GroceryList(week_of="2025-11-24", items=[]), user_id=1))
+            return result
+
+    monkeypatch.setattr(database.sqlite3, "connect", SaveAfterQuery)
+
+    assert reader.get_latest_plan_pointer(user_id=1) == (plan_id, "2025-11-24", None)
+    assert reader.get_latest_plan_pointer(user_id=1) == (plan_id, "2025-11-24", saved[0])
@@ -0,0 +1,101 @@
+"""
+Integration tests for projected, keyset-paginated recipe browsing.
+
+Tests browse_recipes() field projection, cursor paging and count_recipes().
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def recipes_db(db):
+    """Populate the test recipes.db with 25 recipes."""
+    with sqlite3.connect(db.recipes_db) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS recipes (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT,
+                ingredients TEXT,
+                ingredients_raw TEXT,
+                ingredients_structured TEXT,
+                steps TEXT,
+                servings INTEGER,
+                serving_size TEXT,
+                tags TEXT
+            )
+        """)
+        for i in range(25):
+            time_tag = "30-minutes-or-less" if i % 2 == 0 else "4-hours-or-less"
+            conn.execute(
+                "INSERT INTO recipes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(1000 + i),
+                    f"Chicken Dish {i}",
+                    "A dish",
+                    json.dumps(["chicken", "salt"]),
+                    json.dumps(["1 lb chicken", "1 tsp salt"]),
+                    None,
+                    json.dumps(["Cook it"] * 5),
+                    4,
+                    "1 plate",
+                    json.dumps(["main-dish", time_tag, "easy"]),
+                ),
+            )
+        conn.commit()
+    return db
+
+
+def test_projection_returns_only_requested_fields(recipes_db):
+    recipes, _ = recipes_db.browse_recipes(fields=["name", "estimated_time"], limit=3)
+
+    assert len(recipes) == 3
+    assert set(recipes[0]) == {"id", "name", "estimated_time"}
+    assert recipes[0]["estimated_time"] in (30, 240)
+
+
+def test_default_projection_matches_to_dict(recipes_db):
+    recipes, _ = recipes_db.browse_recipes(limit=1)
+    full = recipes_db.get_recipe(recipes[0]["id"]).to_dict()
+
+    for key, value in full.items():
+        assert recipes[0][key] == value
+
+
+def test_unknown_field_rejected(recipes_db):
+    with pytest.raises(ValueError):
+        recipes_db.browse_recipes(fields=["name", "secret"])
+
+
+def test_keyset_pages_cover_all_rows_once(recipes_db):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = recipes_db.browse_recipes(fields=["id"], cursor=cursor, limit=10)
+        seen.extend(r["id"] for r in page)
+        if not cursor:
+            break
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_max_time_filter_and_count(recipes_db):
+    recipes, _ = recipes_db.browse_recipes(max_time=30, fields=["estimated_time"], limit=50)
+
+    assert len(recipes) == 13
+    assert all(r["estimated_time"] == 30 for r in recipes)
+    assert recipes_db.count_recipes(max_time=30) == 13
+    assert recipes_db.count_recipes(query="chicken", include_tags=["main-dish"]) == 25
+
+
+def test_cursor_bound_to_filters(recipes_db):
+    _, cursor = recipes_db.browse_recipes(include_tags=["main-dish"], limit=5)
+
+    with pytest.raises(ValueError):
+        recipes_db.browse_recipes(include_tags=["dessert"], cursor=cursor)
+    with pytest.raises(ValueError):
+        recipes_db.browse_recipes(cursor="not-a-cursor")
@@ -0,0 +1,57 @@
+"""
+Integration tests for GET /api/shop/current.
+
+Tests that the Shop tab's refresh endpoint serves the grocery list of the
+session user's own snapshot and does not expose other users' lists.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+
+def _make_snapshot(user_id, item_name):
+    return {
+        'user_id': user_id,
+        'week_of': '2025-12-01',
+        'version': 1,
+        'planned_meals': [],
+        'grocery_list': {
+            'week_of': '2025-12-01',
+            'items': [{'name': item_name, 'quantity': '1', 'category': 'produce', 'recipe_sources': []}],
+            'extra_items': [],
+        },
+    }
+
+
+@pytest.fixture
+def client(web_app):
+    """Test client logged in as user 1."""
+    with web_app.app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'admin'
+            sess['user_id'] = 1
+        yield client
+
+
+def test_returns_own_grocery_list(client, web_app):
+    snapshot_id = web_app.assistant.db.save_snapshot(_make_snapshot(1, 'Onion'))
+
+    response = client.get(f'/api/shop/current?meal_plan_id={snapshot_id}')
+
+    assert response.status_code == 200
+    assert response.get_json()['grocery_list']['items'][0]['name'] == 'Onion'
+
+
+def test_other_users_grocery_list_is_not_found(client, web_app):
+    snapshot_id = web_app.assistant.db.save_snapshot(_make_snapshot(2, 'Secret Truffle'))
+
+    response = client.get(f'/api/shop/current?meal_plan_id={snapshot_id}')
+
+    assert response.status_code == 404
+    assert b'Secret Truffle' not in response.data
@@ -0,0 +1,120 @@
+"""
+Unit tests for token-budgeted conversation history compaction.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import MockTextBlock, MockToolUseBlock
+from chatbot_modules.history_manager import (
+    SUMMARY_PREFIX,
+    compact_history,
+    estimate_tokens,
+    split_turns,
+)
+
+
+def _turn(i, result_chars=4000):
+    """One user turn with a tool call (SDK-style blocks) and a large result."""
+    tool_id = f"tu_{i}"
+    return [
+        {"role": "user", "content": f"Request {i}: plan some dinners"},
+        {"role": "assistant", "content": [
+            MockTextBlock(text="Planning..."),
+            MockToolUseBlock(id=tool_id, name="plan_meals_smart", input={"num_days": 5}),
+        ]},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": tool_id, "content": "x" * result_chars},
+        ]},
+        {"role": "assistant", "content": f"Here is plan {i}."},
+    ]
+
+
+def _history(turns, **kwargs):
+    history = []
+    for i in range(turns):
+        history.extend(_turn(i, **kwargs))
+    return history
+
+
+def _assert_pairs_valid(messages):
+    """Every tool_use is answered by a tool_result in the next message."""
+    for i, message in enumerate(messages):
+        content = message["content"]
+        if message["role"] != "assistant" or not isinstance(content, list):
+            continue
+        use_ids = {b.id for b in content if getattr(b, "type", None) == "tool_use"}
+        if use_ids:
+            result_ids = {b["tool_use_id"] for b in messages[i + 1]["content"]
+                          if b.get("type") == "tool_result"}
+            assert use_ids == result_ids
+
+
+def test_small_history_unchanged():
+    history = _history(2, result_chars=100)
+
+    compacted, stats = compact_history(history, token_budget=10000)
+
+    assert compacted is history
+    assert stats["shortened"] == 0
+
+
+def test_older_tool_results_become_references():
+    history = _history(3)
+
+    compacted, stats = compact_history(history, token_budget=2000)
+
+    assert stats["shortened"] == 2
+    assert stats["summarized_turns"] == 0
+    assert compacted[2]["content"][0]["content"].startswith("[plan_meals_smart result shortened")
+    # Current turn keeps its full result
+    assert compacted[-2]["content"][0]["content"] == "x" * 4000
+    # Input not mutated
+    assert history[2]["content"][0]["content"] == "x" * 4000
+
+
+def test_old_turns_summarized_and_pairs_stay_valid():
+    history = _history(30)
+
+    compacted, stats = compact_history(history, token_budget=1500)
+
+    assert stats["summarized_turns"] > 0
+    assert stats["tokens_after"] <= 1500
+    assert compacted[0]["content"].startswith(SUMMARY_PREFIX)
+    assert compacted[1]["role"] == "assistant"
+    assert compacted[-1]["content"] == "Here is plan 29."
+    _assert_pairs_valid(compacted)
+
+
+def test_prompt_size_stays_bounded_over_long_session():
+    history = []
+    sizes = []
+    for i in range(60):
+        history.extend(_turn(i))
+        history, _ = compact_history(history, token_budget=2000)
+        sizes.append(estimate_tokens(history))
+
+    assert max(sizes) <= 2000
+    assert sum(1 for turn in split_turns(history) if turn[0]["content"].startswith(SUMMARY_PREFIX)) == 1
+    _assert_pairs_valid(history)
+
+
+def test_current_turn_answered_results_shortened_last():
+    turn = _turn(0, result_chars=6000)
+    # A second tool round in the same turn
+    turn[-1:] = [
+        {"role": "assistant", "content": [MockToolUseBlock(id="tu_b", name="search_recipes", input={})]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "tu_b", "content": "y" * 3000}]},
+    ]
+
+    compacted, stats = compact_history(turn, token_budget=1500)
+
+    assert compacted[2]["content"][0]["content"].startswith("[plan_meals_smart result shortened")
+    assert compacted[-1]["content"][0]["content"] == "y" * 3000
+    _assert_pairs_valid(compacted)
@@ -0,0 +1,76 @@
+"""
+Unit tests for streaming, compressed JSON responses.
+"""
+
+import gzip
+import json
+import sys
+import os
+
+import pytest
+from werkzeug.http import parse_accept_header
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from json_stream import iter_json, json_bytes_response, json_response
+
+
+def _accept(header):
+    return parse_accept_header(header)
+
+
+def _big_items(n=500):
+    return ({"id": str(i), "name": f"Recipe number {i}", "tags": ["main-dish", "easy"]}
+            for i in range(n))
+
+
+def test_iter_json_round_trips_generators():
+    payload = {"success": True, "recipes": (r for r in [{"id": "1"}, {"id": "2"}]),
+               "empty": iter([]), "nested": {"count": 2, "list": [1, 2]}}
+
+    decoded = json.loads("".join(iter_json(payload)))
+
+    assert decoded == {"success": True, "recipes": [{"id": "1"}, {"id": "2"}],
+                       "empty": [], "nested": {"count": 2, "list": [1, 2]}}
+
+
+def test_small_payload_sent_uncompressed():
+    response = json_response({"success": True, "recipes": iter([{"id": "1"}])},
+                             _accept("gzip"))
+
+    assert "Content-Encoding" not in response.headers
+    assert not response.is_streamed
+    assert json.loads(response.get_data()) == {"success": True, "recipes": [{"id": "1"}]}
+
+
+def test_large_payload_streams_gzip():
+    response = json_response({"success": True, "recipes": _big_items()}, _accept("gzip, deflate"))
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    decoded = json.loads(gzip.decompress(response.get_data()))
+    assert len(decoded["recipes"]) == 500
+    assert decoded["recipes"][499]["name"] == "Recipe number 499"
+
+
+def test_large_payload_identity_when_not_accepted():
+    response = json_response({"recipes": _big_items()}, _accept(""))
+
+    assert "Content-Encoding" not in response.headers
+    assert len(json.loads(response.get_data())["recipes"]) == 500
+
+
+def test_bytes_response_reuses_compressed_cache():
+    body = json.dumps({"recipes": list(_big_items())}).encode()
+    compressed = {}
+
+    first = json_bytes_response(body, _accept("gzip"), compressed=compressed)
+    assert set(compressed) == {"gzip"}
+    compressed["gzip"] = gzip.compress(b'{"cached": true}')
+    second = json_bytes_response(body, _accept("gzip"), compressed=compressed)
+
+    assert json.loads(gzip.decompress(first.get_data())) == json.loads(body)
+    assert json.loads(gzip.decompress(second.get_data())) == {"cached": True}
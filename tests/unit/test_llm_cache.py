@@ -0,0 +1,246 @@
+"""
+Unit tests for the disk-backed LLM response cache and single-flight coalescing.
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import (
+    AnthropicProvider,
+    CachingLLMProvider,
+    LLMResponseCache,
+    NullLLMProvider,
+    ProviderClient,
+    SingleFlight,
+    request_cache_key,
+)
+
+MESSAGES = [{"role": "user", "content": "Pick a protein"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(db_path=str(tmp_path / "llm_cache.db"))
+
+
+@pytest.fixture
+def provider(cache):
+    return CachingLLMProvider(NullLLMProvider(), cache=cache)
+
+
+def test_key_ignores_dict_ordering():
+    a = request_cache_key("m", system="s", messages=[{"role": "user", "content": "x"}],
+                          tools=[{"name": "t", "input_schema": {"a": 1, "b": 2}}], temperature=0)
+    b = request_cache_key("m", system="s", messages=[{"content": "x", "role": "user"}],
+                          tools=[{"input_schema": {"b": 2, "a": 1}, "name": "t"}], temperature=0)
+    c = request_cache_key("m", system="s", messages=[{"role": "user", "content": "x"}],
+                          tools=[{"name": "t", "input_schema": {"a": 1, "b": 2}}], temperature=1)
+
+    assert a == b
+    assert a != c
+
+
+def test_repeat_request_served_from_cache(provider, cache):
+    first = provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+    second = provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    assert provider.provider.call_count == 1
+    assert second.text == first.text
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_hit_survives_new_cache_instance(provider, cache):
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    fresh = CachingLLMProvider(NullLLMProvider(), cache=LLMResponseCache(db_path=str(cache.db_path)))
+    response = fresh.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    assert fresh.provider.call_count == 0
+    assert response.text == "[NullLLM: No real LLM call made]"
+    assert fresh.cache.stats()["memory_hits"] == 0
+
+
+def test_caching_is_opt_in_per_call(provider, cache):
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES)
+    provider.create_message(model="m", max_tokens=10, messages=[{"role": "user", "content": "x"}])
+    provider.create_message(model="m", max_tokens=10, messages=[{"role": "user", "content": "x"}])
+
+    assert provider.provider.call_count == 4
+    assert cache.stats()["bypassed"] == 3
+    assert cache.stats()["stores"] == 1
+
+
+def test_expired_entries_are_refetched(tmp_path):
+    cache = LLMResponseCache(db_path=str(tmp_path / "c.db"), ttl_seconds=0)
+    provider = CachingLLMProvider(NullLLMProvider(), cache=cache)
+
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    assert provider.provider.call_count == 2
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(db_path=str(tmp_path / "c.db"), max_bytes=300)
+    provider = CachingLLMProvider(NullLLMProvider(), cache=cache)
+
+    for i in range(5):
+        provider.create_message(model="m", max_tokens=10,
+                                messages=[{"role": "user", "content": str(i)}], cache=True)
+
+    assert cache.stats()["evictions"] >= 3
+
+
+def test_anthropic_messages_round_trip(cache):
+    from anthropic.types import Message
+
+    message = Message.model_validate({
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "m",
+        "content": [{"type": "tool_use", "id": "tu_1", "name": "search_recipes",
+                     "input": {"query": "tacos"}}],
+        "stop_reason": "tool_use", "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    })
+    client = Mock()
+    client.messages.create.return_value = message
+    wrapped = ProviderClient(CachingLLMProvider(AnthropicProvider(client=client), cache=cache))
+
+    wrapped.messages.create(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+    cache._memory.clear()
+    replayed = wrapped.messages.create(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    assert client.messages.create.call_count == 1
+    assert isinstance(replayed, Message)
+    assert replayed.content[0].input == {"query": "tacos"}
+
+
+def test_unserializable_responses_not_stored(cache):
+    client = Mock()
+    wrapped = ProviderClient(CachingLLMProvider(AnthropicProvider(client=client), cache=cache))
+
+    wrapped.messages.create(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+    wrapped.messages.create(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    assert client.messages.create.call_count == 2
+    assert cache.stats()["stores"] == 0
+
+
+class BlockingProvider(NullLLMProvider):
+    """Null provider whose calls wait until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def create_message(self, *args, **kwargs):
+        self.release.wait(timeout=5)
+        return super().create_message(*args, **kwargs)
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_calls_coalesced(cache):
+    single_flight = SingleFlight()
+    provider = CachingLLMProvider(BlockingProvider(), cache=cache, single_flight=single_flight)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(provider.create_message, model="m", max_tokens=10, messages=MESSAGES,
+                               cache=True)
+                   for _ in range(5)]
+        _wait_for(lambda: single_flight.stats()["coalesced"] == 4)
+        provider.provider.release.set()
+        results = [f.result() for f in futures]
+
+    assert provider.provider.call_count == 1
+    assert single_flight.stats()["saved_calls"] == 4
+    assert single_flight.stats()["in_flight"] == 0
+    assert all(r.text == results[0].text for r in results)
+
+
+def test_concurrent_identical_uncached_calls_coalesced(cache):
+    single_flight = SingleFlight()
+    provider = CachingLLMProvider(BlockingProvider(), cache=cache, single_flight=single_flight)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(provider.create_message, model="m", max_tokens=10, messages=MESSAGES)
+                   for _ in range(3)]
+        _wait_for(lambda: single_flight.stats()["coalesced"] == 2)
+        provider.provider.release.set()
+        [f.result() for f in futures]
+
+    assert provider.provider.call_count == 1
+    assert cache.stats()["stores"] == 0
+
+    provider.create_message(model="m", max_tokens=10, messages=MESSAGES)
+    assert provider.provider.call_count == 2
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("overloaded")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(single_flight.do, "k", failing)
+        started.wait(timeout=5)
+        follower = pool.submit(single_flight.do, "k", failing)
+        _wait_for(lambda: single_flight.stats()["coalesced"] == 1)
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            leader.result()
+        with pytest.raises(RuntimeError):
+            follower.result()
+
+    assert single_flight.stats()["calls"] == 1
+
+
+def _text_message(text):
+    from anthropic.types import Message
+
+    return Message.model_validate({
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "m",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    })
+
+
+def test_only_deterministic_calls_are_cached(cache):
+    from chatbot_modules.tool_handlers import generate_meal_names, llm_build_query_params
+
+    client = Mock()
+    wrapped = ProviderClient(CachingLLMProvider(AnthropicProvider(client=client), cache=cache))
+
+    client.messages.create.return_value = _text_message('{"2025-11-24": "Chicken Tikka"}')
+    generate_meal_names(wrapped, "plan my week", ["2025-11-24"])
+    generate_meal_names(wrapped, "plan my week", ["2025-11-24"])
+    assert client.messages.create.call_count == 2
+
+    client.messages.create.return_value = _text_message(
+        '{"2025-11-24": {"include_tags": ["main-dish"], "query": null}}')
+    llm_build_query_params(wrapped, "plan my week", ["2025-11-24"])
+    llm_build_query_params(wrapped, "plan my week", ["2025-11-24"])
+    assert client.messages.create.call_count == 3
+    assert "cache" not in client.messages.create.call_args.kwargs
@@ -0,0 +1,163 @@
+"""
+Unit tests for the shared LLM rate limiter (token bucket + AIMD concurrency).
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import (
+    AdaptiveConcurrencyLimit,
+    LLMRateLimiter,
+    NullLLMProvider,
+    RateLimitedLLMProvider,
+    TokenBucket,
+    is_overload_error,
+)
+
+MESSAGES = [{"role": "user", "content": "Pick a protein"}]
+
+
+class RateLimitError(Exception):
+    """Looks like the SDK's 429 error."""
+    status_code = 429
+
+
+class FlakyProvider(NullLLMProvider):
+    """Fails with a 429 the first `failures` calls."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def create_message(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("rate limited")
+        return super().create_message(*args, **kwargs)
+
+
+def _limiter(**kwargs):
+    sleeps = []
+    kwargs.setdefault("max_rpm", 60000)
+    limiter = LLMRateLimiter(seed=1, sleep=sleeps.append, **kwargs)
+    return limiter, sleeps
+
+
+def test_overload_detection():
+    assert is_overload_error(RateLimitError())
+    assert not is_overload_error(ValueError())
+
+
+def test_retries_with_jittered_backoff_and_shrinks_limit():
+    limiter, sleeps = _limiter(max_concurrency=8, backoff_base=1.0)
+    provider = RateLimitedLLMProvider(FlakyProvider(failures=2), limiter=limiter)
+
+    response = provider.create_message(model="m", max_tokens=10, messages=MESSAGES)
+
+    stats = limiter.stats()["models"]["m"]
+    assert response.text
+    assert stats["retries"] == 2
+    assert stats["overloads"] == 2
+    assert stats["calls"] == 3
+    assert 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+    # 8 -> 4 -> 2, then one success adds 1/limit
+    assert stats["concurrency_limit"] == 2.5
+
+
+def test_gives_up_after_max_retries():
+    limiter, sleeps = _limiter(max_retries=1)
+    provider = RateLimitedLLMProvider(FlakyProvider(failures=5), limiter=limiter)
+
+    with pytest.raises(RateLimitError):
+        provider.create_message(model="m", max_tokens=10, messages=MESSAGES)
+
+    assert limiter.stats()["models"]["m"]["failures"] == 1
+    assert len(sleeps) == 1
+
+
+def test_non_retryable_errors_raise_immediately():
+    class Broken(NullLLMProvider):
+        def create_message(self, *args, **kwargs):
+            raise ValueError("bad request")
+
+    limiter, sleeps = _limiter()
+
+    with pytest.raises(ValueError):
+        RateLimitedLLMProvider(Broken(), limiter=limiter).create_message(
+            model="m", max_tokens=10, messages=MESSAGES)
+
+    assert sleeps == []
+    assert limiter.stats()["models"]["m"]["concurrency_limit"] == 8
+
+
+def test_additive_increase_capped_at_maximum():
+    limit = AdaptiveConcurrencyLimit(initial=2, maximum=3)
+    for _ in range(10):
+        limit.on_success()
+    assert limit.limit == 3
+
+    limit.on_overload()
+    limit.on_overload()
+    limit.on_overload()
+    assert limit.limit == 1
+
+
+def test_concurrency_capped_per_model():
+    limiter, _ = _limiter(max_concurrency=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda _: limiter.run("m", call), range(6)))
+
+    assert results == ["ok"] * 6
+    assert max(peak) == 2
+    stats = limiter.stats()["models"]["m"]
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_time_s"] > 0
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_second=10, capacity=1)
+    waits = []
+
+    bucket.acquire(sleep=waits.append)
+    bucket.acquire(sleep=lambda s: (waits.append(s), time.sleep(s)))
+
+    assert waits and waits[0] == pytest.approx(0.1, abs=0.02)
+
+
+def test_stream_not_retried_after_text_emitted():
+    class StreamThenFail(NullLLMProvider):
+        def stream_message(self, *args, on_text=None, **kwargs):
+            on_text("partial")
+            raise RateLimitError("rate limited")
+
+    limiter, sleeps = _limiter()
+    deltas = []
+
+    with pytest.raises(RateLimitError):
+        RateLimitedLLMProvider(StreamThenFail(), limiter=limiter).stream_message(
+            model="m", max_tokens=10, messages=MESSAGES, on_text=deltas.append)
+
+    assert deltas == ["partial"]
+    assert sleeps == []
@@ -0,0 +1,108 @@
+"""
+Unit tests for the record/replay LLM provider.
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import (
+    NullLLMProvider,
+    ReplayLLMProvider,
+    ReplayMissError,
+    cached_client,
+    parse_latency_spec,
+    request_cache_key,
+)
+
+MESSAGES = [{"role": "user", "content": "Consolidate: 1 cup flour, 2 cups flour"}]
+
+
+@pytest.fixture
+def recorded_dir(tmp_path):
+    recorder = ReplayLLMProvider(str(tmp_path), mode="record", provider=NullLLMProvider())
+    recorder.create_message(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+    return tmp_path
+
+
+def test_record_writes_fixture_named_by_hash(recorded_dir):
+    key = request_cache_key("m", system="Shop", messages=MESSAGES, tools=None, max_tokens=100)
+    fixture = json.loads((recorded_dir / f"{key}.json").read_text())
+
+    assert fixture["request"]["messages"] == MESSAGES
+    assert fixture["latency_s"] >= 0
+    assert fixture["response"]["kind"] == "null"
+
+
+def test_replay_serves_fixture_without_provider(recorded_dir):
+    delays = []
+    replay = ReplayLLMProvider(str(recorded_dir), latency=None, sleep=delays.append)
+
+    response = replay.create_message(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+
+    assert response.text == "[NullLLM: No real LLM call made]"
+    assert delays == []
+    assert replay.stats()["replayed"] == 1
+
+
+def test_replay_miss_raises(recorded_dir):
+    replay = ReplayLLMProvider(str(recorded_dir))
+
+    with pytest.raises(ReplayMissError):
+        replay.create_message(model="m", max_tokens=100, messages=[{"role": "user", "content": "new"}])
+    assert replay.stats()["misses"] == 1
+
+
+def test_fixed_and_recorded_latency(recorded_dir):
+    delays = []
+    fixed = ReplayLLMProvider(str(recorded_dir), latency=0.25, sleep=delays.append)
+    fixed.create_message(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+
+    key = request_cache_key("m", system="Shop", messages=MESSAGES, tools=None, max_tokens=100)
+    path = recorded_dir / f"{key}.json"
+    fixture = json.loads(path.read_text())
+    fixture["latency_s"] = 1.5
+    path.write_text(json.dumps(fixture))
+    recorded = ReplayLLMProvider(str(recorded_dir), latency="recorded", sleep=delays.append)
+    recorded.create_message(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+
+    assert delays == [0.25, 1.5]
+
+
+def test_distribution_latency_is_seeded(recorded_dir):
+    def run():
+        delays = []
+        replay = ReplayLLMProvider(str(recorded_dir), latency=("uniform", 0.5, 1.5), seed=7,
+                                   sleep=delays.append)
+        for _ in range(3):
+            replay.create_message(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+        return delays
+
+    first = run()
+    assert first == run()
+    assert all(0.5 <= d <= 1.5 for d in first)
+
+
+def test_parse_latency_spec():
+    assert parse_latency_spec("none") is None
+    assert parse_latency_spec("recorded") == "recorded"
+    assert parse_latency_spec("0.8") == 0.8
+    assert parse_latency_spec("lognormvariate:0:0.5") == ("lognormvariate", 0.0, 0.5)
+
+
+def test_cached_client_replays_from_env(recorded_dir, monkeypatch):
+    monkeypatch.setenv("LLM_REPLAY_MODE", "replay")
+    monkeypatch.setenv("LLM_REPLAY_DIR", str(recorded_dir))
+    monkeypatch.setenv("LLM_REPLAY_LATENCY", "none")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+    client = cached_client(client=None)
+    response = client.messages.create(model="m", max_tokens=100, messages=MESSAGES, system="Shop")
+
+    assert response.text == "[NullLLM: No real LLM call made]"
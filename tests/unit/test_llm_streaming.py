@@ -0,0 +1,127 @@
+"""
+Unit tests for streaming LLM text through the provider layer and chatbot.
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import (
+    AnthropicProvider,
+    CachingLLMProvider,
+    LLMProvider,
+    LLMResponseCache,
+    MockResponse,
+    MockTextBlock,
+    NullLLMProvider,
+    ProviderClient,
+)
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+class FakeStream:
+    """Stands in for the SDK's MessageStream context manager."""
+
+    def __init__(self, deltas):
+        self.text_stream = iter(deltas)
+        self.final = MockResponse(content=[MockTextBlock(text="".join(deltas))])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self.final
+
+
+class FakeClient:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.stream_calls = []
+        self.messages = self
+
+    def stream(self, **params):
+        self.stream_calls.append(params)
+        return FakeStream(self.deltas)
+
+
+class StreamingProvider(LLMProvider):
+    """Provider that streams fixed deltas."""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    def create_message(self, model, max_tokens, messages, system=None, tools=None, **kwargs):
+        return MockResponse(content=[MockTextBlock(text="".join(self.deltas))])
+
+    def stream_message(self, model, max_tokens, messages, system=None, tools=None,
+                       on_text=None, **kwargs):
+        for delta in self.deltas:
+            if on_text:
+                on_text(delta)
+        return self.create_message(model, max_tokens, messages)
+
+    @property
+    def is_null(self):
+        return True
+
+
+def test_default_stream_emits_text_blocks():
+    deltas = []
+    response = NullLLMProvider().stream_message(
+        model="m", max_tokens=10, messages=MESSAGES, on_text=deltas.append)
+
+    assert deltas == [response.text]
+
+
+def test_anthropic_provider_forwards_deltas():
+    client = FakeClient(["Hel", "lo", "!"])
+    deltas = []
+
+    response = AnthropicProvider(client=client).stream_message(
+        model="m", max_tokens=10, messages=MESSAGES, system="sys", on_text=deltas.append)
+
+    assert deltas == ["Hel", "lo", "!"]
+    assert response.text == "Hello!"
+    assert client.stream_calls[0]["system"] == "sys"
+
+
+def test_cached_stream_replays_text(tmp_path):
+    provider = CachingLLMProvider(StreamingProvider(["a", "b"]),
+                                  cache=LLMResponseCache(db_path=str(tmp_path / "c.db")))
+    first, second = [], []
+
+    provider.stream_message(model="m", max_tokens=10, messages=MESSAGES, on_text=first.append, cache=True)
+    provider.stream_message(model="m", max_tokens=10, messages=MESSAGES, on_text=second.append, cache=True)
+
+    assert first == ["a", "b"]
+    assert second == ["ab"]
+    assert provider.cache.stats()["hits"] == 1
+
+
+def test_chat_forwards_deltas_to_callback(monkeypatch):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    import chatbot
+
+    with patch.object(chatbot, 'Anthropic'), patch.object(chatbot, 'MealPlanningAssistant'):
+        bot = chatbot.MealPlanningChatbot(verbose=False)
+    bot.last_meal_plan = None
+    bot.current_meal_plan_id = None
+    bot.current_shopping_list_id = None
+    bot.client = ProviderClient(StreamingProvider(["Sure, ", "planning ", "now."]))
+    deltas = []
+    bot.text_delta_callback = deltas.append
+
+    response = bot.chat("Plan my week")
+
+    assert deltas == ["Sure, ", "planning ", "now."]
+    assert response == "Sure, planning now."
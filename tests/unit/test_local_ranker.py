@@ -0,0 +1,161 @@
+"""
+Unit tests for the local candidate ranker and its use in recipe selection.
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.models import Recipe, UserProfile
+from requirements_parser import DayRequirement
+from chatbot_modules.local_ranker import (
+    LocalRanker,
+    is_subjective_request,
+    recipe_protein,
+)
+from chatbot_modules.recipe_selector import select_recipes_with_llm
+
+MONDAY, TUESDAY, SATURDAY = "2025-11-24", "2025-11-25", "2025-11-29"
+
+
+def _recipe(recipe_id, name, tags=(), ingredients=()):
+    return Recipe(id=str(recipe_id), name=name, description="", ingredients=list(ingredients),
+                  ingredients_raw=[], steps=[], servings=4, serving_size="",
+                  tags=["main-dish", *tags])
+
+
+def _llm_client(text):
+    client = Mock()
+    client.messages.create.return_value = Mock(content=[Mock(text=text)])
+    return client
+
+
+def test_subjective_detection():
+    assert is_subjective_request("something fancy for date night")
+    assert not is_subjective_request("plan 5 dinners, quick on tuesday")
+    assert not is_subjective_request(None)
+
+
+def test_protein_from_name_then_ingredients():
+    assert recipe_protein(_recipe(1, "Grilled Chicken Thighs")) == "chicken"
+    assert recipe_protein(_recipe(2, "Weeknight Tacos", ingredients=["ground beef"])) == "beef"
+    assert recipe_protein(_recipe(3, "Garden Salad")) is None
+
+
+def test_recent_meals_ranked_last():
+    pool = [_recipe(1, "Lasagna"), _recipe(2, "Pad Thai")]
+
+    ranking = LocalRanker(recent_meals=["Lasagna"]).rank_pool(pool, DayRequirement(date=MONDAY))
+
+    assert ranking.best.name == "Pad Thai"
+    assert ranking.is_clear
+
+
+def test_week_spreads_cuisines_and_proteins():
+    pool = [
+        _recipe(1, "Chicken Parmesan", tags=["italian"]),
+        _recipe(2, "Beef Bulgogi", tags=["korean"]),
+    ]
+    days = [DayRequirement(date=MONDAY), DayRequirement(date=TUESDAY)]
+
+    rankings = LocalRanker().rank_week({MONDAY: pool, TUESDAY: list(pool)}, days)
+
+    assert rankings[MONDAY].best.id == "1"
+    assert rankings[TUESDAY].best.id == "2"
+
+
+def test_already_picked_recipes_count_toward_variety():
+    pool = [
+        _recipe(1, "Chicken Parmesan", tags=["italian"]),
+        _recipe(2, "Beef Bulgogi", tags=["korean"]),
+    ]
+
+    rankings = LocalRanker().rank_week({TUESDAY: pool}, [DayRequirement(date=TUESDAY)],
+                                       already_picked=[pool[0]])
+
+    assert rankings[TUESDAY].best.id == "2"
+
+
+def test_profile_time_budget_and_dislikes():
+    profile = UserProfile(max_weeknight_cooking_time=30, max_weekend_cooking_time=240,
+                          disliked_ingredients=["mushroom"], favorite_cuisines=["thai"])
+    slow = _recipe(1, "Slow Braise", tags=["4-hours-or-less"])
+    quick_mushroom = _recipe(2, "Mushroom Stir Fry", tags=["15-minutes-or-less"], ingredients=["mushrooms"])
+    quick_thai = _recipe(3, "Thai Basil Noodles", tags=["15-minutes-or-less", "thai"])
+    ranker = LocalRanker(user_profile=profile)
+
+    quick_plain = _recipe(4, "Quick Fried Rice", tags=["15-minutes-or-less"])
+
+    weeknight = ranker.rank_pool([slow, quick_plain, quick_thai], DayRequirement(date=MONDAY))
+    weekend = ranker.rank_pool([quick_plain, slow], DayRequirement(date=SATURDAY))
+    disliked = ranker.rank_pool([quick_mushroom, quick_plain], DayRequirement(date=MONDAY))
+
+    assert [r.id for r in weeknight.ranked] == ["3", "4", "1"]
+    assert [r.id for r in weekend.ranked] == ["4", "1"]  # no time penalty at the weekend
+    assert weekend.margin < weeknight.scores[1] - weeknight.scores[2]
+    assert disliked.best.id == "4"
+
+
+def test_favorites_and_requirements_scored():
+    pool = [_recipe(1, "Plain Pasta"), _recipe(2, "Veggie Curry", tags=["vegetarian", "indian"])]
+    req = DayRequirement(date=MONDAY, dietary_hard=["vegetarian"])
+
+    assert LocalRanker().rank_pool(pool, req).best.id == "2"
+    assert LocalRanker(favorites=[{"recipe_id": "1", "recipe_name": "Plain Pasta"}]).rank_pool(
+        pool, DayRequirement(date=MONDAY)).best.id == "1"
+
+
+def test_clear_wins_skip_the_llm():
+    client = _llm_client("{}")
+    pools = {MONDAY: [_recipe(1, "Lasagna"), _recipe(2, "Pad Thai")]}
+
+    selected = select_recipes_with_llm(client, pools, [DayRequirement(date=MONDAY)],
+                                       recent_meals=["Lasagna"])
+
+    assert [r.id for r in selected] == ["2"]
+    client.messages.create.assert_not_called()
+
+
+def test_close_calls_go_to_llm_with_ranked_candidates():
+    client = _llm_client('{"%s": 12}' % TUESDAY)
+    pools = {
+        MONDAY: [_recipe(1, "Lasagna"), _recipe(2, "Pad Thai")],
+        TUESDAY: [_recipe(11, "Fish Tacos"), _recipe(12, "Tofu Curry")],
+    }
+    days = [DayRequirement(date=MONDAY), DayRequirement(date=TUESDAY)]
+
+    selected = select_recipes_with_llm(client, pools, days, recent_meals=["Lasagna"])
+
+    assert [r.id for r in selected] == ["2", "12"]
+    prompt = client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert f"### {TUESDAY}" in prompt
+    assert f"### {MONDAY}" not in prompt
+    assert "Pad Thai" in prompt  # locally fixed day listed so it isn't repeated
+
+
+def test_subjective_request_sends_every_day_to_llm():
+    client = _llm_client('{"%s": 1}' % MONDAY)
+    pools = {MONDAY: [_recipe(1, "Lasagna"), _recipe(2, "Pad Thai")]}
+
+    selected = select_recipes_with_llm(client, pools, [DayRequirement(date=MONDAY)],
+                                       recent_meals=["Lasagna"], user_message="something cozy")
+
+    assert [r.id for r in selected] == ["1"]
+    client.messages.create.assert_called_once()
+
+
+def test_llm_failure_falls_back_to_local_ranking():
+    client = Mock()
+    client.messages.create.side_effect = RuntimeError("overloaded")
+    pools = {MONDAY: [_recipe(1, "Lasagna"), _recipe(2, "Pad Thai")]}
+
+    selected = select_recipes_with_llm(client, pools, [DayRequirement(date=MONDAY)],
+                                       recent_meals=["Lasagna"], use_local_ranker=False)
+
+    assert [r.id for r in selected] == ["2"]
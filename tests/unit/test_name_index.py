@@ -0,0 +1,149 @@
+"""
+Unit tests for the in-memory recipe name index and fuzzy meal matching.
+"""
+
+import pytest
+import sys
+import os
+import sqlite3
+from unittest.mock import patch
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.database import DatabaseInterface
+from chatbot_modules.name_index import (
+    RecipeNameIndex,
+    clear_name_indexes,
+    get_name_index,
+    trigrams,
+)
+from chatbot_modules.tool_handlers import parallel_fuzzy_match
+
+NAMES = [
+    "Chicken Tikka Masala",
+    "Easy Chicken Tacos",
+    "Beef Tacos",
+    "Peruvian Chicken",
+    "Grilled Salmon With Lemon",
+    "Chicken Noodle Soup",
+    "Vegetable Lasagna",
+    "Taco Salad",
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes():
+    clear_name_indexes()
+    yield
+    clear_name_indexes()
+
+
+@pytest.fixture
+def recipe_db(tmp_path):
+    """Minimal recipes.db holding NAMES."""
+    db_dir = tmp_path / "data"
+    db_dir.mkdir()
+    conn = sqlite3.connect(db_dir / "recipes.db")
+    conn.execute("""CREATE TABLE recipes (id TEXT PRIMARY KEY, name TEXT, description TEXT,
+                    ingredients TEXT, ingredients_raw TEXT, ingredients_structured TEXT,
+                    steps TEXT, servings INTEGER, serving_size TEXT, tags TEXT)""")
+    for i, name in enumerate(NAMES):
+        conn.execute("INSERT INTO recipes VALUES (?, ?, '', '[]', '[]', NULL, '[]', 4, '', '[]')",
+                     (str(100 + i), name))
+    conn.commit()
+    conn.close()
+    return DatabaseInterface(db_dir=str(db_dir))
+
+
+def test_postings_are_sorted_doc_positions():
+    index = RecipeNameIndex([str(i) for i in range(len(NAMES))], NAMES)
+
+    assert index.postings("chicken").tolist() == [0, 1, 3, 5]
+    assert index.postings("missing").tolist() == []
+    assert index.prefix_postings("taco").tolist() == [1, 2]  # "tacos" only
+
+
+def test_search_scores_like_score_match():
+    index = RecipeNameIndex([str(i) for i in range(len(NAMES))], NAMES)
+
+    hits = index.search(["chicken", "taco"], limit=3)
+
+    # Exact chicken (10) + partial tacos (5) beats either keyword alone
+    assert hits[0].name == "Easy Chicken Tacos"
+    assert (hits[0].score, hits[0].matched) == (15, 2)
+    # Ties prefer names with fewer extra words
+    assert hits[1].name == "Peruvian Chicken"
+
+
+def test_search_min_matched_filters_single_keyword_hits():
+    index = RecipeNameIndex([str(i) for i in range(len(NAMES))], NAMES)
+
+    assert index.search(["peruvian", "salmon"], min_matched=2) == []
+    assert [h.name for h in index.search(["peruvian", "salmon"])] == [
+        "Peruvian Chicken", "Grilled Salmon With Lemon"]
+
+
+def test_trigrams_pad_each_word():
+    assert trigrams("Beef Tacos")[:4] == ["  b", " be", "bee", "eef"]
+    assert "ef " in trigrams("beef") and "s t" not in trigrams("Beef Tacos")
+
+
+def test_similar_ranks_misspelled_and_reworded_names():
+    index = RecipeNameIndex([str(i) for i in range(len(NAMES))], NAMES)
+
+    top = index.similar("vegetable lasagne", k=3)
+    assert top[0].name == "Vegetable Lasagna"
+    assert 0 < top[0].similarity < 1
+    assert [m.similarity for m in top] == sorted((m.similarity for m in top), reverse=True)
+
+    assert index.similar("Chicken Tikka Masala", k=1)[0].similarity == 1.0
+    assert index.similar("zzz", k=3) == []
+    assert all(m.similarity >= 0.5 for m in index.similar("chicken", k=8, min_similarity=0.5))
+
+
+def test_index_rebuilt_when_recipes_db_changes(recipe_db):
+    first = get_name_index(recipe_db.recipes_db)
+    assert get_name_index(recipe_db.recipes_db) is first
+
+    with sqlite3.connect(recipe_db.recipes_db) as conn:
+        conn.execute("INSERT INTO recipes (id, name) VALUES ('999', 'Shrimp Scampi')")
+    os.utime(recipe_db.recipes_db, ns=(1, 1))
+
+    rebuilt = get_name_index(recipe_db.recipes_db)
+    assert rebuilt is not first
+    assert rebuilt.search(["shrimp", "scampi"])[0].recipe_id == "999"
+
+
+def test_fuzzy_match_uses_index_without_search_queries(recipe_db):
+    meal_names = {
+        "2025-11-24": "Classic Peruvian Roasted Chicken",
+        "2025-11-25": "Crispy Beef Tacos",
+        "2025-11-26": "Lemon Herb Salmon",
+        "2025-11-27": "Hearty Vegetable Lasagne",
+    }
+
+    with patch.object(recipe_db, "search_recipes", side_effect=AssertionError("SQL search used")):
+        recipes = parallel_fuzzy_match(recipe_db, meal_names)
+
+    assert {d: r.name for d, r in recipes.items()} == {
+        "2025-11-24": "Peruvian Chicken",
+        "2025-11-25": "Beef Tacos",
+        "2025-11-26": "Grilled Salmon With Lemon",
+        "2025-11-27": "Vegetable Lasagna",  # No 2-keyword hit: trigram similarity
+    }
+
+
+def test_fuzzy_match_without_index_retries_then_falls_back(recipe_db):
+    meal_names = {
+        "2025-11-24": "Smoky Chipotle Beef Burritos",  # Only "beef" is in a recipe name
+        "2025-11-25": "Xyzzy Quux",                    # Nothing matches at all
+    }
+
+    with patch("chatbot_modules.tool_handlers.get_name_index", return_value=None):
+        recipes = parallel_fuzzy_match(recipe_db, meal_names)
+
+    assert recipes["2025-11-24"].name == "Beef Tacos"
+    assert recipes["2025-11-25"].name in NAMES
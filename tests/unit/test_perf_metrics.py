@@ -0,0 +1,176 @@
+"""
+Unit tests for the fixed-memory production performance metrics.
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from flask import Flask
+
+from llm_provider import CachingLLMProvider, LLMResponseCache, MockUsage, NullLLMProvider
+from perf_metrics import (
+    Histogram,
+    MetricsRegistry,
+    get_metrics,
+    instrument_database,
+    instrument_flask,
+)
+
+MESSAGES = [{"role": "user", "content": "Pick a protein"}]
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = Histogram()
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)  # 1ms .. 1s uniformly
+
+    assert histogram.count == 1000
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.25)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.25)
+    assert histogram.quantile(0.99) <= histogram.max
+
+
+def test_histogram_memory_is_fixed():
+    histogram = Histogram()
+    for i in range(10000):
+        histogram.observe((i % 500) / 100)
+
+    assert len(histogram.counts) == len(histogram.buckets) + 1
+    assert sum(histogram.counts) == 10000
+
+
+def test_llm_sources_tokens_and_hit_ratio(tmp_path, monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr("llm_provider.get_metrics", lambda: registry)
+
+    class UsageProvider(NullLLMProvider):
+        def create_message(self, *args, **kwargs):
+            response = super().create_message(*args, **kwargs)
+            response.usage = MockUsage(input_tokens=100, output_tokens=20, cache_read_input_tokens=300)
+            return response
+
+    provider = CachingLLMProvider(UsageProvider(), cache=LLMResponseCache(db_path=str(tmp_path / "c.db")))
+    for _ in range(3):
+        provider.create_message(model="m", max_tokens=10, messages=MESSAGES, cache=True)
+
+    stats = registry.snapshot()["llm"]["m"]
+    assert stats["count"] == 3
+    assert stats["sources"]["upstream"] == 1
+    assert stats["sources"]["cache"] == 2
+    assert stats["response_cache_hit_ratio"] == pytest.approx(0.667, abs=0.001)
+    # Cache hits cost no tokens
+    assert stats["tokens"]["input_tokens"] == 100
+    assert stats["prompt_cache_read_ratio"] == 0.75
+
+
+def test_llm_and_db_errors_recorded_with_latency():
+    registry = MetricsRegistry()
+    registry.observe_llm("m", 0.5, error=True)
+    registry.observe_db("get_recipe", 0.5, error=True)
+
+    snapshot = registry.snapshot()
+    for stats in (snapshot["llm"]["m"], snapshot["db"]["get_recipe"]):
+        assert stats["count"] == 1
+        assert stats["errors"] == 1
+        assert stats["max_ms"] == 500.0
+    assert snapshot["llm"]["m"]["sources"]["upstream"] == 0
+
+
+def test_database_methods_timed_per_method():
+    class FakeDB:
+        def get_recipe(self, recipe_id):
+            return {"id": recipe_id}
+
+        def fail(self):
+            raise ValueError("boom")
+
+    registry = MetricsRegistry()
+    db = instrument_database(FakeDB(), registry)
+
+    db.get_recipe("1")
+    db.get_recipe("2")
+    with pytest.raises(ValueError):
+        db.fail()
+
+    stats = registry.snapshot()["db"]
+    assert stats["get_recipe"]["count"] == 2
+    assert stats["fail"]["errors"] == 1
+    assert stats["fail"]["count"] == 1
+
+
+def test_database_generator_methods_timed_over_iteration():
+    class FakeDB:
+        def iter_rows(self):
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+    registry = MetricsRegistry()
+    db = instrument_database(FakeDB(), registry)
+
+    rows = db.iter_rows()
+    assert "iter_rows" not in registry.snapshot()["db"]
+    assert list(rows) == [0, 1, 2]
+
+    stats = registry.snapshot()["db"]["iter_rows"]
+    assert stats["count"] == 1
+    assert stats["max_ms"] >= 30
+
+    # Abandoned part-way: recorded when the generator is closed
+    rows = db.iter_rows()
+    next(rows)
+    assert registry.snapshot()["db"]["iter_rows"]["count"] == 1
+    rows.close()
+    assert registry.snapshot()["db"]["iter_rows"]["count"] == 2
+
+
+def test_routes_labelled_by_rule_and_exported_as_prometheus():
+    app = Flask(__name__)
+    registry = MetricsRegistry()
+    instrument_flask(app, registry)
+
+    @app.route('/api/recipe/<recipe_id>')
+    def recipe(recipe_id):
+        return recipe_id
+
+    client = app.test_client()
+    client.get('/api/recipe/1')
+    client.get('/api/recipe/2')
+    client.get('/missing')
+
+    routes = registry.snapshot()["routes"]
+    assert routes["GET /api/recipe/<recipe_id>"]["count"] == 2
+    assert routes["GET <unmatched>"]["statuses"] == {"404": 1}
+
+    text = registry.prometheus_text()
+    assert '# TYPE dinner_http_request_seconds histogram' in text
+    assert 'dinner_http_request_seconds_count{method="GET",route="/api/recipe/<recipe_id>"} 2' in text
+    assert 'dinner_http_responses_total{method="GET",route="<unmatched>",status="404"} 1' in text
+
+
+def test_disabled_registry_installs_nothing():
+    class FakeDB:
+        def get_recipe(self, recipe_id):
+            return recipe_id
+
+    registry = MetricsRegistry(enabled=False)
+    db = FakeDB()
+    original = db.get_recipe
+
+    instrument_database(db, registry)
+    registry.observe_llm("m", 1.0)
+
+    assert db.get_recipe == original
+    assert "get_recipe" not in vars(db)
+    assert registry.snapshot()["llm"] == {}
+
+
+def test_default_registry_is_shared():
+    assert get_metrics() is get_metrics()
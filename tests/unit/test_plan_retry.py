@@ -0,0 +1,106 @@
+"""
+Unit tests for the plan_meals_smart retry loop (algorithmic parser path).
+"""
+
+import pytest
+import sys
+import os
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.models import Ingredient, Recipe
+from requirements_parser import DayRequirement
+from chatbot_modules import tool_handlers
+from chatbot_modules.recipe_selector import ValidationFailure
+
+DATES = ["2025-11-24", "2025-11-25", "2025-11-26", "2025-11-27"]
+
+
+def _recipe(recipe_id, tags=()):
+    return Recipe(id=str(recipe_id), name=f"Recipe {recipe_id}", description="", ingredients=[],
+                  ingredients_raw=[], steps=[], servings=4, serving_size="",
+                  tags=["main-dish", *tags],
+                  ingredients_structured=[Ingredient(raw="1 onion", quantity=1.0, name="onion")])
+
+
+def _chatbot():
+    db = Mock()
+    db.get_meal_history.return_value = []
+    db.get_user_profile.return_value = None
+    db.get_combined_favorites.return_value = []
+    db.save_meal_plan.return_value = "plan-1"
+    return SimpleNamespace(
+        selected_dates=DATES, week_start=DATES[0], verbose=False, _verbose_output=lambda msg: None,
+        conversation_history=[{"role": "user", "content": "italian on thursday"}],
+        assistant=SimpleNamespace(db=db), client=Mock(), user_id=1,
+    )
+
+
+@pytest.fixture
+def algorithmic_path(monkeypatch):
+    monkeypatch.setattr(tool_handlers, "USE_GENERATE_FUZZY_MATCH", False)
+    monkeypatch.setattr(tool_handlers, "USE_LLM_QUERY_BUILDER", False)
+    reqs = [DayRequirement(date=d) for d in DATES]
+    reqs[3].cuisine = "italian"
+    monkeypatch.setattr(tool_handlers, "parse_requirements", lambda message, dates: reqs)
+
+
+def test_retry_reselects_only_failed_dates(algorithmic_path):
+    pool_calls, select_calls = [], []
+
+    def fake_pools(db, day_requirements, recent_names, exclude_allergens, excluded_ids_by_date=None,
+                   only_dates=None, **kwargs):
+        pool_calls.append(only_dates)
+        dates = [r.date for r in day_requirements if only_dates is None or r.date in only_dates]
+        italian = bool(excluded_ids_by_date)
+        return ({d: [_recipe(f"{d}-{'it' if italian else 'x'}", ["italian"] if italian else [])]
+                 for d in dates}, {d: 0.01 for d in dates})
+
+    def fake_select(client, candidates_by_date, day_requirements, fixed_selections=None, **kwargs):
+        select_calls.append(([r.date for r in day_requirements], dict(fixed_selections or {})))
+        return [candidates_by_date[r.date][0] for r in day_requirements]
+
+    with patch.object(tool_handlers, "build_per_day_pools", side_effect=fake_pools), \
+            patch.object(tool_handlers, "select_recipes_with_llm", side_effect=fake_select):
+        chatbot = _chatbot()
+        result = json.loads(tool_handlers.handle_plan_meals_smart(chatbot, {}))
+
+    assert pool_calls == [None, {DATES[3]}]
+    assert [dates for dates, _ in select_calls] == [DATES, [DATES[3]]]
+    # The retry sees the three validated days as fixed
+    assert sorted(select_calls[1][1]) == DATES[:3]
+    assert [m["name"] for m in result["meals"]] == [
+        f"Recipe {DATES[0]}-x", f"Recipe {DATES[1]}-x", f"Recipe {DATES[2]}-x", f"Recipe {DATES[3]}-it"]
+
+
+def test_max_retries_falls_back_for_failed_dates_only(algorithmic_path, monkeypatch):
+    monkeypatch.setattr(tool_handlers, "MAX_RETRIES", 1)
+    validated = []
+
+    def fake_pools(db, day_requirements, recent_names, exclude_allergens, excluded_ids_by_date=None,
+                   only_dates=None, **kwargs):
+        dates = [r.date for r in day_requirements if only_dates is None or r.date in only_dates]
+        return ({d: [_recipe(f"{d}-a"), _recipe(f"{d}-b")] for d in dates}, {d: 0.0 for d in dates})
+
+    def fake_validate(recipes, reqs):
+        validated.append([r.date for r in reqs])
+        return [ValidationFailure(date=r.date, recipe_id=x.id, recipe_name=x.name,
+                                  requirement="cuisine=italian", reason="missing")
+                for x, r in zip(recipes, reqs) if r.cuisine], []
+
+    with patch.object(tool_handlers, "build_per_day_pools", side_effect=fake_pools), \
+            patch.object(tool_handlers, "select_recipes_with_llm",
+                         side_effect=lambda client, candidates_by_date, day_requirements, **kw:
+                         [candidates_by_date[r.date][0] for r in day_requirements]), \
+            patch.object(tool_handlers, "validate_plan", side_effect=fake_validate):
+        result = json.loads(tool_handlers.handle_plan_meals_smart(_chatbot(), {}))
+
+    assert validated == [DATES, [DATES[3]]]
+    assert [m["name"] for m in result["meals"]][:3] == [f"Recipe {d}-a" for d in DATES[:3]]
+    assert result["meals"][3]["name"] == f"Recipe {DATES[3]}-b"
@@ -0,0 +1,111 @@
+"""
+Unit tests for the shared plan view-model builder and cache.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from plan_views import PlanViewCache, build_meal_view, build_plan_view, format_meal_date
+
+
+@pytest.fixture
+def variant_meal():
+    return {
+        'date': '2025-11-28',
+        'meal_type': 'dinner',
+        'recipe': {'id': '1', 'name': 'Base Chili', 'cuisine': 'Mexican', 'estimated_time': 60},
+        'servings': 4,
+        'variant': {
+            'variant_id': 'variant:1:abc',
+            'warnings': ['check salt'],
+            'compiled_recipe': {'id': '1', 'name': 'Chili (no beans)', 'cuisine': 'Mexican',
+                                'estimated_time': 45},
+        },
+    }
+
+
+def test_format_meal_date():
+    assert format_meal_date('2025-11-28') == 'Friday, November 28'
+
+
+def test_plan_view_keeps_base_details_with_variant_name(variant_meal):
+    view = build_meal_view(variant_meal, "plan")
+
+    assert view['recipe_name'] == 'Chili (no beans)'
+    assert view['recipe_id'] == 'variant:1:abc'
+    assert view['estimated_time'] == 60
+    assert view['has_variant'] is True
+    assert view['meal_date'] == 'Friday, November 28'
+    assert view['recipe']['name'] == 'Base Chili'
+
+
+def test_cook_view_uses_compiled_recipe(variant_meal):
+    view = build_meal_view(variant_meal, "cook")
+
+    assert view['recipe_name'] == 'Chili (no beans)'
+    assert view['estimated_time'] == 45
+    assert view['recipe']['name'] == 'Chili (no beans)'
+    assert view['warnings'] == ['check salt']
+
+
+def test_api_view_keeps_iso_date(variant_meal):
+    view = build_meal_view(variant_meal, "api")
+
+    assert view['meal_date'] == '2025-11-28'
+    assert 'date' not in view
+
+
+def test_builder_does_not_mutate_input(variant_meal):
+    build_meal_view(variant_meal, "cook")
+    assert 'recipe_name' not in variant_meal
+    assert variant_meal['recipe']['name'] == 'Base Chili'
+
+
+def test_build_plan_view_sorts_by_date(variant_meal):
+    earlier = {**variant_meal, 'date': '2025-11-24', 'variant': None}
+    view = build_plan_view('mp_1', '2025-11-24', [variant_meal, earlier], "api", sort_by_date=True)
+
+    assert [m['meal_date'] for m in view['meals']] == ['2025-11-24', '2025-11-28']
+
+
+def test_cache_hits_until_updated_at_changes():
+    cache = PlanViewCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'id': 'mp_1'}
+
+    _, cached = cache.get_or_build('mp_1', 't1', 'plan', build)
+    assert cached is False
+    _, cached = cache.get_or_build('mp_1', 't1', 'plan', build)
+    assert cached is True
+    _, cached = cache.get_or_build('mp_1', 't2', 'plan', build)
+    assert cached is False
+    assert len(builds) == 2
+
+
+def test_cache_invalidate_and_none_not_cached():
+    cache = PlanViewCache()
+    cache.get_or_build('mp_1', 't1', 'cook', lambda: {'id': 'mp_1'})
+    cache.invalidate('mp_1')
+    _, cached = cache.get_or_build('mp_1', 't1', 'cook', lambda: None)
+    assert cached is False
+    _, cached = cache.get_or_build('mp_1', 't1', 'cook', lambda: None)
+    assert cached is False
+
+
+def test_cache_stats_report_warm_renders():
+    cache = PlanViewCache()
+    cache.record_render('plan', 0.002, warm=True)
+    cache.record_render('plan', 0.010, warm=False)
+
+    stats = cache.stats()
+    assert stats['renders']['plan:warm']['count'] == 1
+    assert stats['renders']['plan:cold']['avg_ms'] == pytest.approx(10.0)
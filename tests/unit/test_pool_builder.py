@@ -0,0 +1,321 @@
+"""
+Unit tests for per-day candidate pool construction.
+"""
+
+import pytest
+import sys
+import os
+import json
+import sqlite3
+import subprocess
+import threading
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.database import DatabaseInterface
+from data.models import Recipe
+from requirements_parser import DayRequirement
+from chatbot_modules.pool_builder import (
+    build_per_day_pools,
+    build_per_day_pools_v2,
+    build_speculative_pools,
+    day_seed,
+    fetch_pools,
+    query_signature,
+    speculative_query_params,
+)
+
+DATES = ["2025-11-24", "2025-11-25", "2025-11-26"]
+
+
+def _recipe(recipe_id, tags):
+    return Recipe(id=str(recipe_id), name=f"Recipe {recipe_id}", description="",
+                  ingredients=[], ingredients_raw=[], steps=[], servings=4,
+                  serving_size="", tags=list(tags))
+
+
+class FakeDB:
+    """Records sampled queries; results depend on the arguments."""
+
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def search_recipes_sampled(self, include_tags=None, exclude_tags=None, exclude_ids=None,
+                               query=None, limit=80, seed=None):
+        return self.search_recipes_sampled_batch(include_tags, exclude_tags, exclude_ids,
+                                                 query, limit, seeds=[seed])[0]
+
+    def search_recipes_sampled_batch(self, include_tags=None, exclude_tags=None, exclude_ids=None,
+                                     query=None, limit=80, seeds=None):
+        with self.lock:
+            self.batches.append({"include_tags": list(include_tags or []), "query": query,
+                                 "exclude_ids": exclude_ids, "seeds": list(seeds)})
+            for seed in seeds:
+                self.calls.append({"include_tags": list(include_tags or []), "query": query, "seed": seed})
+        return [[_recipe(f"{seed}-{i}", include_tags or []) for i in range(3)] for seed in seeds]
+
+
+def test_signature_normalizes_main_dish_and_empty_query():
+    assert query_signature({"include_tags": ["peruvian"], "query": ""}) == \
+        (("main-dish", "peruvian"), None)
+    assert query_signature({"include_tags": [], "query": None}) == (("main-dish",), None)
+
+
+def test_speculative_params_include_profile_cuisines():
+    profile = SimpleNamespace(favorite_cuisines=["Italian", "Mexican", "Thai"])
+
+    options = speculative_query_params(profile)
+
+    assert [o["include_tags"] for o in options] == [
+        ["main-dish"], ["main-dish", "italian"], ["main-dish", "mexican"]]
+    assert speculative_query_params(None) == [{"include_tags": ["main-dish"], "query": None}]
+
+
+def test_matching_dates_reuse_speculative_pools():
+    db = FakeDB()
+    speculative = build_speculative_pools(db, DATES, speculative_query_params(None),
+                                          user_id="u", week_of=DATES[0])
+    speculative_calls = list(db.calls)
+    params = {
+        DATES[0]: {"include_tags": ["main-dish"], "query": None},
+        DATES[1]: {"include_tags": ["main-dish", "30-minutes-or-less"], "query": None},
+        DATES[2]: {"include_tags": ["main-dish"], "query": None},
+    }
+
+    pools, _ = build_per_day_pools_v2(db, params, user_id="u", week_of=DATES[0],
+                                      speculative_pools=speculative)
+
+    # Only the mismatched date hit the database again
+    assert db.calls[len(speculative_calls):] == [
+        {"include_tags": ["main-dish", "30-minutes-or-less"], "query": None,
+         "seed": speculative_calls[1]["seed"]}]
+    assert pools[DATES[0]] == speculative[(DATES[0], (("main-dish",), None))]
+
+
+def test_reused_pools_equal_fresh_pools():
+    params = {d: {"include_tags": ["main-dish"], "query": None} for d in DATES}
+
+    fresh, _ = build_per_day_pools_v2(FakeDB(), params, user_id="u", week_of=DATES[0])
+    db = FakeDB()
+    speculative = build_speculative_pools(db, DATES, speculative_query_params(None),
+                                          user_id="u", week_of=DATES[0])
+    reused, _ = build_per_day_pools_v2(db, params, user_id="u", week_of=DATES[0],
+                                       speculative_pools=speculative)
+
+    assert {d: [r.id for r in p] for d, p in reused.items()} == \
+        {d: [r.id for r in p] for d, p in fresh.items()}
+    assert len(db.calls) == len(DATES)
+
+
+def test_freshness_applied_to_reused_pools():
+    db = FakeDB()
+    speculative = build_speculative_pools(db, DATES[:1], speculative_query_params(None),
+                                          user_id="u", week_of=DATES[0])
+    raw = speculative[(DATES[0], (("main-dish",), None))]
+    raw_ids = [r.id for r in raw]
+
+    pools, _ = build_per_day_pools_v2(db, {DATES[0]: {"include_tags": ["main-dish"], "query": None}},
+                                      recent_names=[raw[0].name], user_id="u", week_of=DATES[0],
+                                      speculative_pools=speculative)
+
+    assert pools[DATES[0]][-1].name == raw[0].name
+    assert [r.id for r in raw] == raw_ids
+
+
+def test_days_with_same_filters_share_one_query():
+    db = FakeDB()
+    params = {d: {"include_tags": ["main-dish"], "query": None} for d in DATES}
+    params[DATES[1]] = {"include_tags": ["main-dish", "italian"], "query": None}
+
+    pools, timing = build_per_day_pools_v2(db, params, user_id="u", week_of=DATES[0])
+
+    assert len(db.batches) == 2
+    shared = next(b for b in db.batches if b["include_tags"] == ["main-dish"])
+    assert len(shared["seeds"]) == 2
+    assert pools[DATES[0]][0].id != pools[DATES[2]][0].id  # distinct seeded samples
+    assert set(timing) == set(DATES)
+
+
+def test_legacy_builder_groups_by_filters_and_exclusions():
+    db = FakeDB()
+    reqs = [DayRequirement(date=d) for d in DATES]
+    reqs[2].cuisine = "italian"
+
+    build_per_day_pools(db, reqs, recent_names=[], exclude_allergens=[],
+                        excluded_ids_by_date={DATES[1]: {42}}, user_id="u", week_of=DATES[0])
+
+    # Excluded IDs change the filter set, so day 2 gets its own query
+    assert sorted(len(b["seeds"]) for b in db.batches) == [1, 1, 1]
+    assert any(b["exclude_ids"] == ["42"] for b in db.batches)
+
+
+def test_only_dates_keep_their_seeds():
+    db = FakeDB()
+    days = [DayRequirement(date=d) for d in DATES]
+    full, _ = build_per_day_pools(db, days, [], [], user_id="u", week_of=DATES[0])
+    full_calls = list(db.calls)
+    db.calls.clear()
+
+    retry, _ = build_per_day_pools(db, days, [], [], user_id="u", week_of=DATES[0],
+                                   only_dates={DATES[2]})
+
+    assert list(retry) == [DATES[2]]
+    assert db.calls == [full_calls[-1]]
+    assert [r.id for r in retry[DATES[2]]] == [r.id for r in full[DATES[2]]]
+
+
+def test_distinct_signatures_queried_concurrently():
+    started = threading.Barrier(2, timeout=5)
+
+    class SlowDB(FakeDB):
+        def search_recipes_sampled_batch(self, *args, **kwargs):
+            started.wait()  # Only passes if both queries run at once
+            return super().search_recipes_sampled_batch(*args, **kwargs)
+
+    requests = {
+        "a": {"include_tags": ["main-dish"], "seed": 1},
+        "b": {"include_tags": ["main-dish", "italian"], "seed": 2},
+    }
+
+    pools, _ = fetch_pools(SlowDB(), requests)
+
+    assert set(pools) == {"a", "b"}
+
+
+def _make_recipes_db(path, with_recipe_tags=True, count=300):
+    conn = sqlite3.connect(path / "recipes.db")
+    conn.execute("DROP TABLE IF EXISTS recipes")
+    conn.execute("DROP TABLE IF EXISTS recipe_tags")
+    conn.execute("CREATE TABLE recipes (id TEXT PRIMARY KEY, name TEXT, description TEXT, "
+                 "ingredients TEXT, ingredients_raw TEXT, ingredients_structured TEXT, steps TEXT, "
+                 "servings INTEGER, serving_size TEXT, tags TEXT)")
+    if with_recipe_tags:
+        conn.execute("CREATE TABLE recipe_tags (recipe_id TEXT, tag TEXT)")
+    for i in range(count):
+        tags = ["main-dish"] if i % 4 else ["desserts"]
+        conn.execute("INSERT INTO recipes VALUES (?,?,?,?,?,?,?,?,?,?)",
+                     (str(i), f"Dish {i}", "", "[]", "[]", None, "[]", 4, "", json.dumps(tags)))
+        if with_recipe_tags:
+            conn.executemany("INSERT INTO recipe_tags VALUES (?,?)", [(str(i), t) for t in tags])
+    conn.commit()
+    conn.close()
+    return DatabaseInterface(db_dir=str(path))
+
+
+FILTERS = {"include_tags": ["main-dish"], "exclude_tags": ["desserts"], "limit": 20}
+
+
+@pytest.fixture(autouse=True)
+def clear_pool_cache():
+    DatabaseInterface._pool_cache.clear()
+    DatabaseInterface.reset_pool_cache_stats()
+    yield
+    DatabaseInterface._pool_cache.clear()
+
+
+@pytest.mark.parametrize("with_recipe_tags", [True, False])
+def test_batch_samples_match_single_queries(tmp_path, with_recipe_tags):
+    db = _make_recipes_db(tmp_path, with_recipe_tags)
+
+    batch = db.search_recipes_sampled_batch(seeds=[1, 2, 3], **FILTERS)
+    DatabaseInterface._pool_cache.clear()
+    single = [db.search_recipes_sampled(seed=seed, **FILTERS) for seed in (1, 2, 3)]
+
+    assert [[r.id for r in pool] for pool in batch] == [[r.id for r in pool] for pool in single]
+    assert len({tuple(r.id for r in pool) for pool in batch}) == 3
+
+
+def test_cached_pools_skip_sql(tmp_path, monkeypatch):
+    db = _make_recipes_db(tmp_path)
+    first = db.search_recipes_sampled(seed=7, **FILTERS)
+
+    def no_sql(*args, **kwargs):
+        raise AssertionError("cache hit should not touch SQLite")
+
+    monkeypatch.setattr("data.database.sqlite3.connect", no_sql)
+    second = db.search_recipes_sampled(seed=7, **FILTERS)
+
+    assert [r.id for r in second] == [r.id for r in first]
+    assert DatabaseInterface.pool_cache_stats()["hits"] == 1
+
+
+def test_cache_keys_on_exclusions_and_skips_unseeded(tmp_path):
+    db = _make_recipes_db(tmp_path)
+
+    db.search_recipes_sampled(seed=7, **FILTERS)
+    excluded = db.search_recipes_sampled(seed=7, exclude_ids=["1"], **FILTERS)
+    db.search_recipes_sampled(seed=None, **FILTERS)
+    db.search_recipes_sampled(seed=None, **FILTERS)
+
+    assert "1" not in [r.id for r in excluded]
+    assert DatabaseInterface.pool_cache_stats()["hits"] == 0
+    assert DatabaseInterface.pool_cache_stats()["entries"] == 2
+
+
+def test_rebuilt_recipes_db_invalidates_pools(tmp_path):
+    db = _make_recipes_db(tmp_path)
+    db.search_recipes_sampled(seed=7, **FILTERS)
+
+    _make_recipes_db(tmp_path, count=120)
+    rebuilt = db.search_recipes_sampled(seed=7, **FILTERS)
+
+    assert all(int(r.id) < 120 for r in rebuilt)
+    assert DatabaseInterface.pool_cache_stats()["hits"] == 0
+    assert DatabaseInterface.pool_cache_stats()["entries"] == 1
+
+
+def test_lru_bound(tmp_path, monkeypatch):
+    db = _make_recipes_db(tmp_path)
+    monkeypatch.setattr(DatabaseInterface._pool_cache, "max_entries", 2)
+
+    for seed in (1, 2, 3):
+        db.search_recipes_sampled(seed=seed, **FILTERS)
+    db.search_recipes_sampled(seed=1, **FILTERS)
+
+    assert DatabaseInterface.pool_cache_stats()["entries"] == 2
+    assert DatabaseInterface.pool_cache_stats()["hits"] == 0
+
+
+POOLS_SCRIPT = """
+import json, sys
+sys.path.insert(0, {src!r})
+from data.database import DatabaseInterface
+from requirements_parser import DayRequirement
+from chatbot_modules.pool_builder import build_per_day_pools
+
+days = [DayRequirement(date=d) for d in {dates!r}]
+pools, _ = build_per_day_pools(DatabaseInterface(db_dir={db_dir!r}), days, [], [],
+                               user_id="alice", week_of={dates!r}[0])
+print(json.dumps({{date: [r.id for r in pool] for date, pool in pools.items()}}))
+"""
+
+
+@pytest.mark.parametrize("with_recipe_tags", [True, False])
+def test_pools_identical_across_interpreters(tmp_path, with_recipe_tags):
+    _make_recipes_db(tmp_path, with_recipe_tags)
+    script = POOLS_SCRIPT.format(src=os.path.abspath(os.path.join(project_root, "src")),
+                                 dates=DATES, db_dir=str(tmp_path))
+
+    outputs = []
+    for hash_seed in ("1", "2", "random"):
+        env = {**os.environ, "PYTHONHASHSEED": hash_seed}
+        result = subprocess.run([sys.executable, "-c", script], env=env,
+                                capture_output=True, text=True, check=True)
+        outputs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert len({tuple(ids) for ids in outputs[0].values()}) == len(DATES)
+
+
+def test_day_seed_is_fixed_per_user_week_and_day():
+    assert day_seed("alice", DATES[0], 0) == day_seed("alice", DATES[0], 0)
+    assert 0 <= day_seed("alice", DATES[0], 0) < 2**31
+    assert len({day_seed("alice", DATES[0], 0), day_seed("alice", DATES[0], 1),
+                day_seed("bob", DATES[0], 0), day_seed("alice", DATES[1], 0)}) == 4
+    assert day_seed(None, None, 0) == day_seed("default", "unknown", 0)
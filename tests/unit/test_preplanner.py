@@ -0,0 +1,156 @@
+"""
+Unit tests for background pre-planning and serving precomputed drafts.
+"""
+
+import pytest
+import sys
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.database import DatabaseInterface
+from data.models import MealPlan, PlannedMeal, Recipe
+from chatbot_modules import preplanner, tool_handlers
+from chatbot_modules.preplanner import (
+    is_default_request,
+    next_week_dates,
+    precompute_active_users,
+    precompute_plan,
+    take_precomputed_plan,
+)
+
+DATES = ["2025-11-24", "2025-11-25", "2025-11-26"]
+ONION = [{"raw": "1 onion", "quantity": 1.0, "unit": None, "name": "onion"}]
+
+
+@pytest.fixture
+def db(tmp_path):
+    """user_data.db plus a small recipes.db of main dishes."""
+    conn = sqlite3.connect(tmp_path / "recipes.db")
+    conn.execute("CREATE TABLE recipes (id TEXT PRIMARY KEY, name TEXT, description TEXT, "
+                 "ingredients TEXT, ingredients_raw TEXT, ingredients_structured TEXT, steps TEXT, "
+                 "servings INTEGER, serving_size TEXT, tags TEXT)")
+    for i in range(40):
+        conn.execute("INSERT INTO recipes VALUES (?,?,?,?,?,?,?,?,?,?)",
+                     (str(i), f"Dish {i}", "", '["onion"]', '["1 onion"]', json.dumps(ONION),
+                      "[]", 4, "", json.dumps(["main-dish"])))
+    conn.commit()
+    conn.close()
+    DatabaseInterface._pool_cache.clear()
+    yield DatabaseInterface(db_dir=str(tmp_path))
+    DatabaseInterface._pool_cache.clear()
+
+
+def _chatbot(db, message="plan my week"):
+    return SimpleNamespace(
+        selected_dates=DATES, week_start=DATES[0], verbose=False, _verbose_output=lambda msg: None,
+        conversation_history=[{"role": "user", "content": message}],
+        assistant=SimpleNamespace(db=db), client=Mock(), user_id=7,
+    )
+
+
+def test_next_week_dates_start_on_next_monday():
+    assert next_week_dates(datetime(2025, 11, 20))[0] == "2025-11-24"  # Thursday
+    assert next_week_dates(datetime(2025, 11, 24))[0] == "2025-12-01"  # Monday
+    assert len(next_week_dates(num_days=5)) == 5
+
+
+@pytest.mark.parametrize("message,expected", [
+    (None, True),
+    ("plan my week", True),
+    ("Plan meals for next week please", True),
+    ("italian on monday", False),
+    ("something with salmon", False),
+    ("plan something fancy", False),
+])
+def test_default_request_detection(message, expected):
+    assert is_default_request(message, DATES) is expected
+
+
+def test_draft_is_served_once_for_covered_dates(db):
+    assert precompute_plan(db, 7, DATES)
+    stored = db.get_precomputed_plan(7, DATES)
+
+    plan = take_precomputed_plan(db, 7, DATES[1:], week_of=DATES[1])
+
+    assert [m.date for m in plan.meals] == DATES[1:]
+    assert [m.recipe.id for m in plan.meals] == [m.recipe.id for m in stored["meals"][1:]]
+    assert plan.backup_recipes["mixed"][0].ingredients_structured[0].name == "onion"
+    assert take_precomputed_plan(db, 7, DATES, week_of=DATES[0]) is None
+
+
+def test_overlapping_requests_claim_a_draft_once(db):
+    precompute_plan(db, 7, DATES)
+    barrier = threading.Barrier(8)
+    served = []
+
+    def take():
+        barrier.wait()
+        served.append(take_precomputed_plan(db, 7, DATES, week_of=DATES[0]))
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(plan is not None for plan in served) == 1
+    assert db.claim_precomputed_plan(7, DATES) is None
+
+
+def test_stale_drafts_are_discarded(db, monkeypatch):
+    precompute_plan(db, 7, DATES)
+    db.add_favorite(7, "3", "Dish 3")
+
+    assert take_precomputed_plan(db, 7, DATES, week_of=DATES[0]) is None
+    assert db.get_precomputed_plan(7, DATES) is None
+
+    precompute_plan(db, 7, DATES)
+    monkeypatch.setattr(preplanner, "PRECOMPUTED_PLAN_MAX_AGE_HOURS", -1)
+    assert take_precomputed_plan(db, 7, DATES, week_of=DATES[0]) is None
+
+
+def test_precompute_active_users(db):
+    recipe = Recipe(id="1", name="Dish 1", description="", ingredients=[], ingredients_raw=[],
+                    steps=[], servings=4, serving_size="", tags=["main-dish"])
+    plan = MealPlan(week_of="2025-11-17", meals=[PlannedMeal(date="2025-11-17", meal_type="dinner",
+                                                              recipe=recipe, servings=4)])
+    db.save_meal_plan(plan, user_id=3)
+
+    assert db.get_active_user_ids() == [3]
+    assert precompute_active_users(db, dates=DATES) == {3: True}
+    assert db.get_precomputed_plan(3, DATES) is not None
+
+
+def test_plan_meals_smart_serves_draft_without_planning(db):
+    precompute_plan(db, 7, DATES)
+    draft_ids = [m.recipe.id for m in db.get_precomputed_plan(7, DATES)["meals"]]
+    chatbot = _chatbot(db)
+
+    with patch.object(tool_handlers, "generate_meal_names", side_effect=AssertionError("planned live")), \
+            patch.object(tool_handlers, "build_per_day_pools", side_effect=AssertionError("planned live")):
+        result = json.loads(tool_handlers.handle_plan_meals_smart(chatbot, {}))
+
+    assert result["status"] == "complete"
+    assert [m.recipe.id for m in chatbot.last_meal_plan.meals] == draft_ids
+    assert chatbot.current_meal_plan_id == result["plan_id"]
+
+
+def test_plan_meals_smart_plans_live_for_specific_requests(db):
+    precompute_plan(db, 7, DATES)
+    chatbot = _chatbot(db, "italian on monday")
+
+    with patch.object(tool_handlers, "generate_meal_names", side_effect=RuntimeError("live")):
+        result = tool_handlers.handle_plan_meals_smart(chatbot, {})
+
+    assert "live" in result
+    assert db.get_precomputed_plan(7, DATES) is not None
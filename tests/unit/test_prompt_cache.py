@@ -0,0 +1,97 @@
+"""
+Unit tests for prompt-prefix cache breakpoints on the chatbot prompt and tools.
+
+Savings are measured with LocalPromptCacheProvider, which accounts cached
+prefixes the way the API does without making real calls.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from llm_provider import LocalPromptCacheProvider, with_cache_breakpoint
+from chatbot_modules.tools_config import (
+    STATIC_SYSTEM_PROMPT,
+    TOOL_DEFINITIONS,
+    build_plan_context,
+    build_system_blocks,
+    build_system_prompt,
+    get_tools,
+)
+
+
+def _turn(provider, plan_id, user_message, cached=True):
+    if cached:
+        system = build_system_blocks(plan_id, None, None)
+        tools = get_tools(cache_breakpoint=True)
+    else:
+        system = build_system_prompt(plan_id, None, None)
+        tools = get_tools()
+    return provider.create_message(
+        model="claude-sonnet-4-5-20250929",
+        max_tokens=2048,
+        system=system,
+        tools=tools,
+        messages=[{"role": "user", "content": user_message}],
+    )
+
+
+def test_plan_context_is_outside_static_prompt():
+    context = build_plan_context("mp_123", "gl_9", None, ["2025-11-24"])
+
+    assert "mp_123" in context
+    assert "2025-11-24 (Monday)" in context
+    assert "mp_123" not in STATIC_SYSTEM_PROMPT
+    assert build_system_prompt("mp_123", "gl_9", None, ["2025-11-24"]) == \
+        f"{STATIC_SYSTEM_PROMPT}\n\n{context}"
+
+
+def test_system_blocks_put_breakpoint_after_static_prompt():
+    blocks = build_system_blocks("mp_123", None, None)
+
+    assert blocks[0]["text"] == STATIC_SYSTEM_PROMPT
+    assert "cache_control" in blocks[0]
+    assert "mp_123" in blocks[1]["text"]
+    assert "cache_control" not in blocks[1]
+
+
+def test_tool_breakpoint_marks_only_last_tool():
+    tools = get_tools(cache_breakpoint=True)
+
+    assert "cache_control" in tools[-1]
+    assert all("cache_control" not in tool for tool in tools[:-1])
+    assert all("cache_control" not in tool for tool in TOOL_DEFINITIONS)
+    assert with_cache_breakpoint([]) == []
+
+
+def test_prefix_read_from_cache_across_plan_changes():
+    provider = LocalPromptCacheProvider()
+
+    first = _turn(provider, None, "Plan 5 dinners")
+    second = _turn(provider, "mp_123", "Swap Tuesday")
+
+    assert first.usage.cache_creation_input_tokens > 0
+    assert first.usage.cache_read_input_tokens == 0
+    assert second.usage.cache_read_input_tokens == first.usage.cache_creation_input_tokens
+    assert second.usage.input_tokens < 200
+
+
+def test_breakpoints_reduce_uncached_tokens_and_latency():
+    cached = LocalPromptCacheProvider()
+    uncached = LocalPromptCacheProvider()
+    for i in range(4):
+        _turn(cached, f"mp_{i}", "Swap Tuesday")
+        _turn(uncached, f"mp_{i}", "Swap Tuesday", cached=False)
+
+    cached_stats = cached.stats()
+    uncached_stats = uncached.stats()
+
+    assert uncached_stats["cache_read_input_tokens"] == 0
+    assert cached_stats["cache_read_ratio"] > 0.5
+    assert cached_stats["input_tokens"] < uncached_stats["input_tokens"] / 4
+    assert cached_stats["estimated_latency_s"] < uncached_stats["estimated_latency_s"]
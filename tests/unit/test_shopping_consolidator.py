@@ -0,0 +1,238 @@
+"""
+Unit tests for rule-based shopping list consolidation.
+"""
+
+import pytest
+import sys
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from agents.agentic_shopping_agent import AgenticShoppingAgent
+from chatbot_modules.tool_handlers import handle_create_shopping_list
+from shopping_consolidator import (
+    IngredientConsolidator,
+    format_amount,
+    normalize_name,
+    parse_quantity,
+    parse_scaling,
+    parse_unit,
+    store_section,
+)
+
+SERVINGS = {"Pancakes": 4, "Tacos": 4, "Italian Sandwiches": 4}
+
+
+def _consolidate(lines, factors=None):
+    consolidator = IngredientConsolidator(factors)
+    leftovers = [line for line, recipe in lines
+                 if not consolidator.add({"ingredient": line, "recipe": recipe})]
+    return {item["name"]: item for item in consolidator.items()}, leftovers
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("2 cups flour", 2.0),
+    ("1 1/2 cups milk", 1.5),
+    ("½ tsp salt", 0.5),
+    ("2-3 cloves garlic", 2.5),
+    ("one onion", 1.0),
+    ("salt to taste", None),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text)[0] == expected
+
+
+@pytest.mark.parametrize("text,unit", [
+    ("T butter", "tbsp"),
+    ("Tbs. butter", "tbsp"),
+    ("TBSP butter", "tbsp"),
+    ("t salt", "tsp"),
+    ("(14 oz) can tomatoes", "can"),
+    ("large eggs", None),
+])
+def test_parse_unit(text, unit):
+    assert parse_unit(text)[0] == unit
+
+
+@pytest.mark.parametrize("amount,text", [
+    (1.25, "1 1/4"), (1.125, "1 1/8"), (1 / 3, "1/3"), (2.0, "2"), (0.15, "0.15"),
+])
+def test_format_amount(amount, text):
+    assert format_amount(amount) == text
+
+
+@pytest.mark.parametrize("raw,name", [
+    ("large onions, chopped", "onion"),
+    ("Fresh Tomatoes (diced)", "tomato"),
+    ("boneless skinless chicken breasts", "chicken breast"),
+    ("garlic cloves, minced", "garlic"),
+])
+def test_normalize_name(raw, name):
+    assert normalize_name(raw) == name
+
+
+def test_store_section_prefers_enriched_category():
+    assert store_section("ground beef") == "meat"
+    assert store_section("chicken broth") == "pantry"
+    assert store_section("onion", "produce") == "produce"
+    assert store_section("chicken thigh", "other") == "meat"
+    assert store_section("mystery item") == "other"
+
+
+def test_compatible_units_are_converted_and_added():
+    items, leftovers = _consolidate([
+        ("1 cup flour", "Pancakes"), ("2 tbsp all-purpose flour", "Pancakes"),
+        ("1/2 lb ground beef", "Tacos"), ("8 oz ground beef", "Tacos"),
+        ("2 large onions, chopped", "Tacos"), ("1 onion", "Pancakes"),
+    ])
+
+    assert leftovers == []
+    assert items["flour"]["quantity"] == "1 1/8 cups"
+    assert items["ground beef"]["quantity"] == "1 lb"
+    assert items["onion"]["quantity"] == "3"
+    assert items["onion"]["recipe_sources"] == ["Tacos", "Pancakes"]
+    assert items["ground beef"]["category"] == "meat"
+    assert [c.amount for c in items["ground beef"]["contributions"]] == [0.5, 0.5]
+
+
+def test_count_unit_before_or_after_the_name_adds_up():
+    items, _ = _consolidate([("2 garlic cloves, minced", "Tacos"), ("2 cloves garlic", "Pancakes")])
+
+    assert items["garlic"]["quantity"] == "4 cloves"
+
+
+def test_incompatible_units_are_listed_separately():
+    items, _ = _consolidate([("1 cup butter", "Pancakes"), ("2 sticks butter", "Tacos")])
+
+    assert items["butter"]["quantity"] == "1 cup + 2 sticks"
+
+
+def test_unquantified_lines_become_as_needed_items():
+    items, leftovers = _consolidate([("salt and pepper to taste", "Tacos")])
+
+    assert leftovers == []
+    assert items["salt"]["quantity"] == "as needed"
+    assert items["pepper"]["quantity"] == "as needed"
+
+
+def test_unparseable_lines_are_left_over():
+    items, leftovers = _consolidate([("juice of 2 lemons", "Tacos"), ("1 (14 oz) can tomatoes", "Tacos"),
+                                     ("1 cup rice", "Tacos")])
+
+    assert leftovers == ["juice of 2 lemons"]
+    assert items["tomato"]["quantity"] == "1 can"
+    assert items["tomato"]["category"] == "pantry"
+
+
+def test_parse_scaling():
+    factors, unparsed = parse_scaling(
+        "double the italian sandwiches, tacos for 8 people, and make the pancakes extra fluffy", SERVINGS)
+
+    assert factors == {"Italian Sandwiches": 2.0, "Tacos": 2.0}
+    assert unparsed == ["make the pancakes extra fluffy"]
+    assert parse_scaling("halve everything", SERVINGS)[0] == {r: 0.5 for r in SERVINGS}
+    assert parse_scaling("Tacos x1.5", SERVINGS)[0] == {"Tacos": 1.5}
+    assert parse_scaling(None, SERVINGS) == ({}, [])
+
+
+@pytest.mark.parametrize("instructions,factor", [
+    ("make it for 8 people", 2.0),
+    ("it x2", 2.0),
+    ("double them", 2.0),
+    ("scale everything by 1.5", 1.5),
+    ("for 2", 0.5),
+])
+def test_scaling_without_a_recipe_applies_to_all(instructions, factor):
+    assert parse_scaling(instructions, SERVINGS) == ({r: factor for r in SERVINGS}, [])
+
+
+def test_scaling_multiplies_recipe_quantities():
+    items, _ = _consolidate([("1 cup flour", "Pancakes"), ("2 tbsp flour", "Tacos")], {"Pancakes": 2.0})
+
+    assert items["flour"]["quantity"] == "2 1/8 cups"
+
+
+def test_consolidation_is_fast():
+    names = [f"{a} {b}" for a in ("red", "green", "sweet", "dried", "smoked") for b in
+             ("pepper", "onion", "bean", "lentil", "paprika", "chili", "apple", "pear")]
+    lines = [(f"{i % 5 + 1} cups {names[i % 40]}", f"Recipe {i % 7}") for i in range(500)]
+
+    start = time.perf_counter()
+    items, _ = _consolidate(lines)
+
+    assert len(items) == 40
+    assert time.perf_counter() - start < 0.5
+
+
+def _agent(response_text="lemon juice | 2 lemons | produce | Tacos"):
+    agent = AgenticShoppingAgent(Mock(), api_key="test")
+    agent.client = Mock()
+    agent.client.messages.create.return_value = SimpleNamespace(content=[SimpleNamespace(text=response_text)])
+    return agent
+
+
+def _state(raw_ingredients, scaling=None):
+    return {"meal_plan_id": "mp", "scaling_instructions": scaling, "raw_ingredients": raw_ingredients,
+            "consolidated_items": [], "grocery_list_id": None, "error": None}
+
+
+def test_consolidate_node_skips_llm_for_parsed_lines():
+    agent = _agent()
+    state = agent._consolidate_node(_state([
+        {"ingredient": "2.0 cup flour", "raw": "2 cups flour", "name": "flour", "quantity": 2.0,
+         "unit": "cup", "category": "baking", "recipe": "Pancakes", "servings": 4},
+        {"ingredient": "1 onion", "recipe": "Tacos", "servings": 4},
+    ], scaling="double the pancakes"))
+
+    agent.client.messages.create.assert_not_called()
+    items = {i["name"]: i for i in state["consolidated_items"]}
+    assert items["flour"]["quantity"] == "4 cups"
+    assert items["flour"]["category"] == "baking"
+    assert items["onion"]["category"] == "produce"
+
+
+def test_consolidate_node_sends_only_leftovers_to_llm():
+    agent = _agent()
+    state = agent._consolidate_node(_state([
+        {"ingredient": "1 onion", "recipe": "Tacos", "servings": 4},
+        {"ingredient": "juice of 2 lemons", "recipe": "Tacos", "servings": 4},
+    ]))
+
+    prompt = agent.client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert "juice of 2 lemons" in prompt
+    assert "1 onion" not in prompt
+    assert [i["name"] for i in state["consolidated_items"]] == ["onion", "lemon juice"]
+
+
+def test_consolidate_node_keeps_leftovers_when_llm_fails():
+    agent = _agent()
+    agent.client.messages.create.side_effect = RuntimeError("offline")
+    state = agent._consolidate_node(_state([{"ingredient": "juice of 2 lemons", "recipe": "Tacos"}]))
+
+    assert state["error"] is None
+    assert [i["name"] for i in state["consolidated_items"]] == ["juice of 2 lemons"]
+
+
+def test_unapplied_scaling_is_reported():
+    agent = _agent()
+    state = agent._consolidate_node(_state([{"ingredient": "1 onion", "recipe": "Tacos", "servings": 4}],
+                                           scaling="double the tacos, make the pancakes extra fluffy"))
+
+    assert state["unapplied_scaling"] == ["make the pancakes extra fluffy"]
+
+    assistant = Mock()
+    assistant.create_shopping_list.return_value = {
+        "success": True, "grocery_list_id": "gl-1", "num_items": 1,
+        "unapplied_scaling": state["unapplied_scaling"],
+    }
+    chatbot = SimpleNamespace(current_meal_plan_id="mp", assistant=assistant)
+    message = handle_create_shopping_list(chatbot, {"scaling_instructions": "double the tacos, ..."})
+
+    assert "could not be applied" in message
+    assert "make the pancakes extra fluffy" in message
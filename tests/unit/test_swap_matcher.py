@@ -0,0 +1,123 @@
+"""
+Unit tests for local TF-IDF swap matching against backup recipes.
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from data.models import MealPlan, PlannedMeal, Recipe
+from chatbot_modules.swap_matcher import BackupVectorizer, strip_exclusions
+from chatbot_modules.tool_handlers import handle_swap_meal_fast
+
+
+def _recipe(recipe_id, name, tags, description=""):
+    return Recipe(id=str(recipe_id), name=name, description=description, ingredients=[],
+                  ingredients_raw=[], steps=[], servings=4, serving_size="", tags=tags)
+
+
+@pytest.fixture
+def backups():
+    return {
+        "chicken": [
+            _recipe(1, "Lemon Garlic Chicken", ["main-dish", "chicken", "30-minutes-or-less"]),
+            _recipe(2, "Spicy Chicken Tacos", ["main-dish", "mexican", "chicken"], "Smoky chipotle tacos"),
+        ],
+        "pasta": [
+            _recipe(3, "Creamy Mushroom Penne", ["main-dish", "pasta", "italian"]),
+            _recipe(4, "Shrimp Linguine", ["main-dish", "pasta", "seafood"]),
+        ],
+        "mixed": [
+            _recipe(5, "Grilled Salmon", ["main-dish", "seafood", "fish"]),
+            _recipe(6, "Beef Stir Fry", ["main-dish", "beef", "asian"]),
+        ],
+    }
+
+
+def _chatbot(backups):
+    plan = MealPlan(
+        week_of="2025-01-20",
+        meals=[PlannedMeal(date="2025-01-20", meal_type="dinner",
+                           recipe=_recipe(9, "Old Meal", ["main-dish"]), servings=4)],
+        backup_recipes=backups,
+    )
+    plan.id = "plan-1"
+    db = Mock()
+    db.swap_meal_in_plan.return_value = True
+    return SimpleNamespace(
+        last_meal_plan=plan, client=Mock(), verbose=False, _verbose_output=lambda msg: None,
+        assistant=SimpleNamespace(db=db), user_id=1, current_snapshot_id=None,
+        current_meal_plan_id=None, pending_swap_options=None,
+    )
+
+
+def test_strip_exclusions():
+    assert strip_exclusions("no chicken, maybe seafood").strip() == ", maybe seafood"
+
+
+def test_scores_every_recipe_and_category(backups):
+    vectorizer = BackupVectorizer(backups)
+
+    scores = vectorizer.score("spicy tacos")
+
+    assert scores.shape == (6 + 3,)
+    assert int(scores[:6].argmax()) == 1
+    assert vectorizer.score("").sum() == 0
+
+
+def test_match_picks_category_and_ranks_recipes(backups):
+    vectorizer = BackupVectorizer(backups)
+
+    match = vectorizer.match("I'd like shrimp instead")
+
+    assert match.category == "pasta"
+    assert match.ranked[0].name == "Shrimp Linguine"
+    assert match.score > 0.35
+    # Category rows count too (RELATED_TERMS: spaghetti -> pasta)
+    assert vectorizer.match("spaghetti night").category == "pasta"
+
+
+def test_excluded_terms_do_not_match(backups):
+    vectorizer = BackupVectorizer(backups)
+
+    assert vectorizer.match("no chicken tacos").score == 0.0
+
+
+@patch("chatbot_modules.tool_handlers.llm_semantic_match")
+def test_confident_local_match_swaps_without_llm(mock_llm, backups):
+    chatbot = _chatbot(backups)
+
+    result = handle_swap_meal_fast(chatbot, {"date": "2025-01-20", "requirements": "salmon please"})
+
+    mock_llm.assert_not_called()
+    assert "Grilled Salmon" in result
+    assert chatbot.last_meal_plan.meals[0].recipe.id == "5"
+
+
+@patch("chatbot_modules.tool_handlers.llm_semantic_match", return_value=True)
+def test_ambiguous_match_asks_llm_once_for_best_category(mock_llm, backups):
+    chatbot = _chatbot(backups)
+
+    result = handle_swap_meal_fast(chatbot, {"date": "2025-01-20", "requirements": "an asian dish"})
+
+    mock_llm.assert_called_once()
+    assert mock_llm.call_args[0][2] == "mixed"
+    assert "Beef Stir Fry" in result
+
+
+@patch("chatbot_modules.tool_handlers.handle_swap_meal", return_value="fresh search")
+@patch("chatbot_modules.tool_handlers.llm_semantic_match")
+def test_no_local_match_falls_back_without_llm(mock_llm, mock_fresh, backups):
+    chatbot = _chatbot(backups)
+
+    result = handle_swap_meal_fast(chatbot, {"date": "2025-01-20", "requirements": "a curry"})
+
+    mock_llm.assert_not_called()
+    assert result == "fresh search"
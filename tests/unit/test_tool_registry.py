@@ -0,0 +1,82 @@
+"""
+Unit tests for concurrent execution of independent tool calls.
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from chatbot_modules import tool_registry
+from chatbot_modules.tool_registry import INDEPENDENT_TOOLS, execute_tools
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Replace handlers with slow recorders of (event, tool, time)."""
+    log = []
+    lock = threading.Lock()
+
+    def make_handler(name):
+        def handler(chatbot, tool_input):
+            with lock:
+                log.append(("start", name, time.perf_counter()))
+            time.sleep(DELAY)
+            with lock:
+                log.append(("end", name, time.perf_counter()))
+            return f"{name}:{tool_input.get('n')}"
+        return handler
+
+    for name in ("search_recipes", "get_cooking_guide", "check_allergens", "swap_meal"):
+        monkeypatch.setitem(tool_registry.TOOL_HANDLERS, name, make_handler(name))
+    return log
+
+
+def test_read_only_tools_declared_independent():
+    assert {"search_recipes", "get_cooking_guide", "check_allergens"} <= INDEPENDENT_TOOLS
+    assert "swap_meal" not in INDEPENDENT_TOOLS
+    assert "plan_meals_smart" not in INDEPENDENT_TOOLS
+
+
+def test_independent_calls_run_concurrently_in_order(events):
+    calls = [("search_recipes", {"n": 1}), ("get_cooking_guide", {"n": 2}),
+             ("check_allergens", {"n": 3})]
+
+    start = time.perf_counter()
+    results = execute_tools(None, calls)
+    elapsed = time.perf_counter() - start
+
+    assert results == ["search_recipes:1", "get_cooking_guide:2", "check_allergens:3"]
+    assert elapsed < DELAY * 2
+
+
+def test_dependent_tool_is_a_barrier(events):
+    calls = [("search_recipes", {"n": 1}), ("swap_meal", {"n": 2}), ("check_allergens", {"n": 3})]
+
+    results = execute_tools(None, calls)
+
+    times = {(event, name): t for event, name, t in events}
+    assert results == ["search_recipes:1", "swap_meal:2", "check_allergens:3"]
+    assert times[("end", "search_recipes")] <= times[("start", "swap_meal")]
+    assert times[("end", "swap_meal")] <= times[("start", "check_allergens")]
+
+
+def test_errors_and_unknown_tools_keep_their_slot(events, monkeypatch):
+    def failing(chatbot, tool_input):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(tool_registry.TOOL_HANDLERS, "get_cooking_guide", failing)
+
+    results = execute_tools(None, [("search_recipes", {"n": 1}), ("get_cooking_guide", {}),
+                                   ("nope", {})])
+
+    assert results == ["search_recipes:1", "Error executing get_cooking_guide: boom",
+                       "Unknown tool: nope"]